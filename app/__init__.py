@@ -1 +1 @@
-from .start import start_app
+from .start import start_app, create_app
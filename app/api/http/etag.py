@@ -0,0 +1,77 @@
+from hashlib import blake2b
+from typing import Iterable
+
+from app.dto.task import BaseResponse
+
+
+__all__ = (
+    'task_etag',
+    'collection_etag',
+    'etag_matches',
+    'parse_version',
+)
+
+
+def task_etag(task: BaseResponse) -> str:
+    """Strong entity tag of a task, its version quoted.
+
+    :param task: TaskDTO.
+    """
+
+    return f'"{task.version}"'
+
+
+def collection_etag(tasks: Iterable[BaseResponse], next_cursor: str | None = None) -> str:
+    """Strong entity tag of a page of tasks.
+
+    Digest of ids and versions of the tasks and of the next page cursor,
+    so it changes when a task of the page is created, updated or deleted.
+    It does not depend on the process, unlike hash().
+
+    :param tasks: Tasks of the page in response order.
+    :param next_cursor: Cursor of the next page.
+    """
+
+    digest = blake2b(digest_size=16)
+
+    for task in tasks:
+        digest.update(b'%d:%d,' % (task.id, task.version))
+
+    digest.update((next_cursor or '').encode())
+
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Checks an If-None-Match header against the current entity tag with the weak comparison.
+
+    :param header: Value of If-None-Match, None when not sent.
+    :param etag: Current strong entity tag.
+    """
+
+    if header is None:
+        return False
+
+    if header.strip() == '*':
+        return True
+
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def parse_version(header: str) -> int | None:
+    """Extracts the task version from an If-Match header.
+
+    :param header: Value of If-Match.
+    :returns: Version the task must have, None for '*' which matches any version.
+    :raises ValueError: When header is not a single strong entity tag of a version.
+    """
+
+    tag = header.strip()
+
+    if tag == '*':
+        return None
+
+    if len(tag) < 3 or tag[0] != '"' or tag[-1] != '"':
+        raise ValueError(f"Malformed entity tag: {header}")
+
+    return int(tag[1:-1])
@@ -0,0 +1,138 @@
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from app.dto.cache import CacheStatsResponse
+from app.dto.pool import PoolStatsResponse
+from app.dto.slow_query import SlowQueryListResponse
+from app.dto.task import TaskStatsResponse
+from app.manager import TaskManager
+from app.manager.exceptions import DAOManagerError, DataManagerError, ConflictManagerError
+from app.utils.lru_cache import LRUCache
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+from app.api.http.exceptions import BaseAPIError
+
+
+__all__ = (
+    'AdminHandler',
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class AdminHandler:
+    """Admin handler exposing runtime statistics."""
+
+    __slots__ = (
+        '__task_cache',
+        '__db_engine',
+        '__task_manager',
+        'router',
+    )
+
+    def __init__(
+            self,
+            task_cache: LRUCache | None = None,
+            db_engine: SQLAlchemyDBEngine | AsyncpgDBEngine | None = None,
+            task_manager: TaskManager | None = None,
+    ) -> None:
+        """Initialization.
+
+        :param task_cache: Task cache, None if caching is disabled.
+        :param db_engine: Database engine, None if not used.
+        :param task_manager: Task manager running maintenance jobs, None if not used.
+        :raises BaseAPIError:
+        """
+
+        self.__task_cache = task_cache
+        self.__db_engine = db_engine
+        self.__task_manager = task_manager
+
+        self.router = APIRouter()
+        self.__add_routes()
+
+    def __add_routes(self) -> None:
+        """__add_routes.
+
+        :raises BaseAPIError:
+        """
+
+        try:
+            self.router.add_api_route(
+                "/cache",
+                self.get_cache_stats,
+                methods=["GET"],
+                response_model=CacheStatsResponse,
+                tags=["Admin"],
+            )
+            self.router.add_api_route(
+                "/pool",
+                self.get_pool_stats,
+                methods=["GET"],
+                response_model=PoolStatsResponse,
+                tags=["Admin"],
+            )
+            self.router.add_api_route(
+                "/slow-queries",
+                self.get_slow_queries,
+                methods=["GET"],
+                response_model=SlowQueryListResponse,
+                tags=["Admin"],
+            )
+            self.router.add_api_route(
+                "/task-stats/reconcile",
+                self.reconcile_task_stats,
+                methods=["POST"],
+                response_model=TaskStatsResponse,
+                tags=["Admin"],
+            )
+
+        except (Exception,) as error:
+            LOG.error("Unknown error during adding admin routes. err=%s", error)
+
+            raise BaseAPIError from error
+
+    async def get_cache_stats(self) -> CacheStatsResponse:
+        """This method lets you get hit, miss and eviction counters of the task cache"""
+
+        if self.__task_cache is None:
+            raise HTTPException(status_code=404, detail="Cache is disabled")
+
+        return CacheStatsResponse(**self.__task_cache.stats())
+
+    async def get_pool_stats(self) -> PoolStatsResponse:
+        """This method lets you get connection pool usage, checkout wait time histogram and timeouts"""
+
+        if self.__db_engine is None:
+            raise HTTPException(status_code=404, detail="Database engine is not used")
+
+        return PoolStatsResponse(**self.__db_engine.pool_stats())
+
+    async def get_slow_queries(self) -> SlowQueryListResponse:
+        """This method lets you get the latest slow statements of this worker, with EXPLAIN ANALYZE plans of sampled ones"""
+
+        slow_queries = self.__db_engine.slow_queries() if isinstance(self.__db_engine, SQLAlchemyDBEngine) else None
+
+        if slow_queries is None:
+            raise HTTPException(status_code=404, detail="Slow query log is disabled")
+
+        return SlowQueryListResponse(items=slow_queries)
+
+    async def reconcile_task_stats(self) -> TaskStatsResponse:
+        """This method lets you recompute the task counters from the task table, it scans the whole table without blocking writes"""
+
+        if self.__task_manager is None:
+            raise HTTPException(status_code=404, detail="Task manager is not used")
+
+        try:
+            return await self.__task_manager.reconcile_task_stats()
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        except ConflictManagerError:
+            raise HTTPException(status_code=409, detail="Task counters are being reconciled")
@@ -0,0 +1,87 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import METRICS
+from app.utils.lru_cache import LRUCache
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+from app.api.http.exceptions import BaseAPIError
+
+
+__all__ = (
+    'MetricsHandler',
+)
+
+LOG = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsHandler:
+    """Metrics handler exporting METRICS in the Prometheus text format."""
+
+    __slots__ = (
+        '__task_cache',
+        '__db_engine',
+        'router',
+    )
+
+    def __init__(
+            self,
+            task_cache: LRUCache | None = None,
+            db_engine: SQLAlchemyDBEngine | AsyncpgDBEngine | None = None,
+    ) -> None:
+        """Initialization.
+
+        :param task_cache: Task cache, None if caching is disabled.
+        :param db_engine: Database engine, None if not used.
+        :raises BaseAPIError:
+        """
+
+        self.__task_cache = task_cache
+        self.__db_engine = db_engine
+
+        self.router = APIRouter()
+        self.__add_routes()
+
+    def __add_routes(self) -> None:
+        """__add_routes.
+
+        :raises BaseAPIError:
+        """
+
+        try:
+            self.router.add_api_route(
+                "/metrics",
+                self.get_metrics,
+                methods=["GET"],
+                response_class=PlainTextResponse,
+                tags=["Admin"],
+            )
+
+        except (Exception,) as error:
+            LOG.error("Unknown error during adding metrics routes. err=%s", error)
+
+            raise BaseAPIError from error
+
+    async def get_metrics(self) -> PlainTextResponse:
+        """This method lets you scrape latency histograms, error counters, pool and cache usage of this worker"""
+
+        if self.__db_engine is not None:
+            stats = self.__db_engine.pool_stats()
+
+            for name in ('checked_in', 'checked_out', 'overflow'):
+                METRICS.gauge(f'db_pool_{name}', f'Connections {name.replace("_", " ")} of the pool.').value = stats[name]
+
+        if self.__task_cache is not None:
+            stats = self.__task_cache.stats()
+
+            for name in ('hits', 'misses', 'evictions', 'expirations'):
+                METRICS.counter(f'task_cache_{name}_total', f'Task cache {name}.').value = stats[name]
+
+            for name in ('entries', 'bytes'):
+                METRICS.gauge(f'task_cache_{name}', f'Task cache {name} in use.').value = stats[name]
+
+        return PlainTextResponse(METRICS.render(), media_type=CONTENT_TYPE)
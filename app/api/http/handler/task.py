@@ -1,11 +1,18 @@
 import logging
 
-from typing import List
+from time import monotonic
+from typing import AsyncGenerator, AsyncIterator, Callable
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
-from app.manager.exceptions import DAOManagerError, DataManagerError
+from app.manager.exceptions import BaseManagerError, DAOManagerError, DataManagerError, ConflictManagerError
+from app.utils.metrics import instrument
+from app.utils.event_broker import EventBroker, RESET, SubscriptionDropped
 from app.api.http.exceptions import BaseAPIError
+from app.api.http.responses import FastJSONResponse
+from app.api.http.etag import task_etag, collection_etag, etag_matches, parse_version
 from app.dto.task import *
 from app.manager import TaskManager
 
@@ -16,30 +23,54 @@ __all__ = (
 
 LOG = logging.getLogger(__name__)
 
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Milliseconds EventSource clients wait before reconnecting.
+EVENTS_RETRY = 1000
+
 
 class TaskHandler:
     """Task handler."""
 
     __slots__ = (
         '__task_manager',
+        '__task_events',
+        '__events_heartbeat_interval',
+        '__events_max_duration',
         'router',
     )
 
-    def __init__(self, task_manager: TaskManager) -> None:
+    def __init__(
+            self,
+            task_manager: TaskManager,
+            task_events: EventBroker[TaskEvent] | None = None,
+            events_heartbeat_interval: float = 15.0,
+            events_max_duration: float = 300.0,
+    ) -> None:
         """Initialization.
 
         :param task_manager:
+        :param task_events: Broker of task changes, None if the change feed is disabled.
+        :param events_heartbeat_interval: Seconds of silence after which a comment is sent to idle event streams.
+        :param events_max_duration: Seconds after which an event stream is closed, the client reconnects and resumes.
         :raises BaseAPIError:
         """
 
         self.__task_manager = task_manager
+        self.__task_events = task_events
+        self.__events_heartbeat_interval = events_heartbeat_interval
+        self.__events_max_duration = events_max_duration
 
-        self.router = APIRouter()
+        self.router = APIRouter(default_response_class=FastJSONResponse)
         self.__add_routes()
 
     def __add_routes(self) -> None:
         """__add_routes.
 
+        Handlers return FastJSONResponse with DTOs built from trusted rows,
+        response_model only describes the body in the OpenAPI schema.
+        Reads answer If-None-Match with 304 before the body is encoded.
+
         :raises BaseAPIError:
         """
 
@@ -51,6 +82,55 @@ class TaskHandler:
                 response_model=CreateTaskResponse,
                 tags=["Task"],
             )
+            self.router.add_api_route(
+                "/batch",
+                self.create_batch,
+                methods=["POST"],
+                response_model=CreateTaskBatchResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/batch",
+                self.update_batch,
+                methods=["PUT"],
+                response_model=UpdateTaskBatchResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/batch",
+                self.delete_batch,
+                methods=["DELETE"],
+                response_model=DeleteTaskBatchResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/export",
+                self.export,
+                methods=["GET"],
+                response_class=StreamingResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/events",
+                self.events,
+                methods=["GET"],
+                response_class=StreamingResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/search",
+                self.search,
+                methods=["GET"],
+                response_model=ReadTaskListResponse,
+                tags=["Task"],
+            )
+            self.router.add_api_route(
+                "/stats",
+                self.get_stats,
+                methods=["GET"],
+                response_model=TaskStatsResponse,
+                tags=["Task"],
+            )
             self.router.add_api_route(
                 "/{task_id}",
                 self.get,
@@ -62,7 +142,7 @@ class TaskHandler:
                 "/",
                 self.get_list,
                 methods=["GET"],
-                response_model=List[ReadTaskResponse],
+                response_model=ReadTaskListResponse,
                 tags=["Task"],
             )
             self.router.add_api_route(
@@ -81,15 +161,22 @@ class TaskHandler:
             )
 
         except (Exception,) as error:
-            LOG.error(f"Unknown error during adding task routes. err={error}")
+            LOG.error("Unknown error during adding task routes. err=%s", error)
 
             raise BaseAPIError from error
 
 
-    async def get_list(self, filter_parameters: ReadTaskListRequest = Depends()) -> List[ReadTaskResponse]:
-        """This method lets you get list of tasks with optional filtering by status"""
+    @instrument('handler')
+    async def get_list(
+            self,
+            filter_parameters: ReadTaskListRequest = Depends(),
+            if_none_match: str | None = Header(None),
+    ) -> Response:
+        """This method lets you get a page of tasks with optional filtering by status.
+        Pass next_cursor of the previous page as after to get the next one.
+        The page is not sent again while its ETag matches If-None-Match"""
 
-        LOG.info(f"Handled get_list request: filter_parameters={filter_parameters}")
+        LOG.info("Handled get_list request: filter_parameters=%s", filter_parameters)
 
         try:
             found_tasks = await self.__task_manager.get_task_list(filter_parameters)
@@ -100,12 +187,195 @@ class TaskHandler:
         except DataManagerError:
             raise HTTPException(status_code=404, detail="Incorrect data")
 
-        return found_tasks
+        etag = collection_etag(found_tasks.items, found_tasks.next_cursor)
+
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        return FastJSONResponse(found_tasks, headers={"ETag": etag})
+
+    @instrument('handler')
+    async def search(self, filter_parameters: SearchTaskListRequest = Depends()) -> FastJSONResponse:
+        """This method lets you find tasks by words of their title and description, best matches first.
+        Pass next_cursor of the previous page as after to get the next one.
+        Only the DB_SEARCH_MAX_CANDIDATES best matching tasks are returned"""
+
+        LOG.info("Handled search request: filter_parameters=%s", filter_parameters)
+
+        try:
+            found_tasks = await self.__task_manager.search_tasks(filter_parameters)
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        return FastJSONResponse(found_tasks)
+
+    @instrument('handler')
+    async def get_stats(self) -> FastJSONResponse:
+        """This method lets you get the number of tasks by status and in total"""
+
+        LOG.info("Handled get_stats request")
+
+        try:
+            stats = await self.__task_manager.get_task_stats()
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        return FastJSONResponse(stats)
+
+    async def export(self, filter_parameters: ExportTaskListRequest = Depends()) -> StreamingResponse:
+        """This method lets you export all tasks as NDJSON, one task per line"""
+
+        LOG.info("Handled export request: filter_parameters=%s", filter_parameters)
+
+        found_tasks = self.__task_manager.export_tasks(filter_parameters)
+
+        try:
+            first_task = await self.__first(found_tasks)
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        # The body closes the stream once iterated. The background task closes it when the body
+        # is never iterated, e.g. the client disconnected before the response started.
+        return StreamingResponse(
+            self.__encode_ndjson(first_task, found_tasks),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(found_tasks.aclose),
+        )
+
+    @staticmethod
+    async def __first(found_tasks: AsyncGenerator[ReadTaskResponse, None]) -> ReadTaskResponse | None:
+        """Fetches the first task of the stream, closing the stream and releasing its connection on failure."""
+
+        try:
+            return await anext(found_tasks, None)
+
+        except BaseException:
+            await found_tasks.aclose()
+
+            raise
 
-    async def get(self, task_id: int) -> ReadTaskResponse | None:
-        """This method lets you get task by id"""
+    @staticmethod
+    async def __encode_ndjson(
+            first_task: ReadTaskResponse | None,
+            found_tasks: AsyncGenerator[ReadTaskResponse, None],
+    ) -> AsyncIterator[bytes]:
+        """Encodes tasks as NDJSON. The first line is sent right away,
+        the rest are grouped into chunks of EXPORT_CHUNK_SIZE bytes."""
 
-        LOG.info(f"Handled get request: task_id={task_id}")
+        try:
+            if first_task is None:
+                return
+
+            yield first_task.model_dump_json().encode() + b"\n"
+
+            chunk = bytearray()
+
+            async for task in found_tasks:
+                chunk += task.model_dump_json().encode()
+                chunk += b"\n"
+
+                if len(chunk) >= EXPORT_CHUNK_SIZE:
+                    yield bytes(chunk)
+                    chunk.clear()
+
+            if chunk:
+                yield bytes(chunk)
+
+        except BaseManagerError as error:
+            LOG.error("Export interrupted. err=%s", error)
+
+            raise
+
+        finally:
+            await found_tasks.aclose()
+
+    async def events(
+            self,
+            filter_parameters: TaskEventsRequest = Depends(),
+            last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+    ) -> StreamingResponse:
+        """This method lets you follow changes of tasks as Server-Sent Events, optionally of one status.
+        A task leaving the status is sent too, with it as previous_status. Events carry no title or description.
+        Reconnect with Last-Event-ID, or last_event_id, to get the changes missed meanwhile.
+        After a reset event changes may have been missed, reload the tasks"""
+
+        LOG.info("Handled events request: filter_parameters=%s, last_event_id=%s", filter_parameters, last_event_id)
+
+        if self.__task_events is None:
+            raise HTTPException(status_code=404, detail="Change feed is disabled")
+
+        status = filter_parameters.status
+        matches = None if status is None else (lambda event: event.status == status or event.previous_status == status)
+
+        return StreamingResponse(
+            self.__encode_events(matches, last_event_id if last_event_id is not None else filter_parameters.last_event_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def __encode_events(
+            self,
+            matches: Callable[[TaskEvent], bool] | None,
+            last_event_id: int | None,
+    ) -> AsyncIterator[bytes]:
+        """Encodes events of a new subscription as Server-Sent Events, events queued together in one chunk.
+
+        The subscription is made here, so it is removed with the stream, also when the client goes away.
+        """
+
+        subscription = self.__task_events.subscribe(matches, last_event_id)
+        closes_at = monotonic() + self.__events_max_duration
+
+        try:
+            yield b"retry: %d\n\n" % EVENTS_RETRY
+
+            while (remaining := closes_at - monotonic()) > 0:
+                try:
+                    events = await subscription.get(min(self.__events_heartbeat_interval, remaining))
+
+                except SubscriptionDropped:
+                    LOG.info("Event stream dropped: last_event_id=%s", last_event_id)
+
+                    break
+
+                if not events:
+                    yield b": ping\n\n"
+
+                    continue
+
+                chunk = bytearray()
+
+                for event in events:
+                    if event is RESET:
+                        chunk += b"event: reset\ndata: {}\n\n"
+
+                    else:
+                        chunk += b"id: %d\nevent: task\ndata: %s\n\n" % (event.id, event.model_dump_json().encode())
+                        last_event_id = event.id
+
+                yield bytes(chunk)
+
+        finally:
+            self.__task_events.unsubscribe(subscription)
+
+    @instrument('handler')
+    async def get(self, task_id: int, if_none_match: str | None = Header(None)) -> Response:
+        """This method lets you get task by id.
+        The task is not sent again while its ETag matches If-None-Match"""
+
+        LOG.info("Handled get request: task_id=%s", task_id)
 
         try:
             found_task = await self.__task_manager.get_task(task_id)
@@ -116,12 +386,21 @@ class TaskHandler:
         except DataManagerError:
             raise HTTPException(status_code=404, detail="Incorrect data")
 
-        return found_task
+        if found_task is None:
+            return FastJSONResponse(found_task)
 
-    async def create(self, task: CreateTaskRequest = Depends()) -> CreateTaskResponse:
+        etag = task_etag(found_task)
+
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        return FastJSONResponse(found_task, headers={"ETag": etag})
+
+    @instrument('handler')
+    async def create(self, task: CreateTaskRequest = Depends()) -> FastJSONResponse:
         """This method lets you create a new task"""
 
-        LOG.info(f"Handled create request: task={task}")
+        LOG.info("Handled create request: task=%s", task)
 
         try:
             created_task = await self.__task_manager.create_task(task)
@@ -132,15 +411,65 @@ class TaskHandler:
         except DataManagerError:
             raise HTTPException(status_code=404, detail="Incorrect data")
 
-        return created_task
+        return FastJSONResponse(created_task)
+
+    @instrument('handler')
+    async def create_batch(self, batch: CreateTaskBatchRequest) -> FastJSONResponse:
+        """This method lets you create many tasks at once. Ids are returned in input order"""
+
+        LOG.info("Handled create_batch request: tasks_count=%s", len(batch.tasks))
+
+        try:
+            created_tasks = await self.__task_manager.create_tasks(batch.tasks)
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        return FastJSONResponse(created_tasks)
+
+    @instrument('handler')
+    async def update(
+            self,
+            task_id: int,
+            task: UpdateTaskRequest = Depends(),
+            if_match: str | None = Header(None),
+    ) -> FastJSONResponse:
+        """This method lets you update an existing task that would be found by id.
+        Pass its ETag as If-Match to update it only if nobody has changed it since"""
+
+        LOG.info("Handled update request: task_id=%s, if_match=%s, task=%s", task_id, if_match, task)
+
+        try:
+            expected_version = parse_version(if_match) if if_match is not None else None
+
+        except ValueError:
+            raise HTTPException(status_code=412, detail="Version mismatch")
+
+        try:
+            updated_task = await self.__task_manager.update_task(task_id, task, expected_version)
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        except ConflictManagerError:
+            raise HTTPException(status_code=412, detail="Version mismatch")
+
+        return FastJSONResponse(updated_task, headers={"ETag": task_etag(updated_task)})
 
-    async def update(self, task_id: int, task: UpdateTaskRequest = Depends()) -> UpdateTaskResponse:
-        """This method lets you update an existing task that would be found by id"""
+    @instrument('handler')
+    async def update_batch(self, batch: UpdateTaskBatchRequest) -> FastJSONResponse:
+        """This method lets you update all tasks found by ids and/or status in one statement"""
 
-        LOG.info(f"Handled update request: task_id={task_id}, task={task}")
+        LOG.info("Handled update_batch request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
 
         try:
-            updated_task = await self.__task_manager.update_task(task_id, task)
+            updated_tasks = await self.__task_manager.update_tasks(batch)
 
         except DAOManagerError:
             raise HTTPException(status_code=500, detail="Internal error")
@@ -148,12 +477,13 @@ class TaskHandler:
         except DataManagerError:
             raise HTTPException(status_code=404, detail="Incorrect data")
 
-        return updated_task
+        return FastJSONResponse(updated_tasks)
 
-    async def delete(self, task_id: int) -> DeleteTaskResponse:
+    @instrument('handler')
+    async def delete(self, task_id: int) -> FastJSONResponse:
         """This method lets you delete an existing task that would be found by id"""
 
-        LOG.info(f"Handled delete request: task_id={task_id}")
+        LOG.info("Handled delete request: task_id=%s", task_id)
 
         try:
             deleted_task = await self.__task_manager.delete_task(task_id)
@@ -164,4 +494,21 @@ class TaskHandler:
         except DataManagerError:
             raise HTTPException(status_code=404, detail="Incorrect data")
 
-        return deleted_task
+        return FastJSONResponse(deleted_task)
+
+    @instrument('handler')
+    async def delete_batch(self, batch: DeleteTaskBatchRequest) -> FastJSONResponse:
+        """This method lets you delete all tasks found by ids and/or status in one statement"""
+
+        LOG.info("Handled delete_batch request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            deleted_tasks = await self.__task_manager.delete_tasks(batch)
+
+        except DAOManagerError:
+            raise HTTPException(status_code=500, detail="Internal error")
+
+        except DataManagerError:
+            raise HTTPException(status_code=404, detail="Incorrect data")
+
+        return FastJSONResponse(deleted_tasks)
@@ -0,0 +1,339 @@
+import time
+import math
+import logging
+
+from time import perf_counter
+from typing import Dict, Sequence, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.histogram import Histogram
+from app.utils.admission import AdmissionLimiter, AdmissionRejected
+from app.utils.metrics import METRICS, Gauge
+from app.utils.request_context import (
+    DeadlineExceeded,
+    pin_reads_to_primary,
+    unpin_reads,
+    start_deadline,
+    clear_deadline,
+)
+
+
+__all__ = (
+    'ReadYourWritesMiddleware',
+    'MetricsMiddleware',
+    'AdmissionMiddleware',
+)
+
+LOG = logging.getLogger(__name__)
+
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+READ_METHODS = frozenset({'GET', 'HEAD'})
+
+
+class ReadYourWritesMiddleware:
+    """Pins reads of a client to the primary for a while after its last write.
+
+    A successful write sets a cookie with the time the window ends. Requests
+    carrying an unexpired cookie have their reads routed to the primary, so
+    they are not served by a replica that has not replayed the write yet.
+    The cookie makes it work across workers without shared state.
+    """
+
+    __slots__ = (
+        '__app',
+        '__window',
+        '__cookie_name',
+    )
+
+    def __init__(self, app: ASGIApp, window: float, cookie_name: str = 'read_primary_until') -> None:
+        """Initialization.
+
+        :param app: Wrapped ASGI application.
+        :param window: Seconds reads stay on the primary after a write.
+        :param cookie_name: Name of the cookie holding the end of the window.
+        """
+
+        self.__app = app
+        self.__window = window
+        self.__cookie_name = cookie_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.__app(scope, receive, send)
+
+            return
+
+        token = pin_reads_to_primary() if self.__pinned_until(scope) > time.time() else None
+
+        try:
+            if scope['method'] in WRITE_METHODS:
+                await self.__app(scope, receive, self.__stamping(send))
+
+            else:
+                await self.__app(scope, receive, send)
+
+        finally:
+            if token is not None:
+                unpin_reads(token)
+
+    def __stamping(self, send: Send) -> Send:
+        """Wraps send to add the cookie to successful write responses."""
+
+        async def send_with_cookie(message: Message) -> None:
+            if message['type'] == 'http.response.start' and message['status'] < 400:
+                until = time.time() + self.__window
+                cookie = '%s=%.3f; Max-Age=%d; Path=/; HttpOnly; SameSite=Lax' % (
+                    self.__cookie_name, until, math.ceil(self.__window),
+                )
+                message['headers'] = [*message.get('headers', ()), (b'set-cookie', cookie.encode('latin-1'))]
+
+            await send(message)
+
+        return send_with_cookie
+
+    def __pinned_until(self, scope: Scope) -> float:
+        """Reads the end of the window from the request cookie, 0 when absent or malformed."""
+
+        prefix = self.__cookie_name + '='
+
+        for name, value in scope['headers']:
+            if name != b'cookie':
+                continue
+
+            for pair in value.decode('latin-1').split(';'):
+                pair = pair.strip()
+
+                if pair.startswith(prefix):
+                    try:
+                        return float(pair[len(prefix):])
+
+                    except ValueError:
+                        LOG.debug("Malformed %s cookie: %s", self.__cookie_name, pair)
+
+                        return 0.0
+
+        return 0.0
+
+
+class MetricsMiddleware:
+    """Records duration of every request by method, route template and status, and requests in flight.
+
+    The route is found after the request from the endpoint the router put into the scope,
+    so requests of unknown paths share the route label "unmatched".
+    """
+
+    __slots__ = (
+        '__app',
+        '__in_flight',
+        '__durations',
+    )
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialization.
+
+        :param app: Wrapped ASGI application.
+        """
+
+        self.__app = app
+        self.__in_flight: Dict[str, Gauge] = {}
+        # (endpoint, method, status) -> histogram, so the route is resolved once per endpoint
+        self.__durations: Dict[Tuple[object, str, int], Histogram] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.__app(scope, receive, send)
+
+            return
+
+        method = scope['method']
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+            await send(message)
+
+        in_flight = self.__in_flight.get(method)
+
+        if in_flight is None:
+            in_flight = self.__in_flight[method] = METRICS.gauge(
+                'http_requests_in_flight', 'Requests being handled.', method=method,
+            )
+
+        in_flight.value += 1
+        started_at = perf_counter()
+
+        try:
+            await self.__app(scope, receive, send_with_status)
+
+        finally:
+            elapsed = perf_counter() - started_at
+            in_flight.value -= 1
+
+            key = (scope.get('endpoint'), method, status)
+            histogram = self.__durations.get(key)
+
+            if histogram is None:
+                histogram = self.__durations[key] = METRICS.histogram(
+                    'http_request_duration_seconds', 'Time to handle a request, until the response is sent.',
+                    method=method, route=self.__route(scope), status=str(status),
+                )
+
+            histogram.observe(elapsed)
+
+    @staticmethod
+    def __route(scope: Scope) -> str:
+        """Returns the path template of the route that handled the request."""
+
+        endpoint = scope.get('endpoint')
+
+        if endpoint is not None:
+            for route in scope['app'].routes:
+                if getattr(route, 'endpoint', None) == endpoint and route.matches(scope)[0] == Match.FULL:
+                    return route.path
+
+        return 'unmatched'
+
+
+class AdmissionMiddleware:
+    """Limits concurrent requests under a path prefix, reads and writes separately.
+
+    Requests over a limit wait in its bounded queue for at most queue_timeout seconds.
+    Requests that find the queue full or time out get 503 with Retry-After at once,
+    before any work is done for them. Exempt paths, e.g. long-lived streams, are not limited.
+    Limited requests have deadline seconds from their arrival, the time waited in the queue included:
+    connection checkouts wait no longer than what is left of it, and requests whose deadline passes
+    before a connection is free get the same 503.
+    """
+
+    __slots__ = (
+        '__app',
+        '__prefix',
+        '__exempt',
+        '__limiters',
+        '__retry_after',
+        '__deadline',
+        '__in_flight',
+        '__queued',
+    )
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            read_limiter: AdmissionLimiter,
+            write_limiter: AdmissionLimiter,
+            prefix: str = '/',
+            exempt: Sequence[str] = (),
+            retry_after: int = 1,
+            deadline: float | None = None,
+    ) -> None:
+        """Initialization.
+
+        :param app: Wrapped ASGI application.
+        :param read_limiter: Limiter of GET and HEAD requests.
+        :param write_limiter: Limiter of other requests.
+        :param prefix: Only paths starting with prefix are limited.
+        :param exempt: Path prefixes that are not limited.
+        :param retry_after: Seconds sent in Retry-After of rejections.
+        :param deadline: Seconds a request may take, None for no limit.
+        """
+
+        self.__app = app
+        self.__prefix = prefix
+        self.__exempt = tuple(exempt)
+        self.__limiters = {'read': read_limiter, 'write': write_limiter}
+        self.__retry_after = str(retry_after).encode('latin-1')
+        self.__deadline = deadline
+
+        self.__in_flight = {
+            kind: METRICS.gauge('admission_in_flight', 'Admitted requests being handled.', kind=kind)
+            for kind in self.__limiters
+        }
+        self.__queued = {
+            kind: METRICS.gauge('admission_queue_depth', 'Requests waiting for admission.', kind=kind)
+            for kind in self.__limiters
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get('path', '')
+
+        if scope['type'] != 'http' or not path.startswith(self.__prefix) or path.startswith(self.__exempt):
+            await self.__app(scope, receive, send)
+
+            return
+
+        if self.__deadline is None:
+            await self.__admit(scope, receive, send)
+
+            return
+
+        token = start_deadline(self.__deadline)
+
+        try:
+            await self.__admit(scope, receive, send)
+
+        finally:
+            clear_deadline(token)
+
+    async def __admit(self, scope: Scope, receive: Receive, send: Send) -> None:
+        kind = 'read' if scope['method'] in READ_METHODS else 'write'
+        limiter = self.__limiters[kind]
+
+        try:
+            await limiter.acquire()
+
+        except AdmissionRejected as rejection:
+            await self.__reject(scope, send, kind, rejection.reason)
+
+            return
+
+        finally:
+            self.__in_flight[kind].value = limiter.active
+            self.__queued[kind].value = limiter.queued
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+
+            if message['type'] == 'http.response.start':
+                response_started = True
+
+            await send(message)
+
+        try:
+            await self.__app(scope, receive, send_tracking_start)
+
+        except DeadlineExceeded:
+            if response_started:
+                raise
+
+            await self.__reject(scope, send, kind, 'deadline')
+
+        finally:
+            limiter.release()
+
+            self.__in_flight[kind].value = limiter.active
+            self.__queued[kind].value = limiter.queued
+
+    async def __reject(self, scope: Scope, send: Send, kind: str, reason: str) -> None:
+        METRICS.counter('admission_rejected_total', 'Requests rejected with 503.', kind=kind, reason=reason).inc()
+        LOG.debug("Request rejected: %s %s, reason=%s", scope['method'], scope['path'], reason)
+
+        body = b'{"detail":"Service overloaded, retry later"}'
+
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                (b'retry-after', self.__retry_after),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
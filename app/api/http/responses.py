@@ -0,0 +1,24 @@
+from typing import Any
+
+from pydantic_core import to_json
+from fastapi.responses import JSONResponse
+
+
+__all__ = (
+    'FastJSONResponse',
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by pydantic-core in one pass.
+
+    Pydantic models are serialized by their compiled serializers, without jsonable_encoder
+    and without the response_model validation FastAPI does for returned values.
+    Already encoded bytes are sent as they are.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+
+        return to_json(content)
@@ -1,3 +1,5 @@
+from typing import Dict, List, Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,11 +10,34 @@ __all__ = (
 
 class LoggingSettings(BaseSettings):
     LOGGING_LEVEL: str = 'DEBUG'
+    LOGGING_CONFIG: str = 'logging.ini'
+    LOGGING_QUEUE_SIZE: int = 10_000
+    LOGGING_JSON: bool = False
+    LOGGING_SAMPLE_RATES: Dict[str, float] = {}
 
 
 class AppSettings(BaseSettings):
     APP_HOST: str = '0.0.0.0'
     APP_PORT: int = 8000
+    APP_WORKERS: int = 1
+    APP_LOOP: Literal['auto', 'asyncio', 'uvloop'] = 'auto'
+    APP_HTTP: Literal['auto', 'h11', 'httptools'] = 'auto'
+    APP_LIMIT_CONCURRENCY: int | None = None
+    APP_BACKLOG: int = 2048
+    APP_TIMEOUT_KEEP_ALIVE: int = 5
+    APP_METRICS_ENABLED: bool = True
+    APP_ADMISSION_ENABLED: bool = False
+    APP_ADMISSION_READ_LIMIT: int = 64
+    APP_ADMISSION_READ_QUEUE: int = 128
+    APP_ADMISSION_WRITE_LIMIT: int = 16
+    APP_ADMISSION_WRITE_QUEUE: int = 32
+    APP_ADMISSION_QUEUE_TIMEOUT: float = 0.5
+    APP_ADMISSION_RETRY_AFTER: int = 1
+    APP_ADMISSION_DEADLINE: float = 2.0
+    APP_EVENTS_QUEUE_SIZE: int = 1000
+    APP_EVENTS_HEARTBEAT_INTERVAL: float = 15.0
+    APP_EVENTS_MAX_STREAM_DURATION: float = 300.0
+    APP_TIMEOUT_GRACEFUL_SHUTDOWN: int | None = 30
 
 
 class DBSettings(BaseSettings):
@@ -24,12 +49,54 @@ class DBSettings(BaseSettings):
     DB_DATABASE: str = 'db_tmp'
     DB_SCHEMA: str = 'todo_list'
     DATABASE_URL_TEMPLATE: str = 'postgresql+asyncpg://%(username)s:%(password)s@%(host)s:%(port)s/%(database)s'
+    DB_TASK_DAO: Literal['sqlalchemy', 'asyncpg', 'memory'] = 'sqlalchemy'
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_ECHO: bool = False
+    DB_LIST_MAX_LIMIT: int = 1000
+    DB_STREAM_FETCH_SIZE: int = 1000
+    DB_SEARCH_FUZZY: bool = False
+    DB_SEARCH_MAX_CANDIDATES: int = 10000
+    DB_INSERT_BATCH_SIZE: int = 1000
+    DB_GET_BATCH_ENABLED: bool = False
+    DB_GET_BATCH_WINDOW: float = 0.0
+    DB_GET_BATCH_MAX_SIZE: int = 256
+    DB_GROUP_COMMIT_ENABLED: bool = False
+    DB_GROUP_COMMIT_WINDOW: float = 0.002
+    DB_GROUP_COMMIT_MAX_SIZE: int = 256
+    DB_STATS_RECONCILE_INTERVAL: float = 0.0
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0
+    DB_SLOW_QUERY_THRESHOLD: float = 0.5
+    DB_SLOW_QUERY_EXPLAIN_INTERVAL: float = 60.0
+    DB_SLOW_QUERY_EXPLAIN_TIMEOUT: float = 30.0
+    DB_SLOW_QUERY_LOG_SIZE: int = 100
+    DB_MEMORY_SNAPSHOT_PATH: str | None = None
+    DB_MEMORY_SNAPSHOT_INTERVAL: float = 60.0
+    DB_TASK_EVENTS_ENABLED: bool = True
+    DB_TASK_EVENTS_HISTORY_SIZE: int = 10_000
+    DB_TASK_EVENTS_PING_INTERVAL: float = 15.0
+    DB_TASK_EVENTS_RECONNECT_INTERVAL: float = 1.0
+
+
+class CacheSettings(BaseSettings):
+    CACHE_ENABLED: bool | None = None
+    CACHE_MAX_ENTRIES: int = 100_000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_TTL: float = 10.0
+    CACHE_NEGATIVE_TTL: float = 1.0
 
 
 class Configuration(BaseSettings):
     LOGGING_SETTINGS: LoggingSettings = LoggingSettings()
     DB_SETTINGS: DBSettings = DBSettings()
     APP_SETTINGS: AppSettings = AppSettings()
+    CACHE_SETTINGS: CacheSettings = CacheSettings()
 
 
 CONFIGURATION: Configuration = Configuration()
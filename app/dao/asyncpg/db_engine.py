@@ -0,0 +1,241 @@
+import asyncio
+import logging
+
+from time import perf_counter
+from typing import Dict
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from asyncpg import Connection, Pool, PostgresError, InterfaceError
+from asyncpg.connection import LoggedQuery
+
+from app.utils.singleton import Singleton
+from app.utils.metrics import METRICS
+from app.utils.request_context import DeadlineExceeded, time_left
+from app.dao.exceptions import (
+    BaseDBEngineError,
+    UnknownDBEngineError,
+    InitDBEngineError,
+)
+
+
+__all__ = (
+    'AsyncpgDBEngine',
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class AsyncpgDBEngine(metaclass=Singleton):
+    """Native asyncpg connection pool, without the SQLAlchemy layer."""
+
+    __pool: Pool | None = None
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            host: str,
+            port: int,
+            database: str,
+            min_size: int = 5,
+            max_size: int = 15,
+            acquire_timeout: float = 30.0,
+            max_inactive_connection_lifetime: float = 0.0,
+            statement_cache_size: int = 100,
+    ) -> None:
+        """Initialize the database engine instance.
+
+        :param username:
+        :param password:
+        :param host:
+        :param port:
+        :param database:
+        :param min_size: Number of connections kept open in the pool.
+        :param max_size: Max number of connections in the pool.
+        :param acquire_timeout: Seconds to wait for a connection before giving up.
+        :param max_inactive_connection_lifetime: Seconds after which an idle connection is closed, 0 to keep it.
+        :param statement_cache_size: Size of the prepared statement cache per connection.
+        """
+
+        LOG.info("Initializing AsyncpgDBEngine | 'host': %s, 'port': %s.", host, port)
+
+        self.__connect_kwargs = {
+            "user": username,
+            "password": password,
+            "host": host,
+            "port": port,
+            "database": database,
+        }
+
+        self.__min_size = min_size
+        self.__max_size = max_size
+        self.__acquire_timeout = acquire_timeout
+        self.__max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.__statement_cache_size = statement_cache_size
+
+        self.__pool_lock = asyncio.Lock()
+
+        self.__checkout_wait_histogram = METRICS.histogram(
+            'db_pool_checkout_wait_seconds', 'Time waiting for a pool connection.', engine='asyncpg',
+        )
+        self.__checkout_timeouts = METRICS.counter(
+            'db_pool_checkout_timeouts_total', 'Pool checkouts that timed out.', engine='asyncpg',
+        )
+        self.__query_histogram = METRICS.histogram(
+            'db_query_duration_seconds', 'Time of a statement on the database, including fetching its rows.',
+            engine='asyncpg',
+        )
+
+    async def get_pool(self) -> Pool:
+        """get_pool.
+
+        :raises InitDBEngineError:
+        """
+
+        if self.__pool is not None:
+            return self.__pool
+
+        async with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = await self.__create_pool()
+
+        return self.__pool
+
+    async def __create_pool(self) -> Pool:
+        """Creates an asyncpg connection pool.
+
+        :raises InitDBEngineError:
+        """
+
+        LOG.info("Trying to create asyncpg pool. min_size=%s, max_size=%s", self.__min_size, self.__max_size)
+
+        try:
+            pool = await asyncpg.create_pool(
+                **self.__connect_kwargs,
+                min_size=self.__min_size,
+                max_size=self.__max_size,
+                max_inactive_connection_lifetime=self.__max_inactive_connection_lifetime,
+                statement_cache_size=self.__statement_cache_size,
+                init=self.__init_connection,
+            )
+
+            LOG.info("Asyncpg pool created successfully")
+
+            return pool
+
+        except Exception as error:
+            LOG.error("Failed to create asyncpg pool | 'err': %s", error)
+
+            raise InitDBEngineError from error
+
+    async def __init_connection(self, conn: Connection) -> None:
+        """Called by the pool for every new connection."""
+
+        conn.add_query_logger(self.__log_query)
+
+    def __log_query(self, record: LoggedQuery) -> None:
+        self.__query_histogram.observe(record.elapsed)
+
+    async def close(self) -> None:
+        """Closes all connections of the pool."""
+
+        if self.__pool is not None:
+            await self.__pool.close()
+
+            self.__pool = None
+
+    @property
+    @asynccontextmanager
+    async def acquire_connection(self):
+        """Async context manager for acquiring a connection.
+        The connection is reset when returned to the pool, so open transactions are rolled back.
+        The wait for a connection is cut to the time left until the deadline of the request.
+
+        :raises BaseDBEngineError:
+        :raises UnknownDBEngineError:
+        :raises DeadlineExceeded: When the deadline of the request passes before a connection is free.
+        """
+
+        pool = await self.get_pool()
+
+        budget = time_left()
+
+        if budget is not None and budget <= 0:
+            raise DeadlineExceeded("Request deadline exceeded before checkout")
+
+        by_deadline = budget is not None and budget < self.__acquire_timeout
+
+        checkout_started_at = perf_counter()
+
+        try:
+            conn = await pool.acquire(timeout=budget if by_deadline else self.__acquire_timeout)
+
+        except asyncio.TimeoutError as error:
+            self.__checkout_timeouts.inc()
+
+            if by_deadline:
+                LOG.warning("Request deadline exceeded waiting for a pool connection, budget=%.3f", budget)
+
+                raise DeadlineExceeded("Request deadline exceeded waiting for a pool connection") from error
+
+            LOG.error("Timed out waiting for a pool connection, acquire_timeout=%s", self.__acquire_timeout)
+
+            raise BaseDBEngineError("Pool timeout") from error
+
+        except (
+                PostgresError,
+                InterfaceError,
+                OSError,
+        ) as error:
+            LOG.error("Failed to acquire connection, 'err': %s", error)
+
+            raise BaseDBEngineError("Connection error") from error
+
+        finally:
+            self.__checkout_wait_histogram.observe(perf_counter() - checkout_started_at)
+
+        try:
+            yield conn
+
+        except (
+                PostgresError,
+                InterfaceError,
+                OSError,
+        ) as error:
+            LOG.error("PostgresError on acquire_connection, 'err': %s", error)
+
+            raise BaseDBEngineError("PostgresError") from error
+
+        except AttributeError as error:
+            LOG.error("AttributeError on acquire_connection, 'err': %s", error)
+
+            raise BaseDBEngineError("AttributeError error") from error
+
+        except (Exception,) as error:
+            LOG.error("Unknown on acquire_connection, 'err': %s", error)
+
+            raise UnknownDBEngineError("Unknown error") from error
+
+        finally:
+            await pool.release(conn)
+
+    def pool_stats(self) -> Dict:
+        """Returns connection pool usage and checkout wait statistics.
+
+        Connections above min_size are reported as overflow.
+        """
+
+        size = self.__pool.get_size() if self.__pool is not None else 0
+        idle = self.__pool.get_idle_size() if self.__pool is not None else 0
+
+        return {
+            'pool_size': self.__min_size,
+            'max_overflow': self.__max_size - self.__min_size,
+            'checked_in': idle,
+            'checked_out': size - idle,
+            'overflow': size - self.__min_size,
+            'checkout_timeouts': self.__checkout_timeouts.value,
+            'checkout_wait': self.__checkout_wait_histogram.snapshot(),
+        }
@@ -0,0 +1,893 @@
+import logging
+
+from functools import lru_cache
+from typing import AsyncIterator, List, Tuple, Type, TypeVar
+
+from asyncpg import PostgresError, Record
+
+from app.dto.task import *
+from app.config import CONFIGURATION
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.batcher import MicroBatcher
+from app.utils.search import like_prefix
+from app.utils.metrics import instrument
+from app.dao.exceptions import (
+    BaseDBEngineError,
+    DBOperationError,
+    DBOperationWarning,
+    DBOperationConflict,
+    UnknownDBEngineError,
+)
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+
+
+__all__ = (
+    'AsyncpgTaskDAO',
+)
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar('T', ReadTaskResponse, CreateTaskResponse, UpdateTaskResponse)
+
+# The status column is the SQLAlchemy Enum(TaskStatus) type, which stores member names.
+
+TASK_TABLE = f'{CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task'
+TASK_COLUMNS = 'id, title, description, status, version'
+UPDATABLE_COLUMNS = ('title', 'description', 'status')
+
+# Text search configuration of the generated search_vector column.
+SEARCH_CONFIG = 'simple'
+
+GET_TASK_QUERY = f'SELECT {TASK_COLUMNS} FROM {TASK_TABLE} WHERE id = $1'
+
+GET_TASKS_BY_IDS_QUERY = f'SELECT {TASK_COLUMNS} FROM {TASK_TABLE} WHERE id = ANY($1::integer[])'
+
+CREATE_TASK_QUERY = (
+    f'INSERT INTO {TASK_TABLE} (title, description, status) VALUES ($1, $2, $3) RETURNING {TASK_COLUMNS}'
+)
+
+# Rows are inserted in ORDINALITY order, so ids drawn from the sequence grow with the input position.
+CREATE_TASKS_QUERY = (
+    f'INSERT INTO {TASK_TABLE} (title, description, status) '
+    f'SELECT title, description, status::taskstatus '
+    f'FROM unnest($1::varchar[], $2::varchar[], $3::text[]) WITH ORDINALITY AS rows (title, description, status, ord) '
+    f'ORDER BY ord '
+    f'RETURNING id'
+)
+
+UPDATE_TASK_QUERY = (
+    f'UPDATE {TASK_TABLE} SET title = $2, description = $3, status = $4, version = version + 1 '
+    f'WHERE id = $1 RETURNING {TASK_COLUMNS}'
+)
+
+UPDATE_TASK_IF_VERSION_QUERY = (
+    f'UPDATE {TASK_TABLE} SET title = $2, description = $3, status = $4, version = version + 1 '
+    f'WHERE id = $1 AND version = $5 RETURNING {TASK_COLUMNS}'
+)
+
+DELETE_TASK_QUERY = f'DELETE FROM {TASK_TABLE} WHERE id = $1 RETURNING id'
+
+# Counters are maintained by triggers on the task table, see SQLAlchemyTaskStatusCountModel.
+
+TASK_STATUS_COUNT_TABLE = f'{CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task_status_count'
+
+GET_TASK_STATS_QUERY = f'SELECT status, sum(count)::bigint AS count FROM {TASK_STATUS_COUNT_TABLE} GROUP BY status'
+
+# Held by the reconciling transaction, so concurrent reconciliations of all workers skip instead of queueing.
+TRY_LOCK_TASK_STATS_QUERY = f"SELECT pg_try_advisory_xact_lock(hashtext('{TASK_STATUS_COUNT_TABLE}'))"
+
+# Counts and counters are read in the same snapshot and the drift is added to shard 0,
+# see RECONCILE_TASK_STATS_QUERY of SQLAlchemyTaskDAO.
+RECONCILE_TASK_STATS_QUERY = (
+    f'WITH counted AS (SELECT status, count(*) AS count FROM {TASK_TABLE} GROUP BY status), '
+    f'stored AS (SELECT status, sum(count) AS count FROM {TASK_STATUS_COUNT_TABLE} GROUP BY status), '
+    f'drift AS ('
+    f'SELECT coalesce(counted.status, stored.status) AS status, '
+    f'coalesce(counted.count, 0)::bigint AS counted, coalesce(stored.count, 0)::bigint AS stored '
+    f'FROM counted FULL JOIN stored ON counted.status = stored.status'
+    f'), applied AS ('
+    f'INSERT INTO {TASK_STATUS_COUNT_TABLE} AS counter (status, shard, count) '
+    f'SELECT status, 0, counted - stored FROM drift WHERE counted <> stored ORDER BY status '
+    f'ON CONFLICT (status, shard) DO UPDATE SET count = counter.count + EXCLUDED.count'
+    f') '
+    f'SELECT status, counted, stored FROM drift'
+)
+
+
+def _where(conditions: List[str]) -> str:
+    return f' WHERE {" AND ".join(conditions)}' if conditions else ''
+
+
+@lru_cache(maxsize=None)
+def _list_query(by_status: bool, after_id: bool) -> str:
+    """Arguments: [status], [after_id], limit."""
+
+    conditions = []
+
+    if by_status:
+        conditions.append(f'status = ${len(conditions) + 1}')
+
+    if after_id:
+        conditions.append(f'id > ${len(conditions) + 1}')
+
+    return f'SELECT {TASK_COLUMNS} FROM {TASK_TABLE}{_where(conditions)} ORDER BY id LIMIT ${len(conditions) + 1}'
+
+
+@lru_cache(maxsize=None)
+def _stream_query(by_status: bool) -> str:
+    """Arguments: [status]."""
+
+    return f'SELECT {TASK_COLUMNS} FROM {TASK_TABLE}{_where(["status = $1"] if by_status else [])} ORDER BY id'
+
+
+@lru_cache(maxsize=None)
+def _search_query(fuzzy: bool, after: bool) -> str:
+    """Arguments: q, [prefix], max_candidates, [after_rank, after_id], limit.
+
+    All matches are ranked, pages are taken from the max_candidates best of them.
+    """
+
+    ts_query = f"websearch_to_tsquery('{SEARCH_CONFIG}'::regconfig, $1)"
+    condition = f'search_vector @@ {ts_query}'
+    rank = f'ts_rank_cd(search_vector, {ts_query})'
+    index = 1
+
+    if fuzzy:
+        index += 1
+        condition = f'({condition} OR title % $1 OR title ILIKE ${index})'
+        rank = f'greatest({rank}, similarity(title, $1))'
+
+    index += 1
+    candidates = (
+        f'SELECT {TASK_COLUMNS}, {rank} AS rank FROM {TASK_TABLE} WHERE {condition} '
+        f'ORDER BY rank DESC, id DESC LIMIT ${index}'
+    )
+
+    conditions = []
+
+    if after:
+        conditions.append(f'(rank, id) < (${index + 1}::float8, ${index + 2}::integer)')
+        index += 2
+
+    return (
+        f'SELECT {TASK_COLUMNS}, rank FROM ({candidates}) AS candidates{_where(conditions)} '
+        f'ORDER BY rank DESC, id DESC LIMIT ${index + 1}'
+    )
+
+
+@lru_cache(maxsize=None)
+def _batch_query(prefix: str, columns: Tuple[str, ...], by_ids: bool, by_status: bool) -> str:
+    """Arguments: values of columns, [ids], [status]."""
+
+    index = len(columns)
+    conditions = []
+
+    if by_ids:
+        index += 1
+        conditions.append(f'id = ANY(${index}::integer[])')
+
+    if by_status:
+        index += 1
+        conditions.append(f'status = ${index}')
+
+    assignments = ', '.join(
+        (*(f'{column} = ${position}' for position, column in enumerate(columns, 1)), 'version = version + 1')
+    )
+
+    return f'{prefix}{" SET " + assignments if columns else ""}{_where(conditions)} RETURNING id'
+
+
+def _status_name(status: TaskStatus | None) -> str | None:
+    return status.name if status is not None else None
+
+
+def _to_task(dto: Type[T], record: Record) -> T:
+    return dto(
+        id=record['id'],
+        title=record['title'],
+        description=record['description'],
+        status=TaskStatus[record['status']],
+        version=record['version'],
+    )
+
+
+def _to_tasks(records: List[Record]) -> List[ReadTaskResponse]:
+    return READ_TASK_LIST_ADAPTER.validate_python([
+        {
+            'id': record['id'],
+            'title': record['title'],
+            'description': record['description'],
+            'status': TaskStatus[record['status']],
+            'version': record['version'],
+        }
+        for record in records
+    ])
+
+
+def _to_stats(records: List[Record], column: str = 'count') -> TaskStatsResponse:
+    counts = dict.fromkeys(TaskStatus, 0)
+    counts.update((TaskStatus[record['status']], record[column]) for record in records)
+
+    return TaskStatsResponse(counts=counts, total=sum(counts.values()))
+
+
+class AsyncpgTaskDAO:
+    """Task DAO running hand-written SQL on a native asyncpg pool.
+
+    Interchangeable with SQLAlchemyTaskDAO, the query builder and result processing layers are skipped.
+    Pages of records are validated with one READ_TASK_LIST_ADAPTER call.
+    """
+
+    __slots__ = (
+        '__db_engine',
+        '__get_batcher',
+    )
+
+    def __init__(
+            self,
+            db_engine: AsyncpgDBEngine,
+            get_batch_window: float | None = None,
+            get_batch_max_size: int = 256,
+    ) -> None:
+        """Initialization.
+
+        :param db_engine: AsyncpgDBEngine.
+        :param get_batch_window: Seconds to collect concurrent get calls into one query,
+            0 for one event loop tick, None to disable batching.
+        :param get_batch_max_size: Max number of ids in one batched query.
+        """
+
+        self.__db_engine = db_engine
+        self.__get_batcher: MicroBatcher[int, ReadTaskResponse | None] | None = None
+
+        if get_batch_window is not None:
+            self.__get_batcher = MicroBatcher(self.__get_many, get_batch_window, get_batch_max_size)
+
+    @instrument('dao')
+    async def get(self, task_id: int) -> ReadTaskResponse | None:
+        """Gets task.
+
+        :param task_id:
+        :returns: TaskDTO if found, else None.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get request: task_id=%s", task_id)
+
+        if self.__get_batcher is not None:
+            return await self.__get_batcher.submit(task_id)
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                task_raw = await conn.fetchrow(GET_TASK_QUERY, task_id)
+
+            found_task = _to_task(ReadTaskResponse, task_raw) if task_raw else None
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return found_task
+
+    @instrument('dao')
+    async def get_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of task list ordered by id.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Page of tasks and cursor of the next page.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_list request: filter_parameters=%s", filter_parameters)
+
+        try:
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+
+            arguments = []
+
+            if filter_parameters.status:
+                arguments.append(filter_parameters.status.name)
+
+            if filter_parameters.after:
+                after_id, = decode_cursor(filter_parameters.after)
+                arguments.append(int(after_id))
+
+            arguments.append(limit + 1)
+
+            query = _list_query(bool(filter_parameters.status), bool(filter_parameters.after))
+
+            async with self.__db_engine.acquire_connection as conn:
+                task_list_raw = await conn.fetch(query, *arguments)
+
+            found_task_list = _to_tasks(task_list_raw[:limit])
+            next_cursor = encode_cursor(found_task_list[-1].id) if len(task_list_raw) > limit else None
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    @instrument('dao')
+    async def search(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of tasks matching the words of q, best ranked first.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Page of tasks and cursor of the next page.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO search request: filter_parameters=%s", filter_parameters)
+
+        try:
+            if not filter_parameters.q.strip():
+                raise ValueError("Search query is empty")
+
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+            fuzzy = CONFIGURATION.DB_SETTINGS.DB_SEARCH_FUZZY
+
+            arguments = [filter_parameters.q]
+
+            if fuzzy:
+                arguments.append(like_prefix(filter_parameters.q))
+
+            arguments.append(CONFIGURATION.DB_SETTINGS.DB_SEARCH_MAX_CANDIDATES)
+
+            if filter_parameters.after:
+                after_rank, after_id = decode_cursor(filter_parameters.after)
+                arguments.extend((float(after_rank), int(after_id)))
+
+            arguments.append(limit + 1)
+
+            query = _search_query(fuzzy, bool(filter_parameters.after))
+
+            async with self.__db_engine.acquire_connection as conn:
+                task_list_raw = await conn.fetch(query, *arguments)
+
+            found_task_list = _to_tasks(task_list_raw[:limit])
+            next_cursor = (
+                encode_cursor(task_list_raw[limit - 1]['rank'], found_task_list[-1].id)
+                if len(task_list_raw) > limit else None
+            )
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    async def stream_list(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        """Streams all tasks ordered by id over a server-side cursor.
+
+        Rows are prefetched in batches of DB_STREAM_FETCH_SIZE.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Async iterator of found tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO stream_list request: filter_parameters=%s", filter_parameters)
+
+        try:
+            query = _stream_query(bool(filter_parameters.status))
+            arguments = [filter_parameters.status.name] if filter_parameters.status else []
+
+            async with self.__db_engine.acquire_connection as conn:
+                async with conn.transaction():
+                    async for record in conn.cursor(
+                            query,
+                            *arguments,
+                            prefetch=CONFIGURATION.DB_SETTINGS.DB_STREAM_FETCH_SIZE,
+                    ):
+                        yield _to_task(ReadTaskResponse, record)
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+    @instrument('dao')
+    async def create(self, task: CreateTaskRequest) -> CreateTaskResponse:
+        """Creates task.
+
+        :param task: TaskDTO.
+        :returns: TaskDTO of create task.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create request: task=%s", task)
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                task_raw = await conn.fetchrow(CREATE_TASK_QUERY, task.title, task.description, task.status.name)
+
+            created_task = _to_task(CreateTaskResponse, task_raw)
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return created_task
+
+    @instrument('dao')
+    async def create_many(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        """Creates tasks in a single transaction.
+
+        Rows are sent as arrays to INSERT ... SELECT FROM unnest(...), DB_INSERT_BATCH_SIZE rows per statement.
+
+        :param tasks: List of TaskDTO.
+        :returns: Ids of created tasks in input order.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create_many request: tasks_count=%s", len(tasks))
+
+        if not tasks:
+            return CreateTaskBatchResponse(ids=[])
+
+        try:
+            batch_size = CONFIGURATION.DB_SETTINGS.DB_INSERT_BATCH_SIZE
+            created_ids = []
+
+            async with self.__db_engine.acquire_connection as conn:
+                async with conn.transaction():
+                    for start in range(0, len(tasks), batch_size):
+                        chunk = tasks[start:start + batch_size]
+
+                        ids_raw = await conn.fetch(
+                            CREATE_TASKS_QUERY,
+                            [task.title for task in chunk],
+                            [task.description for task in chunk],
+                            [task.status.name for task in chunk],
+                        )
+
+                        created_ids.extend(sorted(record['id'] for record in ids_raw))
+
+            created_tasks = CreateTaskBatchResponse(ids=created_ids)
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return created_tasks
+
+    @instrument('dao')
+    async def update(self, task_id: int, task: UpdateTaskRequest, expected_version: int | None = None) -> UpdateTaskResponse:
+        """Updates task and increments its version.
+
+        :param task_id: Task id.
+        :param task: TaskDTO.
+        :param expected_version: Version the task must still have, None to update any version.
+        :returns: TaskDTO of updated task.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        :raises DBOperationConflict: When task exists at another version.
+        """
+
+        LOG.info("DAO update request: task_id=%s, expected_version=%s, task=%s", task_id, expected_version, task)
+
+        conflict = False
+
+        try:
+            arguments = [task_id, task.title, task.description, _status_name(task.status)]
+
+            if expected_version is not None:
+                arguments.append(expected_version)
+
+            query = UPDATE_TASK_QUERY if expected_version is None else UPDATE_TASK_IF_VERSION_QUERY
+
+            async with self.__db_engine.acquire_connection as conn:
+                updated_task_raw = await conn.fetchrow(query, *arguments)
+
+                if updated_task_raw is None and expected_version is not None:
+                    conflict = await conn.fetchrow(GET_TASK_QUERY, task_id) is not None
+
+            if updated_task_raw is not None:
+                updated_task = _to_task(UpdateTaskResponse, updated_task_raw)
+
+            elif not conflict:
+                raise ValueError(f"Task {task_id} not found")
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        if conflict:
+            LOG.warning("DAO conflict: task_id=%s is not at version %s", task_id, expected_version)
+
+            raise DBOperationConflict(f"Task {task_id} is not at version {expected_version}")
+
+        return updated_task
+
+    @instrument('dao')
+    async def delete(self, task_id: int) -> DeleteTaskResponse:
+        """Deletes task.
+
+        :param task_id: Task id.
+        :returns: TaskDTO of deleted task.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO delete request: task_id=%s", task_id)
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                deleted_id = await conn.fetchval(DELETE_TASK_QUERY, task_id)
+
+            if deleted_id is None:
+                raise ValueError(f"Task {task_id} not found")
+
+            deleted_task = DeleteTaskResponse(id=deleted_id)
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return deleted_task
+
+    @instrument('dao')
+    async def update_many(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        """Updates all tasks matching the filter with a single UPDATE ... RETURNING statement.
+
+        :param batch: Filter by ids and/or status and values to set.
+        :returns: Ids and count of updated tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO update_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            values = batch.values.model_dump(exclude_unset=True)
+
+            if not values:
+                raise ValueError("No values to update")
+
+            if 'status' in values:
+                values['status'] = _status_name(values['status'])
+
+            columns = tuple(column for column in UPDATABLE_COLUMNS if column in values)
+            query, arguments = self.__batch_query(f'UPDATE {TASK_TABLE}', columns, batch.filter)
+
+            async with self.__db_engine.acquire_connection as conn:
+                ids_raw = await conn.fetch(query, *(values[column] for column in columns), *arguments)
+
+            updated_ids = [record['id'] for record in ids_raw]
+            updated_tasks = UpdateTaskBatchResponse(ids=updated_ids, count=len(updated_ids))
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return updated_tasks
+
+    @instrument('dao')
+    async def delete_many(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        """Deletes all tasks matching the filter with a single DELETE ... RETURNING statement.
+
+        :param batch: Filter by ids and/or status.
+        :returns: Ids and count of deleted tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO delete_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            query, arguments = self.__batch_query(f'DELETE FROM {TASK_TABLE}', (), batch.filter)
+
+            async with self.__db_engine.acquire_connection as conn:
+                ids_raw = await conn.fetch(query, *arguments)
+
+            deleted_ids = [record['id'] for record in ids_raw]
+            deleted_tasks = DeleteTaskBatchResponse(ids=deleted_ids, count=len(deleted_ids))
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return deleted_tasks
+
+    @instrument('dao')
+    async def get_stats(self) -> TaskStatsResponse:
+        """Gets number of tasks by status from the counter table.
+
+        :returns: Counts of every status and total.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_stats request")
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                stats_raw = await conn.fetch(GET_TASK_STATS_QUERY)
+
+            stats = _to_stats(stats_raw)
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return stats
+
+    @instrument('dao')
+    async def reconcile_stats(self) -> TaskStatsResponse:
+        """Recounts tasks by status and corrects the counter table by the drift.
+
+        Scans the whole task table without blocking writers. Only one reconciliation runs at a time
+        across all processes.
+
+        :returns: Recounted counts of every status and total.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        :raises DBOperationConflict: When another reconciliation is running.
+        """
+
+        LOG.info("DAO reconcile_stats request")
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                async with conn.transaction():
+                    locked = await conn.fetchval(TRY_LOCK_TASK_STATS_QUERY)
+                    stats_raw = await conn.fetch(RECONCILE_TASK_STATS_QUERY) if locked else []
+
+            stats = _to_stats(stats_raw, 'counted')
+            stats_before = _to_stats(stats_raw, 'stored')
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        if not locked:
+            LOG.info("DAO reconcile_stats skipped, another reconciliation is running")
+
+            raise DBOperationConflict("Task counters are being reconciled")
+
+        if stats != stats_before:
+            LOG.warning("Task counters drifted: counted=%s, stored=%s", stats.counts, stats_before.counts)
+
+        return stats
+
+    @instrument('dao', 'get_many')
+    async def __get_many(self, task_ids: List[int]) -> List[ReadTaskResponse | None]:
+        """Gets tasks by ids with a single id = ANY($1) query.
+
+        :param task_ids: Task ids, may contain duplicates.
+        :returns: TaskDTO or None for every requested id, in the same order.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_many request: ids_count=%s", len(task_ids))
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                task_list_raw = await conn.fetch(GET_TASKS_BY_IDS_QUERY, list(set(task_ids)))
+
+            found_tasks = {task.id: task for task in _to_tasks(task_list_raw)}
+
+        except (
+                PostgresError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return [found_tasks.get(task_id) for task_id in task_ids]
+
+    @staticmethod
+    def __batch_query(prefix: str, columns: Tuple[str, ...], filter_parameters: TaskBatchFilter) -> tuple:
+        """Builds the batch statement for the filter. Ids are bound as a single array: id = ANY($n).
+
+        :param prefix: UPDATE or DELETE FROM clause.
+        :param columns: Columns to set, their values are bound first.
+        :param filter_parameters: Filter by ids and/or status.
+        :returns: Statement and its filter arguments.
+        :raises ValueError: When filter is empty, so the statement would touch the whole table.
+        """
+
+        by_ids = filter_parameters.ids is not None
+        by_status = filter_parameters.status is not None
+
+        if not (by_ids or by_status):
+            raise ValueError("Batch filter must contain ids or status")
+
+        arguments = []
+
+        if by_ids:
+            arguments.append(filter_parameters.ids)
+
+        if by_status:
+            arguments.append(filter_parameters.status.name)
+
+        return _batch_query(prefix, columns, by_ids, by_status), arguments
@@ -0,0 +1,186 @@
+import json
+import asyncio
+import logging
+
+from asyncpg import Connection, PostgresError, InterfaceError
+import asyncpg
+
+from app.dto.task import TaskEvent, TaskEventType, TaskStatus
+from app.utils.metrics import METRICS
+from app.utils.event_broker import EventBroker
+
+
+__all__ = (
+    'TaskEventListener',
+    'TASK_EVENTS_CHANNEL',
+)
+
+LOG = logging.getLogger(__name__)
+
+# Channel the triggers of the task table notify, see the task_events migration.
+TASK_EVENTS_CHANNEL = 'task_events'
+
+
+class TaskEventListener:
+    """Listens to task change notifications on a dedicated connection and publishes them to a broker.
+
+    One connection per worker, outside of the pool, receives the changes of all tasks.
+    The connection is pinged every ping_interval seconds and opened again when it is lost.
+    Notifications sent meanwhile are lost, so the broker is reset on every connect.
+    """
+
+    __slots__ = (
+        '__connect_kwargs',
+        '__broker',
+        '__ping_interval',
+        '__reconnect_interval',
+        '__task',
+        '__reconnects',
+    )
+
+    def __init__(
+            self,
+            broker: EventBroker[TaskEvent],
+            username: str,
+            password: str,
+            host: str,
+            port: int,
+            database: str,
+            ping_interval: float = 15.0,
+            reconnect_interval: float = 1.0,
+    ) -> None:
+        """Initialization.
+
+        :param broker: Broker the events are published to.
+        :param username:
+        :param password:
+        :param host:
+        :param port:
+        :param database:
+        :param ping_interval: Seconds between checks of the connection.
+        :param reconnect_interval: Seconds to wait before opening a lost connection again.
+        """
+
+        self.__connect_kwargs = {
+            "user": username,
+            "password": password,
+            "host": host,
+            "port": port,
+            "database": database,
+        }
+
+        self.__broker = broker
+        self.__ping_interval = ping_interval
+        self.__reconnect_interval = reconnect_interval
+        self.__task: asyncio.Task | None = None
+
+        self.__reconnects = METRICS.counter(
+            'task_events_listener_reconnects_total', 'Connections of the task events listener that were lost.',
+        )
+
+    def start(self) -> None:
+        """Starts listening in a background task."""
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def close(self) -> None:
+        """Stops listening and closes the connection."""
+
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+
+        try:
+            await self.__task
+
+        except asyncio.CancelledError:
+            pass
+
+        self.__task = None
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                await self.__listen()
+
+            except (
+                    PostgresError,
+                    InterfaceError,
+                    OSError,
+                    TimeoutError,
+            ) as error:
+                LOG.warning("Task events listener disconnected, reconnecting in %ss. err=%s",
+                            self.__reconnect_interval, error)
+
+            self.__reconnects.inc()
+
+            await asyncio.sleep(self.__reconnect_interval)
+
+    async def __listen(self) -> None:
+        """Listens until the connection is lost.
+
+        :raises PostgresError:
+        :raises InterfaceError:
+        :raises OSError:
+        :raises TimeoutError: When the connection does not answer a ping.
+        """
+
+        conn: Connection = await asyncpg.connect(**self.__connect_kwargs, timeout=self.__ping_interval)
+
+        try:
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _: lost.set())
+
+            await conn.add_listener(TASK_EVENTS_CHANNEL, self.__notify)
+
+            # Changes made while nobody listened are unknown, subscribers reload.
+            self.__broker.reset()
+
+            LOG.info("Listening to task events. channel=%s", TASK_EVENTS_CHANNEL)
+
+            while not lost.is_set():
+                try:
+                    async with asyncio.timeout(self.__ping_interval):
+                        await lost.wait()
+
+                except TimeoutError:
+                    await conn.execute('SELECT 1', timeout=self.__ping_interval)
+
+            LOG.warning("Task events connection was closed by the server")
+
+        finally:
+            conn.terminate()
+
+    def __notify(self, conn: Connection, pid: int, channel: str, payload: str) -> None:
+        """Publishes the event of a notification, called by asyncpg in the event loop."""
+
+        try:
+            values = json.loads(payload)
+
+            if values['type'] == 'reset':
+                self.__broker.reset()
+
+                return
+
+            event = TaskEvent(
+                id=values['id'],
+                type=TaskEventType(values['type']),
+                task_id=values['task_id'],
+                # The status column stores member names.
+                status=TaskStatus[values['status']],
+                previous_status=TaskStatus[values['previous_status']] if values['previous_status'] else None,
+                version=values['version'],
+            )
+
+        except (
+                ValueError,
+                KeyError,
+                TypeError,
+        ) as error:
+            LOG.warning("Malformed task event: %s. err=%s", payload, error)
+
+            return
+
+        self.__broker.publish(event)
@@ -0,0 +1,242 @@
+import sys
+import logging
+
+from typing import AsyncIterator, List
+
+from app.dto.task import *
+from app.dao.task import TaskDAO
+from app.dao.exceptions import DBOperationError
+from app.utils.lru_cache import LRUCache
+from app.utils.event_broker import EventBroker, RESET, SubscriptionDropped
+from app.utils.request_context import reads_pinned_to_primary
+
+
+__all__ = (
+    'CachedTaskDAO',
+    'estimate_task_size',
+)
+
+LOG = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Seconds a follower waits for task events at once, it waits again right after.
+_FOLLOW_TIMEOUT = 60.0
+
+_TASK_SAMPLE = ReadTaskResponse.model_construct(id=0, title='', description='', status=TaskStatus.TODO, version=1)
+_TASK_OVERHEAD = sys.getsizeof(_TASK_SAMPLE) + sys.getsizeof(_TASK_SAMPLE.__dict__)
+
+
+def estimate_task_size(task: ReadTaskResponse | None) -> int:
+    """Estimates memory taken by a cached task in bytes.
+
+    :param task: Cached task, None for negatively cached lookups.
+    """
+
+    if task is None:
+        return sys.getsizeof(None)
+
+    return _TASK_OVERHEAD + sys.getsizeof(task.title) + sys.getsizeof(task.description)
+
+
+class CachedTaskDAO:
+    """Read-through cache in front of another task DAO.
+
+    get results, including not found ones, are cached by task id. Writes refresh
+    or invalidate the affected entries. Reads that raced with a write are not
+    cached, so a stale row can not overwrite a fresher one.
+
+    The cache belongs to one process. Writes of other processes reach it through follow,
+    without it their tasks are served stale for up to the time to live of the cache.
+    """
+
+    __slots__ = (
+        '__task_dao',
+        '__cache',
+        '__negative_ttl',
+        '__replica_reads',
+        '__generation',
+    )
+
+    def __init__(self, task_dao: TaskDAO, cache: LRUCache, negative_ttl: float, replica_reads: bool = False) -> None:
+        """Initialization.
+
+        :param task_dao: Wrapped DAO.
+        :param cache: Cache storing tasks by id.
+        :param negative_ttl: Time to live of not found lookups in seconds.
+        :param replica_reads: Whether the wrapped DAO may read from lagging replicas,
+            then only lookups pinned to the primary are cached.
+        """
+
+        self.__task_dao = task_dao
+        self.__cache = cache
+        self.__negative_ttl = negative_ttl
+        self.__replica_reads = replica_reads
+        self.__generation = 0
+
+    async def follow(self, task_events: EventBroker[TaskEvent]) -> None:
+        """Invalidates entries of the tasks changed by any process, until cancelled.
+
+        Everything is dropped when events may have been lost.
+
+        :param task_events: Broker of the change feed.
+        """
+
+        while True:
+            subscription = task_events.subscribe()
+
+            try:
+                while True:
+                    for event in await subscription.get(_FOLLOW_TIMEOUT):
+                        if event is RESET:
+                            self.__invalidate_all()
+
+                        else:
+                            self.__invalidate((event.task_id,))
+
+            except SubscriptionDropped:
+                self.__invalidate_all()
+
+            finally:
+                task_events.unsubscribe(subscription)
+
+    async def get(self, task_id: int) -> ReadTaskResponse | None:
+        """Gets task from cache or from wrapped DAO on miss.
+
+        :param task_id:
+        :returns: TaskDTO if found, else None.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        found_task = self.__cache.get(task_id, _MISSING)
+
+        if found_task is not _MISSING:
+            return found_task
+
+        generation = self.__generation
+
+        found_task = await self.__task_dao.get(task_id)
+
+        if generation == self.__generation and (not self.__replica_reads or reads_pinned_to_primary()):
+            if found_task is None:
+                self.__cache.set(task_id, None, ttl=self.__negative_ttl)
+
+            else:
+                self.__cache.set(task_id, found_task)
+
+        return found_task
+
+    async def get_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        """Gets task list from wrapped DAO."""
+
+        return await self.__task_dao.get_list(filter_parameters)
+
+    async def search(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        """Searches tasks in wrapped DAO."""
+
+        return await self.__task_dao.search(filter_parameters)
+
+    def stream_list(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        """Streams task list from wrapped DAO."""
+
+        return self.__task_dao.stream_list(filter_parameters)
+
+    async def create(self, task: CreateTaskRequest) -> CreateTaskResponse:
+        """Creates task and caches it, replacing a negatively cached lookup of its id."""
+
+        created_task = await self.__task_dao.create(task)
+
+        self.__generation += 1
+        self.__cache.set(created_task.id, ReadTaskResponse(**created_task.model_dump()))
+
+        return created_task
+
+    async def create_many(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        """Creates tasks and drops negatively cached lookups of their ids."""
+
+        created_tasks = await self.__task_dao.create_many(tasks)
+
+        self.__invalidate(created_tasks.ids)
+
+        return created_tasks
+
+    async def update(self, task_id: int, task: UpdateTaskRequest, expected_version: int | None = None) -> UpdateTaskResponse:
+        """Updates task and refreshes its entry."""
+
+        try:
+            updated_task = await self.__task_dao.update(task_id, task, expected_version)
+
+        except Exception:
+            self.__invalidate((task_id,))
+
+            raise
+
+        self.__generation += 1
+        self.__cache.set(task_id, ReadTaskResponse(**updated_task.model_dump()))
+
+        return updated_task
+
+    async def update_many(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        """Updates tasks and invalidates their entries."""
+
+        try:
+            updated_tasks = await self.__task_dao.update_many(batch)
+
+        except DBOperationError:
+            self.__invalidate_all()
+
+            raise
+
+        self.__invalidate(updated_tasks.ids)
+
+        return updated_tasks
+
+    async def delete(self, task_id: int) -> DeleteTaskResponse:
+        """Deletes task and invalidates its entry."""
+
+        try:
+            return await self.__task_dao.delete(task_id)
+
+        finally:
+            self.__invalidate((task_id,))
+
+    async def delete_many(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        """Deletes tasks and invalidates their entries."""
+
+        try:
+            deleted_tasks = await self.__task_dao.delete_many(batch)
+
+        except DBOperationError:
+            self.__invalidate_all()
+
+            raise
+
+        self.__invalidate(deleted_tasks.ids)
+
+        return deleted_tasks
+
+    async def get_stats(self) -> TaskStatsResponse:
+        """Gets task counters from wrapped DAO, they are cheap to read and are not cached."""
+
+        return await self.__task_dao.get_stats()
+
+    async def reconcile_stats(self) -> TaskStatsResponse:
+        """Recomputes task counters in wrapped DAO."""
+
+        return await self.__task_dao.reconcile_stats()
+
+    def __invalidate(self, task_ids: List[int] | tuple) -> None:
+        self.__generation += 1
+
+        for task_id in task_ids:
+            self.__cache.delete(task_id)
+
+    def __invalidate_all(self) -> None:
+        """Drops the whole cache when the outcome of a batch write or the changed tasks are unknown."""
+
+        if len(self.__cache):
+            LOG.warning("Task cache is cleared")
+
+        self.__generation += 1
+        self.__cache.clear()
@@ -0,0 +1,32 @@
+__all__ = (
+    'BaseDBEngineError',
+    'UnknownDBEngineError',
+    'InitDBEngineError',
+    'DBOperationError',
+    'DBOperationWarning',
+    'DBOperationConflict',
+)
+
+
+class BaseDBEngineError(Exception):
+    """BaseDBEngineError"""
+
+
+class InitDBEngineError(BaseDBEngineError):
+    """InitDBEngineError"""
+
+
+class UnknownDBEngineError(BaseDBEngineError):
+    """UnknownDBEngineError"""
+
+
+class DBOperationError(BaseDBEngineError):
+    """DBOperationError"""
+
+
+class DBOperationWarning(BaseDBEngineError):
+    """DBOperationWarning"""
+
+
+class DBOperationConflict(BaseDBEngineError):
+    """DBOperationConflict"""
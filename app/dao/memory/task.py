@@ -0,0 +1,720 @@
+import os
+import re
+import json
+import heapq
+import asyncio
+import logging
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Set, Type, TypeVar
+
+from app.dto.task import *
+from app.config import CONFIGURATION
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.metrics import instrument
+from app.dao.exceptions import (
+    InitDBEngineError,
+    DBOperationError,
+    DBOperationWarning,
+    DBOperationConflict,
+)
+
+
+__all__ = (
+    'InMemoryTaskDAO',
+)
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar('T', ReadTaskResponse, CreateTaskResponse, UpdateTaskResponse)
+
+SNAPSHOT_FORMAT = 1
+
+# Same tokens as the 'simple' text search configuration of the database: lower-cased words.
+_WORD = re.compile(r'\w+')
+
+# Past this many ids a sorted index is rebuilt in one pass, below it deleting one by one (a memmove each) is cheaper.
+_REBUILD_THRESHOLD = 1024
+
+
+def _words(text: str | None) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+def _remove_ids(ids: List[int], removed: Set[int]) -> None:
+    """Removes removed from the sorted list ids in place."""
+
+    if len(removed) > _REBUILD_THRESHOLD:
+        ids[:] = [task_id for task_id in ids if task_id not in removed]
+
+        return
+
+    for task_id in removed:
+        position = bisect_left(ids, task_id)
+
+        if position < len(ids) and ids[position] == task_id:
+            del ids[position]
+
+
+class _TaskRecord:
+    """Stored task, a fixed set of slots instead of a model with its validators and __dict__."""
+
+    __slots__ = (
+        'id',
+        'title',
+        'description',
+        'status',
+        'version',
+    )
+
+    def __init__(self, task_id: int, title: str, description: str | None, status: TaskStatus, version: int) -> None:
+        self.id = task_id
+        self.title = title
+        self.description = description
+        self.status = status
+        self.version = version
+
+    def to_dto(self, dto: Type[T]) -> T:
+        return dto.model_construct(
+            id=self.id,
+            title=self.title,
+            description=self.description,
+            status=self.status,
+            version=self.version,
+        )
+
+
+class InMemoryTaskDAO:
+    """Task DAO keeping all tasks in process memory, for benchmarks, tests and single node deployments.
+
+    Tasks are kept in a map by id. Sorted id lists, one of all tasks and one per status,
+    serve get_list and stream_list pages with a bisect, so a page costs O(log n + limit)
+    whatever the size of the table. An inverted index of title and description words serves search.
+    Operations run without awaiting, so each of them is atomic in the event loop.
+
+    Tasks are lost with the process unless snapshot_path is set: the tasks are then loaded from it
+    on start and written to it by save_snapshot, atomically, through a temporary file.
+    Every worker process has its own tasks, so run a single worker.
+    """
+
+    __slots__ = (
+        '__tasks',
+        '__ids',
+        '__ids_by_status',
+        '__ids_by_word',
+        '__next_id',
+        '__snapshot_path',
+        '__changes',
+        '__saved_changes',
+        '__snapshot_lock',
+    )
+
+    def __init__(self, snapshot_path: str | None = None) -> None:
+        """Initialization.
+
+        :param snapshot_path: File the tasks are loaded from and saved to, None to keep them in memory only.
+        :raises InitDBEngineError: When the snapshot exists but can not be loaded.
+        """
+
+        self.__tasks: Dict[int, _TaskRecord] = {}
+        self.__ids: List[int] = []
+        self.__ids_by_status: Dict[TaskStatus, List[int]] = {status: [] for status in TaskStatus}
+        self.__ids_by_word: Dict[str, Set[int]] = {}
+        self.__next_id = 1
+        self.__snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.__changes = 0
+        self.__saved_changes = 0
+        self.__snapshot_lock = asyncio.Lock()
+
+        if self.__snapshot_path is not None:
+            self.__load_snapshot()
+
+    @instrument('dao')
+    async def get(self, task_id: int) -> ReadTaskResponse | None:
+        """Gets task.
+
+        :param task_id:
+        :returns: TaskDTO if found, else None.
+        """
+
+        LOG.info("DAO get request: task_id=%s", task_id)
+
+        record = self.__tasks.get(task_id)
+
+        return record.to_dto(ReadTaskResponse) if record is not None else None
+
+    @instrument('dao')
+    async def get_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of task list ordered by id.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Page of tasks and cursor of the next page.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_list request: filter_parameters=%s", filter_parameters)
+
+        try:
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+            ids = self.__ids if filter_parameters.status is None else self.__ids_by_status[filter_parameters.status]
+            start = 0
+
+            if filter_parameters.after:
+                after_id, = decode_cursor(filter_parameters.after)
+                start = bisect_right(ids, int(after_id))
+
+            page_ids = ids[start:start + limit + 1]
+
+            found_task_list = [self.__tasks[task_id].to_dto(ReadTaskResponse) for task_id in page_ids[:limit]]
+            next_cursor = encode_cursor(found_task_list[-1].id) if len(page_ids) > limit else None
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    @instrument('dao')
+    async def search(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of tasks containing all words of q, best ranked first.
+
+        Words are matched exactly, lower-cased, in title and description. The rank is the number
+        of occurrences of the words. Results are capped to the DB_SEARCH_MAX_CANDIDATES best matches.
+        Search operators of websearch_to_tsquery and fuzzy matching are not supported.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Page of tasks and cursor of the next page.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO search request: filter_parameters=%s", filter_parameters)
+
+        try:
+            if not filter_parameters.q.strip():
+                raise ValueError("Search query is empty")
+
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+            words = set(_words(filter_parameters.q))
+            postings = sorted((self.__ids_by_word.get(word, set()) for word in words), key=len)
+
+            matched_ids = set.intersection(*postings) if postings else set()
+
+            ranked = []
+
+            for task_id in matched_ids:
+                record = self.__tasks[task_id]
+                occurrences = Counter(_words(record.title) + _words(record.description))
+                ranked.append((float(sum(occurrences[word] for word in words)), task_id))
+
+            ranked = heapq.nlargest(CONFIGURATION.DB_SETTINGS.DB_SEARCH_MAX_CANDIDATES, ranked)
+
+            if filter_parameters.after:
+                after_rank, after_id = decode_cursor(filter_parameters.after)
+                after = (float(after_rank), int(after_id))
+                ranked = [key for key in ranked if key < after]
+
+            page = ranked[:limit + 1]
+
+            found_task_list = [self.__tasks[task_id].to_dto(ReadTaskResponse) for _, task_id in page[:limit]]
+            next_cursor = encode_cursor(*page[limit - 1]) if len(page) > limit else None
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    async def stream_list(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        """Streams all tasks ordered by id.
+
+        Pages of DB_STREAM_FETCH_SIZE tasks are read from the index, giving control back
+        to the event loop between them. Tasks deleted while streaming are skipped.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Async iterator of found tasks.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO stream_list request: filter_parameters=%s", filter_parameters)
+
+        try:
+            fetch_size = CONFIGURATION.DB_SETTINGS.DB_STREAM_FETCH_SIZE
+            last_id = 0
+
+            while True:
+                # Looked up for every page, writes between pages may have replaced the index.
+                ids = self.__ids if filter_parameters.status is None else self.__ids_by_status[filter_parameters.status]
+                start = bisect_right(ids, last_id)
+                page_ids = ids[start:start + fetch_size]
+
+                if not page_ids:
+                    break
+
+                last_id = page_ids[-1]
+
+                for task_id in page_ids:
+                    record = self.__tasks.get(task_id)
+
+                    if record is not None and (filter_parameters.status is None or record.status == filter_parameters.status):
+                        yield record.to_dto(ReadTaskResponse)
+
+                await asyncio.sleep(0)
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+    @instrument('dao')
+    async def create(self, task: CreateTaskRequest) -> CreateTaskResponse:
+        """Creates task.
+
+        :param task: TaskDTO.
+        :returns: TaskDTO of create task.
+        :raises DBOperationError: When task breaks a constraint of the table.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create request: task=%s", task)
+
+        try:
+            self.__check(task.model_dump())
+
+            record = self.__insert(task)
+
+        except (
+                AttributeError,
+                TypeError,
+                KeyError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return record.to_dto(CreateTaskResponse)
+
+    @instrument('dao')
+    async def create_many(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        """Creates tasks.
+
+        :param tasks: List of TaskDTO.
+        :returns: Ids of created tasks in input order.
+        :raises DBOperationError: When a task breaks a constraint of the table, none is created then.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create_many request: tasks_count=%s", len(tasks))
+
+        try:
+            for task in tasks:
+                self.__check(task.model_dump())
+
+            created_ids = [self.__insert(task).id for task in tasks]
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return CreateTaskBatchResponse(ids=created_ids)
+
+    @instrument('dao')
+    async def update(self, task_id: int, task: UpdateTaskRequest, expected_version: int | None = None) -> UpdateTaskResponse:
+        """Replaces title, description and status of task and increments its version.
+
+        :param task_id: Task id.
+        :param task: TaskDTO.
+        :param expected_version: Version the task must still have, None to update any version.
+        :returns: TaskDTO of updated task.
+        :raises DBOperationError: When task breaks a constraint of the table.
+        :raises DBOperationWarning: When error is in data.
+        :raises DBOperationConflict: When task exists at another version.
+        """
+
+        LOG.info("DAO update request: task_id=%s, expected_version=%s, task=%s", task_id, expected_version, task)
+
+        try:
+            record = self.__tasks.get(task_id)
+
+            if record is None:
+                raise ValueError(f"Task {task_id} not found")
+
+            conflict = expected_version is not None and record.version != expected_version
+
+            if not conflict:
+                values = task.model_dump()
+
+                self.__check(values)
+                self.__assign(record, values)
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        if conflict:
+            LOG.warning("DAO conflict: task_id=%s is not at version %s", task_id, expected_version)
+
+            raise DBOperationConflict(f"Task {task_id} is not at version {expected_version}")
+
+        return record.to_dto(UpdateTaskResponse)
+
+    @instrument('dao')
+    async def delete(self, task_id: int) -> DeleteTaskResponse:
+        """Deletes task.
+
+        :param task_id: Task id.
+        :returns: TaskDTO of deleted task.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO delete request: task_id=%s", task_id)
+
+        try:
+            if task_id not in self.__tasks:
+                raise ValueError(f"Task {task_id} not found")
+
+            self.__remove([task_id])
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return DeleteTaskResponse(id=task_id)
+
+    @instrument('dao')
+    async def update_many(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        """Updates all tasks matching the filter.
+
+        :param batch: Filter by ids and/or status and values to set.
+        :returns: Ids and count of updated tasks.
+        :raises DBOperationError: When a matching task would break a constraint of the table.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO update_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            values = batch.values.model_dump(exclude_unset=True)
+
+            if not values:
+                raise ValueError("No values to update")
+
+            updated_ids = self.__match(batch.filter)
+
+            if updated_ids:
+                self.__check(values)
+
+            for task_id in updated_ids:
+                self.__assign(self.__tasks[task_id], values)
+
+            updated_tasks = UpdateTaskBatchResponse(ids=updated_ids, count=len(updated_ids))
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return updated_tasks
+
+    @instrument('dao')
+    async def delete_many(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        """Deletes all tasks matching the filter.
+
+        :param batch: Filter by ids and/or status.
+        :returns: Ids and count of deleted tasks.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO delete_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            deleted_ids = self.__match(batch.filter)
+
+            self.__remove(deleted_ids)
+
+            deleted_tasks = DeleteTaskBatchResponse(ids=deleted_ids, count=len(deleted_ids))
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return deleted_tasks
+
+    @instrument('dao')
+    async def get_stats(self) -> TaskStatsResponse:
+        """Gets number of tasks by status from the sizes of the status indexes.
+
+        :returns: Counts of every status and total.
+        """
+
+        LOG.info("DAO get_stats request")
+
+        counts = {status: len(ids) for status, ids in self.__ids_by_status.items()}
+
+        return TaskStatsResponse(counts=counts, total=sum(counts.values()))
+
+    @instrument('dao')
+    async def reconcile_stats(self) -> TaskStatsResponse:
+        """Recounts tasks by status from the task map and rebuilds the status indexes if they drifted.
+
+        :returns: Recounted counts of every status and total.
+        """
+
+        LOG.info("DAO reconcile_stats request")
+
+        stats_before = await self.get_stats()
+
+        counts = dict.fromkeys(TaskStatus, 0)
+        counts.update(Counter(record.status for record in self.__tasks.values()))
+
+        stats = TaskStatsResponse(counts=counts, total=sum(counts.values()))
+
+        if stats != stats_before:
+            LOG.warning("Task counters drifted: counted=%s, stored=%s", stats.counts, stats_before.counts)
+
+            self.__rebuild_indexes()
+
+        return stats
+
+    async def save_snapshot(self) -> None:
+        """Writes all tasks to the snapshot file, if there were changes since the last save.
+
+        Tasks are copied in the event loop, so the snapshot is consistent, and written
+        by a worker thread to a temporary file that then replaces the snapshot.
+        Saves run one at a time. A cancelled save returns only once its thread is done with the files,
+        as the thread can not be stopped.
+
+        :raises DBOperationError: When the snapshot can not be written.
+        """
+
+        async with self.__snapshot_lock:
+            if self.__snapshot_path is None or self.__changes == self.__saved_changes:
+                return
+
+            changes = self.__changes
+            snapshot = {
+                'format': SNAPSHOT_FORMAT,
+                'next_id': self.__next_id,
+                'tasks': [
+                    (record.id, record.title, record.description, record.status.name, record.version)
+                    for record in self.__tasks.values()
+                ],
+            }
+
+            write = asyncio.ensure_future(asyncio.to_thread(self.__write_snapshot, snapshot))
+
+            try:
+                await asyncio.shield(write)
+
+            except asyncio.CancelledError:
+                await asyncio.wait([write])
+
+                raise
+
+            except (
+                    OSError,
+                    TypeError,
+                    ValueError,
+            ) as error:
+                LOG.error("DAO err: %s", error)
+
+                raise DBOperationError from error
+
+            self.__saved_changes = changes
+
+        LOG.info("Tasks snapshot saved: path=%s, tasks=%s", self.__snapshot_path, len(snapshot['tasks']))
+
+    def __write_snapshot(self, snapshot: Dict) -> None:
+        temporary_path = self.__snapshot_path.with_name(self.__snapshot_path.name + '.tmp')
+
+        with temporary_path.open('w', encoding='utf-8') as file:
+            json.dump(snapshot, file, separators=(',', ':'))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_path, self.__snapshot_path)
+
+    def __load_snapshot(self) -> None:
+        """Loads tasks from the snapshot file, starts empty when there is none.
+
+        :raises InitDBEngineError: When the snapshot can not be read or is malformed.
+        """
+
+        if not self.__snapshot_path.exists():
+            LOG.info("No tasks snapshot at %s, starting empty", self.__snapshot_path)
+
+            return
+
+        try:
+            snapshot = json.loads(self.__snapshot_path.read_text(encoding='utf-8'))
+
+            if snapshot.get('format') != SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format: {snapshot.get('format')}")
+
+            for task_id, title, description, status, version in snapshot['tasks']:
+                self.__tasks[task_id] = _TaskRecord(task_id, title, description, TaskStatus[status], version)
+
+            self.__next_id = max(snapshot['next_id'], max(self.__tasks, default=0) + 1)
+
+        except (
+                OSError,
+                AttributeError,
+                TypeError,
+                KeyError,
+                ValueError,
+        ) as error:
+            LOG.error("Failed to load tasks snapshot %s: %s", self.__snapshot_path, error)
+
+            raise InitDBEngineError(f"Failed to load tasks snapshot {self.__snapshot_path}") from error
+
+        self.__rebuild_indexes()
+
+        LOG.info("Tasks snapshot loaded: path=%s, tasks=%s", self.__snapshot_path, len(self.__tasks))
+
+    @staticmethod
+    def __check(values: Dict) -> None:
+        """Rejects nulls the NOT NULL columns of the database would reject, with the same error.
+
+        :raises DBOperationError:
+        """
+
+        for column in ('title', 'status'):
+            if column in values and values[column] is None:
+                LOG.error("DAO err: Task %s must not be null", column)
+
+                raise DBOperationError(f"Task {column} must not be null")
+
+    def __insert(self, task: CreateTaskRequest) -> _TaskRecord:
+        record = _TaskRecord(self.__next_id, task.title, task.description, task.status, 1)
+
+        self.__next_id += 1
+        self.__changes += 1
+
+        # Ids only grow, so appending keeps the indexes sorted.
+        self.__tasks[record.id] = record
+        self.__ids.append(record.id)
+        self.__ids_by_status[record.status].append(record.id)
+        self.__index_words(record)
+
+        return record
+
+    def __assign(self, record: _TaskRecord, values: Dict) -> None:
+        """Sets values on record, moving it between indexes, and increments its version."""
+
+        self.__unindex_words(record)
+
+        if 'status' in values and values['status'] != record.status:
+            _remove_ids(self.__ids_by_status[record.status], {record.id})
+            insort(self.__ids_by_status[values['status']], record.id)
+
+        for column, value in values.items():
+            setattr(record, column, value)
+
+        record.version += 1
+        self.__changes += 1
+
+        self.__index_words(record)
+
+    def __remove(self, task_ids: Iterable[int]) -> None:
+        removed = set()
+        removed_by_status: Dict[TaskStatus, Set[int]] = {status: set() for status in TaskStatus}
+
+        for task_id in task_ids:
+            record = self.__tasks.pop(task_id)
+
+            self.__unindex_words(record)
+
+            removed.add(task_id)
+            removed_by_status[record.status].add(task_id)
+
+        _remove_ids(self.__ids, removed)
+
+        for status, status_removed in removed_by_status.items():
+            if status_removed:
+                _remove_ids(self.__ids_by_status[status], status_removed)
+
+        self.__changes += len(removed)
+
+    def __match(self, filter_parameters: TaskBatchFilter) -> List[int]:
+        """Ids of tasks matching the batch filter, ascending.
+
+        :raises ValueError: When filter is empty, so the batch would touch all tasks.
+        """
+
+        if filter_parameters.ids is None and filter_parameters.status is None:
+            raise ValueError("Batch filter must contain ids or status")
+
+        if filter_parameters.ids is None:
+            return list(self.__ids_by_status[filter_parameters.status])
+
+        return sorted(
+            task_id for task_id in set(filter_parameters.ids)
+            if task_id in self.__tasks
+            and (filter_parameters.status is None or self.__tasks[task_id].status == filter_parameters.status)
+        )
+
+    def __index_words(self, record: _TaskRecord) -> None:
+        for word in set(_words(record.title) + _words(record.description)):
+            self.__ids_by_word.setdefault(word, set()).add(record.id)
+
+    def __unindex_words(self, record: _TaskRecord) -> None:
+        for word in set(_words(record.title) + _words(record.description)):
+            ids = self.__ids_by_word.get(word)
+
+            if ids is not None:
+                ids.discard(record.id)
+
+                if not ids:
+                    del self.__ids_by_word[word]
+
+    def __rebuild_indexes(self) -> None:
+        self.__ids = sorted(self.__tasks)
+        self.__ids_by_status = {status: [] for status in TaskStatus}
+        self.__ids_by_word = {}
+
+        for task_id in self.__ids:
+            record = self.__tasks[task_id]
+
+            self.__ids_by_status[record.status].append(task_id)
+            self.__index_words(record)
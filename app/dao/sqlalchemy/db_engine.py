@@ -1,11 +1,20 @@
+import asyncio
 import logging
 
+from itertools import count
+from time import perf_counter
+from typing import Dict, List, Sequence
 from contextlib import asynccontextmanager
 
 from asyncpg import PostgresError
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 
 from app.utils.singleton import Singleton
+from app.utils.metrics import METRICS
+from app.utils.request_context import DeadlineExceeded, reads_pinned_to_primary, time_left
+from app.dao.sqlalchemy.slow_query import SlowQueryLog
 from app.dao.sqlalchemy.exceptions import (
     BaseDBEngineError,
     UnknownDBEngineError,
@@ -14,6 +23,7 @@ from app.dao.sqlalchemy.exceptions import (
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
+    AsyncConnection,
 )
 
 
@@ -23,9 +33,33 @@ __all__ = (
 
 LOG = logging.getLogger(__name__)
 
+HEALTH_CHECK_QUERY = text('SELECT 1')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context.query_started_at = perf_counter()
+
+
+class _Replica:
+    """Engine of a read replica and its last known health."""
+
+    __slots__ = (
+        'url',
+        'engine',
+        'healthy',
+    )
+
+    def __init__(self, url: str, engine: AsyncEngine) -> None:
+        self.url = url
+        self.engine = engine
+        self.healthy = True
+
 
 class SQLAlchemyDBEngine(metaclass=Singleton):
-    """SQLAlchemyDBEngine"""
+    """SQLAlchemyDBEngine
+
+    Writes go to the primary. Reads may go to replicas, see acquire_read_connection.
+    """
 
     __async_engine: AsyncEngine | None = None
 
@@ -37,6 +71,19 @@ class SQLAlchemyDBEngine(metaclass=Singleton):
             host: str,
             port: int,
             database: str,
+            pool_size: int = 5,
+            max_overflow: int = 10,
+            pool_timeout: float = 30.0,
+            pool_recycle: int = -1,
+            pool_pre_ping: bool = False,
+            statement_cache_size: int = 100,
+            echo: bool = False,
+            replica_urls: Sequence[str] = (),
+            replica_health_check_interval: float = 5.0,
+            slow_query_threshold: float = 0.0,
+            slow_query_explain_interval: float = 60.0,
+            slow_query_explain_timeout: float = 30.0,
+            slow_query_log_size: int = 100,
     ) -> None:
         """Initialize the database engine instance.
 
@@ -46,9 +93,22 @@ class SQLAlchemyDBEngine(metaclass=Singleton):
         :param host:
         :param port:
         :param database:
+        :param pool_size: Number of connections kept open in the pool.
+        :param max_overflow: Number of connections allowed above pool_size.
+        :param pool_timeout: Seconds to wait for a connection before PoolTimeoutError.
+        :param pool_recycle: Seconds after which a connection is reopened, -1 to never recycle.
+        :param pool_pre_ping: Whether to test connections on checkout.
+        :param statement_cache_size: Size of the asyncpg prepared statement cache per connection.
+        :param echo: Whether to log every statement.
+        :param replica_urls: SQLAlchemy URLs of read replicas, each gets a pool of the same size.
+        :param replica_health_check_interval: Seconds between health checks of replicas.
+        :param slow_query_threshold: Seconds from which statements are logged as slow, 0 to disable.
+        :param slow_query_explain_interval: Min seconds between EXPLAIN ANALYZE runs of slow SELECTs, 0 to disable.
+        :param slow_query_explain_timeout: statement_timeout of EXPLAIN ANALYZE runs in seconds.
+        :param slow_query_log_size: Number of latest slow statements kept for slow_queries.
         """
 
-        LOG.info(f"Initializing SQLAlchemyDBEngine | 'host': {host}, 'port': {port}.")
+        LOG.info("Initializing SQLAlchemyDBEngine | 'host': %s, 'port': %s.", host, port)
 
         self.__db_url: str = db_url_template % {
             "username": username,
@@ -58,52 +118,190 @@ class SQLAlchemyDBEngine(metaclass=Singleton):
             "database": database,
         }
 
+        self.__pool_size = pool_size
+        self.__max_overflow = max_overflow
+        self.__pool_timeout = pool_timeout
+        self.__pool_recycle = pool_recycle
+        self.__pool_pre_ping = pool_pre_ping
+        self.__statement_cache_size = statement_cache_size
+        self.__echo = echo
+
+        self.__checkout_wait_histogram = METRICS.histogram(
+            'db_pool_checkout_wait_seconds', 'Time waiting for a pool connection.', engine='sqlalchemy',
+        )
+        self.__checkout_timeouts = METRICS.counter(
+            'db_pool_checkout_timeouts_total', 'Pool checkouts that timed out.', engine='sqlalchemy',
+        )
+        self.__query_histogram = METRICS.histogram(
+            'db_query_duration_seconds', 'Time of a statement on the database, including fetching its rows.',
+            engine='sqlalchemy',
+        )
+
+        self.__slow_query_log = SlowQueryLog(
+            threshold=slow_query_threshold,
+            explain_interval=slow_query_explain_interval,
+            explain_timeout=slow_query_explain_timeout,
+            size=slow_query_log_size,
+        ) if slow_query_threshold > 0 else None
+
+        self.__replica_urls = tuple(replica_urls)
+        self.__replica_health_check_interval = replica_health_check_interval
+        self.__replicas: List[_Replica] | None = None
+        self.__replica_turn = count()
+        self.__health_check_task: asyncio.Task | None = None
+
     async def get_async_engine(self) -> AsyncEngine:
         """get_async_engine.
 
         :raises InitDBEngineError:
         """
 
-        LOG.info(f"Trying to get AsyncEngine.")
+        LOG.info("Trying to get AsyncEngine.")
 
         try:
             if self.__async_engine is None:
                 self.__async_engine = await self.__create_async_engine()
 
         except InitDBEngineError as error:
-            LOG.error(f"Failed to create or get async engine | 'err': {error}")
+            LOG.error("Failed to create or get async engine | 'err': %s", error)
 
             raise
 
         return self.__async_engine
 
-    async def __create_async_engine(self) -> AsyncEngine:
+    async def __create_async_engine(self, db_url: str | None = None) -> AsyncEngine:
         """Creates an async SQLAlchemy engine.
 
+        :param db_url: URL of the database, the primary by default.
         :raises InitDBEngineError:
         """
 
-        LOG.info(f"Trying to create async engine. db_url={self.__db_url}")
+        LOG.info("Trying to create async engine. pool_size=%s, max_overflow=%s", self.__pool_size, self.__max_overflow)
 
         try:
             engine = create_async_engine(
-                self.__db_url,
-                echo=True,
+                db_url or self.__db_url,
+                echo=self.__echo,
+                pool_size=self.__pool_size,
+                max_overflow=self.__max_overflow,
+                pool_timeout=self.__pool_timeout,
+                pool_recycle=self.__pool_recycle,
+                pool_pre_ping=self.__pool_pre_ping,
+                connect_args={
+                    "prepared_statement_cache_size": self.__statement_cache_size,
+                },
             )
 
+            event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine.sync_engine, 'after_cursor_execute', self.__after_cursor_execute)
+
             LOG.info("Async engine created successfully")
 
             return engine
 
         except Exception as error:
-            LOG.error(f"Failed to create async engine | 'err': {error}")
+            LOG.error("Failed to create async engine | 'err': %s", error)
 
             raise InitDBEngineError from error
 
+    def __after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = perf_counter() - context.query_started_at
+
+        self.__query_histogram.observe(elapsed)
+
+        if self.__slow_query_log is not None and elapsed >= self.__slow_query_log.threshold:
+            self.__slow_query_log.record(conn.engine.url, statement, parameters, executemany, elapsed)
+
+    async def __get_replicas(self) -> List[_Replica]:
+        """Creates replica engines on first use and starts their health checks.
+
+        :raises InitDBEngineError:
+        """
+
+        if self.__replicas is None:
+            self.__replicas = [
+                _Replica(make_url(url).render_as_string(hide_password=True), await self.__create_async_engine(url))
+                for url in self.__replica_urls
+            ]
+
+            if self.__replicas:
+                self.__health_check_task = asyncio.create_task(self.__check_replicas())
+
+        return self.__replicas
+
+    async def __check_replicas(self) -> None:
+        """Pings every replica each replica_health_check_interval seconds.
+
+        Replicas that fail are skipped by acquire_read_connection until they answer again.
+        """
+
+        while True:
+            for replica in self.__replicas:
+                try:
+                    async with replica.engine.connect() as conn:
+                        await asyncio.wait_for(conn.execute(HEALTH_CHECK_QUERY), self.__replica_health_check_interval)
+
+                    healthy = True
+
+                except (Exception,) as error:
+                    healthy = False
+
+                    if replica.healthy:
+                        LOG.warning("Replica %s failed health check, 'err': %s", replica.url, error)
+
+                if healthy and not replica.healthy:
+                    LOG.info("Replica %s is healthy again", replica.url)
+
+                replica.healthy = healthy
+
+            await asyncio.sleep(self.__replica_health_check_interval)
+
+    async def __pick_replica(self) -> _Replica | None:
+        """Picks the next healthy replica round-robin.
+
+        :returns: None when reads are pinned to the primary or no replica is healthy.
+        """
+
+        if not self.__replica_urls or reads_pinned_to_primary():
+            return None
+
+        healthy = [replica for replica in await self.__get_replicas() if replica.healthy]
+
+        if not healthy:
+            return None
+
+        return healthy[next(self.__replica_turn) % len(healthy)]
+
+    def slow_queries(self) -> List[Dict] | None:
+        """Returns the latest slow statements, the latest first, None when the slow query log is disabled."""
+
+        return self.__slow_query_log.entries() if self.__slow_query_log is not None else None
+
+    async def dispose(self) -> None:
+        """Stops health checks and closes all connections of the primary and replicas."""
+
+        if self.__slow_query_log is not None:
+            await self.__slow_query_log.close()
+
+        if self.__health_check_task is not None:
+            self.__health_check_task.cancel()
+
+            self.__health_check_task = None
+
+        for replica in self.__replicas or ():
+            await replica.engine.dispose()
+
+        self.__replicas = None
+
+        if self.__async_engine is not None:
+            await self.__async_engine.dispose()
+
+            self.__async_engine = None
+
     @property
     @asynccontextmanager
     async def acquire_connection(self):
-        """Async context manager for acquiring a connection.
+        """Async context manager for acquiring a connection to the primary.
         Rolls back open transactions on error.
 
         :raises BaseDBEngineError:
@@ -113,27 +311,139 @@ class SQLAlchemyDBEngine(metaclass=Singleton):
         if not self.__async_engine:
             await self.get_async_engine()
 
-        async with self.__async_engine.connect() as conn:
+        conn = await self.__checkout(self.__async_engine)
+
+        async with self.__using(conn):
+            yield conn
+
+    @property
+    @asynccontextmanager
+    async def acquire_read_connection(self):
+        """Async context manager for acquiring a connection for reads.
+
+        Connections come from healthy replicas in turn. The primary is used when there are none,
+        when reads of the request are pinned to it after a write or when the replica fails on checkout.
+
+        :raises BaseDBEngineError:
+        :raises UnknownDBEngineError:
+        """
+
+        replica = await self.__pick_replica()
+        conn = None
+
+        if replica is not None:
             try:
-                yield conn
+                conn = await self.__checkout(replica.engine)
 
             except (
                     SQLAlchemyError,
                     PostgresError,
+                    OSError,
             ) as error:
-                LOG.error(f"SQLAlchemyError on acquire_connection, 'err': {error}")
+                LOG.warning("Replica %s failed on checkout, reading from primary, 'err': %s", replica.url, error)
 
-                raise BaseDBEngineError("SQLAlchemyError") from error
+                replica.healthy = False
 
-            except AttributeError as error:
-                LOG.error(f"AttributeError on acquire_connection, 'err': {error}")
+        if conn is None:
+            if not self.__async_engine:
+                await self.get_async_engine()
 
-                raise BaseDBEngineError("AttributeError error") from error
+            conn = await self.__checkout(self.__async_engine)
 
-            except (Exception,) as error:
-                LOG.error(f"Unknown on acquire_connection, 'err': {error}")
+        async with self.__using(conn):
+            yield conn
 
-                raise UnknownDBEngineError("Unknown error") from error
+    async def __checkout(self, engine: AsyncEngine) -> AsyncConnection:
+        """Checks out a connection of engine, recording the wait.
+        The wait is cut to the time left until the deadline of the request.
 
-            finally:
+        :raises PoolTimeoutError:
+        :raises DeadlineExceeded: When the deadline passes first.
+        """
+
+        budget = time_left()
+
+        if budget is not None and budget <= 0:
+            raise DeadlineExceeded("Request deadline exceeded before checkout")
+
+        conn = engine.connect()
+
+        checkout_started_at = perf_counter()
+
+        try:
+            if budget is None or budget >= self.__pool_timeout:
+                await conn.start()
+
+            else:
+                async with asyncio.timeout(budget):
+                    await conn.start()
+
+        except PoolTimeoutError:
+            LOG.error("Timed out waiting for a pool connection, pool_timeout=%s", self.__pool_timeout)
+
+            self.__checkout_timeouts.inc()
+
+            raise
+
+        except TimeoutError as error:
+            LOG.warning("Request deadline exceeded waiting for a pool connection, budget=%.3f", budget)
+
+            self.__checkout_timeouts.inc()
+
+            raise DeadlineExceeded("Request deadline exceeded waiting for a pool connection") from error
+
+        finally:
+            self.__checkout_wait_histogram.observe(perf_counter() - checkout_started_at)
+
+        return conn
+
+    @asynccontextmanager
+    async def __using(self, conn: AsyncConnection):
+        """Maps errors raised while conn is used and returns it to the pool.
+
+        :raises BaseDBEngineError:
+        :raises UnknownDBEngineError:
+        """
+
+        try:
+            yield conn
+
+        except (
+                SQLAlchemyError,
+                PostgresError,
+        ) as error:
+            LOG.error("SQLAlchemyError on acquire_connection, 'err': %s", error)
+
+            raise BaseDBEngineError("SQLAlchemyError") from error
+
+        except AttributeError as error:
+            LOG.error("AttributeError on acquire_connection, 'err': %s", error)
+
+            raise BaseDBEngineError("AttributeError error") from error
+
+        except (Exception,) as error:
+            LOG.error("Unknown on acquire_connection, 'err': %s", error)
+
+            raise UnknownDBEngineError("Unknown error") from error
+
+        finally:
+            try:
                 await conn.rollback()
+
+            finally:
+                await conn.close()
+
+    def pool_stats(self) -> Dict:
+        """Returns connection pool usage and checkout wait statistics."""
+
+        pool = self.__async_engine.pool if self.__async_engine is not None else None
+
+        return {
+            'pool_size': pool.size() if pool is not None else self.__pool_size,
+            'max_overflow': self.__max_overflow,
+            'checked_in': pool.checkedin() if pool is not None else 0,
+            'checked_out': pool.checkedout() if pool is not None else 0,
+            'overflow': pool.overflow() if pool is not None else -self.__pool_size,
+            'checkout_timeouts': self.__checkout_timeouts.value,
+            'checkout_wait': self.__checkout_wait_histogram.snapshot(),
+        }
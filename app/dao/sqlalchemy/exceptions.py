@@ -1,27 +1,18 @@
+from app.dao.exceptions import (
+    BaseDBEngineError,
+    UnknownDBEngineError,
+    InitDBEngineError,
+    DBOperationError,
+    DBOperationWarning,
+    DBOperationConflict,
+)
+
+
 __all__ = (
     'BaseDBEngineError',
     'UnknownDBEngineError',
     'InitDBEngineError',
     'DBOperationError',
     'DBOperationWarning',
+    'DBOperationConflict',
 )
-
-
-class BaseDBEngineError(Exception):
-    """BaseDBEngineError"""
-
-
-class InitDBEngineError(BaseDBEngineError):
-    """InitDBEngineError"""
-
-
-class UnknownDBEngineError(BaseDBEngineError):
-    """UnknownDBEngineError"""
-
-
-class DBOperationError(BaseDBEngineError):
-    """DBOperationError"""
-
-
-class DBOperationWarning(BaseDBEngineError):
-    """DBOperationWarning"""
@@ -0,0 +1,26 @@
+"""task status id index
+
+Revision ID: 4b7e1c2a9d3f
+Revises: 17cfa5910556
+Create Date: 2026-10-18 10:12:44.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1c2a9d3f'
+down_revision: Union[str, None] = '17cfa5910556'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_task_status_id', 'task', ['status', 'id'], schema='todo_list')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_status_id', table_name='task', schema='todo_list')
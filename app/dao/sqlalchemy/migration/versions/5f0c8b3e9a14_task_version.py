@@ -0,0 +1,33 @@
+"""task version
+
+Revision ID: 5f0c8b3e9a14
+Revises: e7b4d0a26c5f
+Create Date: 2026-10-18 16:48:37.902215
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0c8b3e9a14'
+down_revision: Union[str, None] = 'e7b4d0a26c5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, existing rows are not rewritten.
+    op.add_column(
+        'task',
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+        schema='todo_list'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('task', 'version', schema='todo_list')
@@ -0,0 +1,128 @@
+"""task status count
+
+Revision ID: 8d2f6a4c1e07
+Revises: 4b7e1c2a9d3f
+Create Date: 2026-10-18 14:03:21.552907
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f6a4c1e07'
+down_revision: Union[str, None] = '4b7e1c2a9d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Concurrent writers add their deltas to a random shard of the status,
+# so they do not queue on the lock of a single counter row until commit.
+SHARDS = 16
+
+# Statement level triggers see all rows of a statement in transition tables
+# and apply one delta per status, batch statements cost one counter update.
+# Counter rows are locked in status order, so concurrent transitions do not deadlock.
+APPLY_DELTAS = f"""
+    INSERT INTO todo_list.task_status_count AS counter (status, shard, count)
+    SELECT status, floor(random() * {SHARDS})::smallint, sum(delta)
+    FROM deltas
+    GROUP BY status
+    HAVING sum(delta) <> 0
+    ORDER BY status
+    ON CONFLICT (status, shard) DO UPDATE SET count = counter.count + EXCLUDED.count;
+"""
+
+TRIGGER_FUNCTIONS = {
+    'insert': """
+        WITH deltas AS (
+            SELECT status, 1 AS delta FROM new_rows
+        )
+    """,
+    'update': """
+        WITH transitions AS (
+            SELECT old_rows.status AS old_status, new_rows.status AS new_status
+            FROM old_rows JOIN new_rows USING (id)
+            WHERE old_rows.status <> new_rows.status
+        ), deltas AS (
+            SELECT old_status AS status, -1 AS delta FROM transitions
+            UNION ALL
+            SELECT new_status AS status, 1 AS delta FROM transitions
+        )
+    """,
+    'delete': """
+        WITH deltas AS (
+            SELECT status, -1 AS delta FROM old_rows
+        )
+    """,
+}
+
+TRIGGER_TRANSITION_TABLES = {
+    'insert': 'NEW TABLE AS new_rows',
+    'update': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'delete': 'OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_status_count',
+        sa.Column('status', postgresql.ENUM(name='taskstatus', create_type=False), primary_key=True),
+        sa.Column('shard', sa.SmallInteger(), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        schema='todo_list'
+    )
+
+    for event, deltas in TRIGGER_FUNCTIONS.items():
+        op.execute(f"""
+            CREATE FUNCTION todo_list.task_status_count_{event}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                {deltas}
+                {APPLY_DELTAS}
+                RETURN NULL;
+            END
+            $$
+        """)
+
+        op.execute(f"""
+            CREATE TRIGGER task_status_count_{event}
+            AFTER {event.upper()} ON todo_list.task
+            REFERENCING {TRIGGER_TRANSITION_TABLES[event]}
+            FOR EACH STATEMENT EXECUTE FUNCTION todo_list.task_status_count_{event}()
+        """)
+
+    op.execute("""
+        CREATE FUNCTION todo_list.task_status_count_truncate() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM todo_list.task_status_count;
+            RETURN NULL;
+        END
+        $$
+    """)
+
+    op.execute("""
+        CREATE TRIGGER task_status_count_truncate
+        AFTER TRUNCATE ON todo_list.task
+        FOR EACH STATEMENT EXECUTE FUNCTION todo_list.task_status_count_truncate()
+    """)
+
+    # CREATE TRIGGER keeps writers of the table waiting until the migration commits, so the counts are exact.
+    op.execute("""
+        INSERT INTO todo_list.task_status_count (status, shard, count)
+        SELECT status, 0, count(*) FROM todo_list.task GROUP BY status
+    """)
+
+
+def downgrade() -> None:
+    for event in (*TRIGGER_FUNCTIONS, 'truncate'):
+        op.execute(f"DROP TRIGGER task_status_count_{event} ON todo_list.task")
+        op.execute(f"DROP FUNCTION todo_list.task_status_count_{event}()")
+
+    op.drop_table('task_status_count', schema='todo_list')
@@ -0,0 +1,106 @@
+"""task events
+
+Revision ID: a6d3f91c2b47
+Revises: 5f0c8b3e9a14
+Create Date: 2026-10-18 09:12:44.318520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f91c2b47'
+down_revision: Union[str, None] = '5f0c8b3e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CHANNEL = 'task_events'
+
+# Every changed row is sent as one notification, numbered by the sequence.
+# Notifications are delivered at commit, in commit order, to every listener,
+# so all workers see the same events in the same order.
+# Payloads carry no title or description, they must stay under the 8000 bytes limit of NOTIFY.
+TRIGGER_FUNCTIONS = {
+    'insert': """
+        SELECT id, 'created' AS type, status, NULL::text AS previous_status, version
+        FROM new_rows
+    """,
+    'update': """
+        SELECT id, 'updated' AS type, new_rows.status, old_rows.status AS previous_status, new_rows.version
+        FROM old_rows JOIN new_rows USING (id)
+    """,
+    'delete': """
+        SELECT id, 'deleted' AS type, status, NULL::text AS previous_status, version
+        FROM old_rows
+    """,
+}
+
+TRIGGER_TRANSITION_TABLES = {
+    'insert': 'NEW TABLE AS new_rows',
+    'update': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'delete': 'OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE todo_list.task_event_id_seq AS bigint")
+
+    for event, changes in TRIGGER_FUNCTIONS.items():
+        op.execute(f"""
+            CREATE FUNCTION todo_list.task_events_{event}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM pg_notify('{CHANNEL}', json_build_object(
+                    'id', nextval('todo_list.task_event_id_seq'),
+                    'type', changes.type,
+                    'task_id', changes.id,
+                    'status', changes.status,
+                    'previous_status', changes.previous_status,
+                    'version', changes.version
+                )::text)
+                FROM ({changes} ORDER BY id) AS changes;
+
+                RETURN NULL;
+            END
+            $$
+        """)
+
+        op.execute(f"""
+            CREATE TRIGGER task_events_{event}
+            AFTER {event.upper()} ON todo_list.task
+            REFERENCING {TRIGGER_TRANSITION_TABLES[event]}
+            FOR EACH STATEMENT EXECUTE FUNCTION todo_list.task_events_{event}()
+        """)
+
+    # Subscribers can not follow a truncate row by row, they are told to reload everything.
+    op.execute(f"""
+        CREATE FUNCTION todo_list.task_events_truncate() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify('{CHANNEL}', json_build_object(
+                'id', nextval('todo_list.task_event_id_seq'),
+                'type', 'reset'
+            )::text);
+
+            RETURN NULL;
+        END
+        $$
+    """)
+
+    op.execute("""
+        CREATE TRIGGER task_events_truncate
+        AFTER TRUNCATE ON todo_list.task
+        FOR EACH STATEMENT EXECUTE FUNCTION todo_list.task_events_truncate()
+    """)
+
+
+def downgrade() -> None:
+    for event in (*TRIGGER_FUNCTIONS, 'truncate'):
+        op.execute(f"DROP TRIGGER task_events_{event} ON todo_list.task")
+        op.execute(f"DROP FUNCTION todo_list.task_events_{event}()")
+
+    op.execute("DROP SEQUENCE todo_list.task_event_id_seq")
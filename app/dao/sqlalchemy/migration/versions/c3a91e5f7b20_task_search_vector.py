@@ -0,0 +1,49 @@
+"""task search vector
+
+Revision ID: c3a91e5f7b20
+Revises: 8d2f6a4c1e07
+Create Date: 2026-10-18 15:26:09.104381
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a91e5f7b20'
+down_revision: Union[str, None] = '8d2f6a4c1e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match SEARCH_VECTOR of SQLAlchemyTaskModel, search queries use the same text search configuration.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # A stored generated column rewrites the table, run it in a maintenance window on large tables.
+    op.add_column(
+        'task',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+        schema='todo_list'
+    )
+    op.create_index(
+        'ix_task_search_vector',
+        'task',
+        ['search_vector'],
+        postgresql_using='gin',
+        schema='todo_list'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_search_vector', table_name='task', schema='todo_list')
+    op.drop_column('task', 'search_vector', schema='todo_list')
@@ -0,0 +1,51 @@
+"""task title trigram index
+
+Revision ID: e7b4d0a26c5f
+Revises: c3a91e5f7b20
+Create Date: 2026-10-18 15:41:52.670113
+
+"""
+
+import logging
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4d0a26c5f'
+down_revision: Union[str, None] = 'c3a91e5f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+    # The index is optional: without pg_trgm the revision is a no-op and DB_SEARCH_FUZZY must stay disabled.
+    available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+
+    if not available:
+        LOG.warning("pg_trgm is not available, skipping the trigram index of task titles")
+
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_task_title_trgm',
+        'task',
+        ['title'],
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'},
+        schema='todo_list'
+    )
+
+
+def downgrade() -> None:
+    # The extension is left in place, other objects may depend on it.
+    op.execute("DROP INDEX IF EXISTS todo_list.ix_task_title_trgm")
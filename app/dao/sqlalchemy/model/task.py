@@ -1,25 +1,51 @@
 import logging
 
-from typing import List
+from typing import AsyncIterator, Dict, List, Sequence, Tuple
 
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
+    SmallInteger,
     String,
     Enum,
+    Float,
+    Index,
+    Computed,
+    any_,
+    bindparam,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    tuple_,
     select,
     update,
     delete,
     insert,
+    Select,
+    Insert,
+    Update,
+    Delete,
+    Row,
+    ColumnElement,
 )
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DataError
 
 from app.dto.task import *
 from app.config import CONFIGURATION
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.batcher import MicroBatcher
+from app.utils.search import like_prefix
+from app.utils.request_context import reads_pinned_to_primary
+from app.utils.metrics import instrument
 from app.dao.sqlalchemy.exceptions import (
     BaseDBEngineError,
     DBOperationError,
     DBOperationWarning,
+    DBOperationConflict,
     UnknownDBEngineError,
 )
 from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
@@ -33,33 +59,385 @@ __all__ = (
 LOG = logging.getLogger(__name__)
 
 
+# Text search configuration of search_vector and of search queries.
+SEARCH_CONFIG = 'simple'
+
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
 class SQLAlchemyTaskModel(Base):
+    """Task table.
+
+    search_vector is generated by the database and is not mapped, so it is never selected or returned.
+    version is incremented by every UPDATE statement of the DAO, it is the ETag of the task.
+    """
+
     __tablename__ = 'task'
-    __table_args__ = {
-        'schema': CONFIGURATION.DB_SETTINGS.DB_SCHEMA,
+    __table_args__ = (
+        Index('ix_task_status_id', 'status', 'id'),
+        Index('ix_task_search_vector', 'search_vector', postgresql_using='gin'),
+        {
+            'schema': CONFIGURATION.DB_SETTINGS.DB_SCHEMA,
+        },
+    )
+    __mapper_args__ = {
+        'exclude_properties': ('search_vector',),
     }
 
     id = Column(Integer(), primary_key=True)
     title = Column(String(), nullable=False)
     description = Column(String(), default='')
     status = Column(Enum(TaskStatus), nullable=False, default=TaskStatus.TODO)
+    version = Column(BigInteger(), nullable=False, server_default='1')
+    search_vector = Column(TSVECTOR(), Computed(SEARCH_VECTOR, persisted=True))
+
+
+class SQLAlchemyTaskStatusCountModel(Base):
+    """Number of tasks by status, split into shards to spread concurrent writers.
+
+    Maintained by statement level triggers on the task table in the writing transaction,
+    see the task_status_count migration. A status counts the sum of its shards.
+    """
+
+    __tablename__ = 'task_status_count'
+    __table_args__ = {
+        'schema': CONFIGURATION.DB_SETTINGS.DB_SCHEMA,
+    }
+
+    status = Column(Enum(TaskStatus), primary_key=True)
+    shard = Column(SmallInteger(), primary_key=True)
+    count = Column(BigInteger(), nullable=False, server_default='0')
+
+
+TASK_COLUMNS: Tuple[Column, ...] = tuple(SQLAlchemyTaskModel.__mapper__.columns)
+TASK_COLUMN_KEYS: Tuple[str, ...] = tuple(column.key for column in TASK_COLUMNS)
+
+
+def _to_tasks(rows: Sequence[Row]) -> List[ReadTaskResponse]:
+    return READ_TASK_LIST_ADAPTER.validate_python([dict(zip(TASK_COLUMN_KEYS, row)) for row in rows])
+
+
+def _to_stats(rows: Sequence[Row]) -> TaskStatsResponse:
+    counts = dict.fromkeys(TaskStatus, 0)
+    counts.update(rows)
+
+    return TaskStatsResponse(counts=counts, total=sum(counts.values()))
+
+
+def _build_list_query(by_status: bool, after_id: bool) -> Select:
+    query = select(
+        SQLAlchemyTaskModel
+    ).order_by(
+        SQLAlchemyTaskModel.id
+    ).limit(
+        bindparam('limit', type_=Integer())
+    )
+
+    if by_status:
+        query = query.where(SQLAlchemyTaskModel.status == bindparam('status'))
+
+    if after_id:
+        query = query.where(SQLAlchemyTaskModel.id > bindparam('after_id'))
+
+    return query
+
+
+def _build_stream_query(by_status: bool) -> Select:
+    query = select(SQLAlchemyTaskModel).order_by(SQLAlchemyTaskModel.id)
+
+    if by_status:
+        query = query.where(SQLAlchemyTaskModel.status == bindparam('status'))
+
+    return query
+
+
+def _build_search_query(fuzzy: bool, after: bool) -> Select:
+    """Matches search_vector against the words of q over the GIN index, best ranked first.
+
+    All matches are ranked, only the max_candidates best of them, by (rank, id), can be paged through,
+    so every page of a search reads the same window. Fuzzy queries also match titles similar to q
+    or starting with it over the trigram index. Pages follow the (rank, id) keyset.
+    """
+
+    table = SQLAlchemyTaskModel.__table__
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), bindparam('q', type_=String()))
+
+    condition: ColumnElement = table.c.search_vector.op('@@')(ts_query)
+
+    if fuzzy:
+        condition = or_(
+            condition,
+            table.c.title.op('%')(bindparam('q', type_=String())),
+            table.c.title.ilike(bindparam('prefix', type_=String())),
+        )
+
+    rank: ColumnElement = func.ts_rank_cd(table.c.search_vector, ts_query, type_=Float())
+
+    if fuzzy:
+        rank = func.greatest(rank, func.similarity(table.c.title, bindparam('q', type_=String())))
+
+    rank = rank.label('rank')
+
+    candidates = select(
+        *(table.c[key] for key in TASK_COLUMN_KEYS),
+        rank,
+    ).where(
+        condition
+    ).order_by(
+        rank.desc(),
+        table.c.id.desc(),
+    ).limit(
+        bindparam('max_candidates', type_=Integer())
+    ).subquery('candidates')
+
+    query = select(
+        *(candidates.c[key] for key in TASK_COLUMN_KEYS),
+        candidates.c.rank,
+    ).order_by(
+        candidates.c.rank.desc(),
+        candidates.c.id.desc(),
+    ).limit(
+        bindparam('limit', type_=Integer())
+    )
+
+    if after:
+        query = query.where(
+            tuple_(candidates.c.rank, candidates.c.id) < tuple_(
+                bindparam('after_rank', type_=Float()),
+                bindparam('after_id', type_=Integer()),
+            )
+        )
+
+    return query
+
+
+def _batch_where(by_ids: bool, by_status: bool) -> list:
+    clauses = []
+
+    if by_ids:
+        clauses.append(SQLAlchemyTaskModel.id == any_(bindparam('filter_ids', type_=ARRAY(Integer()))))
+
+    if by_status:
+        clauses.append(SQLAlchemyTaskModel.status == bindparam('filter_status'))
+
+    return clauses
+
+
+# Statements are built once with bound parameters. Their cache keys are memoized,
+# so executing them is a lookup in the engine compiled cache without building a new
+# construct, and the same SQL string lets asyncpg reuse its prepared statement.
+# INSERT and UPDATE take their column lists from the keys of the execution parameters.
+
+GET_TASK_QUERY: Select = select(
+    SQLAlchemyTaskModel
+).where(
+    SQLAlchemyTaskModel.id == bindparam('task_id')
+)
+
+GET_TASKS_BY_IDS_QUERY: Select = select(
+    SQLAlchemyTaskModel
+).where(
+    SQLAlchemyTaskModel.id == any_(bindparam('ids', type_=ARRAY(Integer())))
+)
+
+GET_TASK_LIST_QUERIES: Dict[Tuple[bool, bool], Select] = {
+    (by_status, after_id): _build_list_query(by_status, after_id)
+    for by_status in (False, True)
+    for after_id in (False, True)
+}
+
+STREAM_TASK_LIST_QUERIES: Dict[bool, Select] = {
+    by_status: _build_stream_query(by_status)
+    for by_status in (False, True)
+}
+
+SEARCH_TASK_QUERIES: Dict[Tuple[bool, bool], Select] = {
+    (fuzzy, after): _build_search_query(fuzzy, after)
+    for fuzzy in (False, True)
+    for after in (False, True)
+}
+
+CREATE_TASK_QUERY: Insert = insert(
+    SQLAlchemyTaskModel
+).returning(
+    *TASK_COLUMNS
+)
+
+CREATE_TASKS_QUERY: Insert = insert(
+    SQLAlchemyTaskModel
+).returning(
+    *TASK_COLUMNS,
+    sort_by_parameter_order=True,
+)
+
+CREATE_TASK_IDS_QUERY: Insert = insert(
+    SQLAlchemyTaskModel
+).returning(
+    SQLAlchemyTaskModel.id,
+    sort_by_parameter_order=True,
+)
+
+UPDATE_TASK_QUERY: Update = update(
+    SQLAlchemyTaskModel
+).where(
+    SQLAlchemyTaskModel.id == bindparam('task_id')
+).values(
+    version=SQLAlchemyTaskModel.version + 1
+).returning(
+    *TASK_COLUMNS
+)
+
+# Updates the task only while it is still at the version the client has seen.
+UPDATE_TASK_IF_VERSION_QUERY: Update = UPDATE_TASK_QUERY.where(
+    SQLAlchemyTaskModel.version == bindparam('expected_version')
+)
+
+DELETE_TASK_QUERY: Delete = delete(
+    SQLAlchemyTaskModel
+).where(
+    SQLAlchemyTaskModel.id == bindparam('task_id')
+).returning(
+    SQLAlchemyTaskModel.id
+)
+
+UPDATE_TASKS_QUERIES: Dict[Tuple[bool, bool], Update] = {
+    (by_ids, by_status): update(
+        SQLAlchemyTaskModel
+    ).where(
+        *_batch_where(by_ids, by_status)
+    ).values(
+        version=SQLAlchemyTaskModel.version + 1
+    ).returning(
+        SQLAlchemyTaskModel.id
+    )
+    for by_ids in (False, True)
+    for by_status in (False, True)
+    if by_ids or by_status
+}
+
+DELETE_TASKS_QUERIES: Dict[Tuple[bool, bool], Delete] = {
+    (by_ids, by_status): delete(
+        SQLAlchemyTaskModel
+    ).where(
+        *_batch_where(by_ids, by_status)
+    ).returning(
+        SQLAlchemyTaskModel.id
+    )
+    for by_ids in (False, True)
+    for by_status in (False, True)
+    if by_ids or by_status
+}
+
+# Reads at most one row per status and shard, whatever the size of the task table.
+GET_TASK_STATS_QUERY: Select = select(
+    SQLAlchemyTaskStatusCountModel.status,
+    cast(func.sum(SQLAlchemyTaskStatusCountModel.count), BigInteger()),
+).group_by(
+    SQLAlchemyTaskStatusCountModel.status
+)
+
+# Held by the reconciling transaction, so concurrent reconciliations of all workers skip instead of queueing.
+TRY_LOCK_TASK_STATS_QUERY: Select = select(
+    func.pg_try_advisory_xact_lock(func.hashtext(SQLAlchemyTaskStatusCountModel.__table__.fullname))
+)
+
+_counted = select(
+    SQLAlchemyTaskModel.status,
+    func.count().label('count'),
+).group_by(
+    SQLAlchemyTaskModel.status
+).cte('counted')
+
+_stored = select(
+    SQLAlchemyTaskStatusCountModel.status,
+    func.sum(SQLAlchemyTaskStatusCountModel.count).label('count'),
+).group_by(
+    SQLAlchemyTaskStatusCountModel.status
+).cte('stored')
+
+_drift = select(
+    func.coalesce(_counted.c.status, _stored.c.status).label('status'),
+    cast(func.coalesce(_counted.c.count, 0), BigInteger()).label('counted'),
+    cast(func.coalesce(_stored.c.count, 0), BigInteger()).label('stored'),
+).select_from(
+    _counted.join(_stored, _counted.c.status == _stored.c.status, full=True)
+).cte('drift')
+
+_apply_drift = pg_insert(SQLAlchemyTaskStatusCountModel).from_select(
+    ['status', 'shard', 'count'],
+    select(
+        _drift.c.status,
+        literal(0, SmallInteger()),
+        _drift.c.counted - _drift.c.stored,
+    ).where(
+        _drift.c.counted != _drift.c.stored
+    ).order_by(
+        _drift.c.status
+    ),
+)
+
+# One statement counts the tasks and sums the counters in the same snapshot. Triggers change the counters
+# in the writing transaction, so committed writes are in both and running ones in neither: the difference
+# is the drift, whatever runs concurrently. It is added to shard 0, which is locked only once the scan is over,
+# so writers never wait for the scan.
+RECONCILE_TASK_STATS_QUERY: Select = select(
+    _drift.c.status,
+    _drift.c.counted,
+    _drift.c.stored,
+).add_cte(
+    _apply_drift.on_conflict_do_update(
+        index_elements=[SQLAlchemyTaskStatusCountModel.status, SQLAlchemyTaskStatusCountModel.shard],
+        set_={'count': SQLAlchemyTaskStatusCountModel.count + _apply_drift.excluded.count},
+    ).cte('applied')
+)
 
 
 class SQLAlchemyTaskDAO:
-    """SQLAlchemyTaskDAO"""
+    """SQLAlchemyTaskDAO
+
+    Pages of rows are validated with one READ_TASK_LIST_ADAPTER call, handlers send the DTOs without re-validation.
+    """
 
     __slots__ = (
         '__db_engine',
+        '__get_batcher',
+        '__create_batcher',
     )
 
-    def __init__(self, db_engine: SQLAlchemyDBEngine) -> None:
+    def __init__(
+            self,
+            db_engine: SQLAlchemyDBEngine,
+            get_batch_window: float | None = None,
+            get_batch_max_size: int = 256,
+            create_batch_window: float | None = None,
+            create_batch_max_size: int = 256,
+    ) -> None:
         """Initialization.
 
         :param db_engine: SQLAlchemyDBEngine.
+        :param get_batch_window: Seconds to collect concurrent get calls into one query,
+            0 for one event loop tick, None to disable batching.
+        :param get_batch_max_size: Max number of ids in one batched query.
+        :param create_batch_window: Seconds to collect concurrent create calls into one INSERT and one COMMIT,
+            None to disable group commit.
+        :param create_batch_max_size: Max number of rows in one group commit.
         """
 
         self.__db_engine = db_engine
+        self.__get_batcher: MicroBatcher[int, ReadTaskResponse | None] | None = None
+
+        if get_batch_window is not None:
+            self.__get_batcher = MicroBatcher(self.__get_many, get_batch_window, get_batch_max_size)
+
+        self.__create_batcher: MicroBatcher[CreateTaskRequest, CreateTaskResponse] | None = None
+
+        if create_batch_window is not None:
+            self.__create_batcher = MicroBatcher(self.__create_group, create_batch_window, create_batch_max_size)
 
+    @instrument('dao')
     async def get(self, task_id: int) -> ReadTaskResponse | None:
         """Gets task.
 
@@ -69,13 +447,14 @@ class SQLAlchemyTaskDAO:
         :raises DBOperationWarning: When error is in data.
         """
 
-        LOG.info(f"DAO get request: task_id={task_id}")
+        LOG.info("DAO get request: task_id=%s", task_id)
 
-        try:
-            query = select(SQLAlchemyTaskModel).where(SQLAlchemyTaskModel.id == task_id)
+        if self.__get_batcher is not None and not reads_pinned_to_primary():
+            return await self.__get_batcher.submit(task_id)
 
-            async with self.__db_engine.acquire_connection as conn:
-                task_raw = (await conn.execute(query)).mappings().first()
+        try:
+            async with self.__db_engine.acquire_read_connection as conn:
+                task_raw = (await conn.execute(GET_TASK_QUERY, {'task_id': task_id})).mappings().first()
 
             found_task = ReadTaskResponse(**task_raw) if task_raw else None
 
@@ -84,7 +463,7 @@ class SQLAlchemyTaskDAO:
                 BaseDBEngineError,
                 UnknownDBEngineError,
         ) as error:
-            LOG.error(f"DAO err: {error}")
+            LOG.error("DAO err: %s", error)
 
             raise DBOperationError from error
 
@@ -92,54 +471,179 @@ class SQLAlchemyTaskDAO:
                 AttributeError,
                 TypeError,
         ) as warning:
-            LOG.warning(f"DAO warning: {warning}")
+            LOG.warning("DAO warning: %s", warning)
 
             raise DBOperationWarning from warning
 
         return found_task
 
 
-    async def get_list(self, filter_parameters: ReadTaskListRequest) -> List[ReadTaskResponse]:
-        """Gets task list.
+    @instrument('dao')
+    async def get_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of task list ordered by id.
+
+        Uses keyset pagination on id, so every page costs the same regardless of its position.
 
         :param filter_parameters: TaskDTO.
-        :returns: TaskDTO of create task.
+        :returns: Page of tasks and cursor of the next page.
         :raises DBOperationError: When error is in engine.
         :raises DBOperationWarning: When error is in data.
         """
 
-        LOG.info(f"DAO get_list request: filter_parameters={filter_parameters}")
+        LOG.info("DAO get_list request: filter_parameters=%s", filter_parameters)
 
         try:
-            query = select(SQLAlchemyTaskModel)
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+
+            parameters = {'limit': limit + 1}
 
             if filter_parameters.status:
-                query = query.where(SQLAlchemyTaskModel.status == filter_parameters.status)
+                parameters['status'] = filter_parameters.status
 
-            async with self.__db_engine.acquire_connection as conn:
-                task_list_raw = (await conn.execute(query)).mappings().all()
+            if filter_parameters.after:
+                after_id, = decode_cursor(filter_parameters.after)
+                parameters['after_id'] = int(after_id)
+
+            query = GET_TASK_LIST_QUERIES[(bool(filter_parameters.status), bool(filter_parameters.after))]
+
+            async with self.__db_engine.acquire_read_connection as conn:
+                task_list_raw = (await conn.execute(query, parameters)).all()
+
+            found_task_list = _to_tasks(task_list_raw[:limit])
+            next_cursor = encode_cursor(found_task_list[-1].id) if len(task_list_raw) > limit else None
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
 
-            found_task_list = [ReadTaskResponse(**row) for row in task_list_raw]
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    @instrument('dao')
+    async def search(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        """Gets a page of tasks matching the words of q, best ranked first.
+
+        Uses keyset pagination on (rank, id). Matching rows are read from the GIN index and ranked,
+        results are capped to the DB_SEARCH_MAX_CANDIDATES best of them.
+        With DB_SEARCH_FUZZY titles similar to q or starting with it match too.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Page of tasks and cursor of the next page.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO search request: filter_parameters=%s", filter_parameters)
+
+        try:
+            if not filter_parameters.q.strip():
+                raise ValueError("Search query is empty")
+
+            limit = max(1, min(filter_parameters.limit, CONFIGURATION.DB_SETTINGS.DB_LIST_MAX_LIMIT))
+            fuzzy = CONFIGURATION.DB_SETTINGS.DB_SEARCH_FUZZY
+
+            parameters = {
+                'q': filter_parameters.q,
+                'max_candidates': CONFIGURATION.DB_SETTINGS.DB_SEARCH_MAX_CANDIDATES,
+                'limit': limit + 1,
+            }
+
+            if fuzzy:
+                parameters['prefix'] = like_prefix(filter_parameters.q)
+
+            if filter_parameters.after:
+                after_rank, after_id = decode_cursor(filter_parameters.after)
+                parameters['after_rank'] = float(after_rank)
+                parameters['after_id'] = int(after_id)
+
+            query = SEARCH_TASK_QUERIES[(fuzzy, bool(filter_parameters.after))]
+
+            async with self.__db_engine.acquire_read_connection as conn:
+                task_list_raw = (await conn.execute(query, parameters)).all()
+
+            found_task_list = _to_tasks(task_list_raw[:limit])
+            next_cursor = (
+                encode_cursor(task_list_raw[limit - 1].rank, found_task_list[-1].id)
+                if len(task_list_raw) > limit else None
+            )
 
         except (
                 SQLAlchemyError,
                 BaseDBEngineError,
                 UnknownDBEngineError,
         ) as error:
-            LOG.error(f"DAO err: {error}")
+            LOG.error("DAO err: %s", error)
 
             raise DBOperationError from error
 
         except (
                 AttributeError,
                 TypeError,
+                ValueError,
         ) as warning:
-            LOG.warning(f"DAO warning: {warning}")
+            LOG.warning("DAO warning: %s", warning)
 
             raise DBOperationWarning from warning
 
-        return found_task_list
+        return ReadTaskListResponse.model_construct(items=found_task_list, next_cursor=next_cursor)
+
+    async def stream_list(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        """Streams all tasks ordered by id over a server-side cursor.
+
+        Rows are fetched in batches of DB_STREAM_FETCH_SIZE, so memory usage does not depend on table size.
+
+        :param filter_parameters: TaskDTO.
+        :returns: Async iterator of found tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO stream_list request: filter_parameters=%s", filter_parameters)
+
+        try:
+            query = STREAM_TASK_LIST_QUERIES[bool(filter_parameters.status)]
+
+            async with self.__db_engine.acquire_read_connection as conn:
+                task_stream_raw = await conn.stream(
+                    query,
+                    {'status': filter_parameters.status} if filter_parameters.status else None,
+                    execution_options={'yield_per': CONFIGURATION.DB_SETTINGS.DB_STREAM_FETCH_SIZE},
+                )
+
+                async for row in task_stream_raw.mappings():
+                    yield ReadTaskResponse(**row)
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
 
+            raise DBOperationWarning from warning
+
+    @instrument('dao')
     async def create(self, task: CreateTaskRequest) -> CreateTaskResponse:
         """Creates task.
 
@@ -149,19 +653,14 @@ class SQLAlchemyTaskDAO:
         :raises DBOperationWarning: When error is in data.
         """
 
-        LOG.info(f"DAO create request: task={task}")
+        LOG.info("DAO create request: task=%s", task)
 
-        try:
-            query = insert(
-                SQLAlchemyTaskModel
-            ).values(
-                **task.model_dump(),
-            ).returning(
-                SQLAlchemyTaskModel
-            )
+        if self.__create_batcher is not None:
+            return await self.__create_batcher.submit(task)
 
+        try:
             async with self.__db_engine.acquire_connection as conn:
-                task_raw = (await conn.execute(query)).mappings().first()
+                task_raw = (await conn.execute(CREATE_TASK_QUERY, task.model_dump())).mappings().first()
 
                 await conn.commit()
 
@@ -172,7 +671,7 @@ class SQLAlchemyTaskDAO:
                 BaseDBEngineError,
                 UnknownDBEngineError,
         ) as error:
-            LOG.error(f"DAO err: {error}")
+            LOG.error("DAO err: %s", error)
 
             raise DBOperationError from error
 
@@ -180,48 +679,102 @@ class SQLAlchemyTaskDAO:
                 AttributeError,
                 TypeError,
         ) as warning:
-            LOG.warning(f"DAO warning: {warning}")
+            LOG.warning("DAO warning: %s", warning)
 
             raise DBOperationWarning from warning
 
         return created_task
 
-    async def update(self, task_id: int, task: UpdateTaskRequest) -> UpdateTaskResponse:
-        """Updates task.
+    @instrument('dao')
+    async def create_many(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        """Creates tasks in a single transaction.
+
+        Rows are sent as multi-row INSERT ... RETURNING statements of DB_INSERT_BATCH_SIZE rows each.
+
+        :param tasks: List of TaskDTO.
+        :returns: Ids of created tasks in input order.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create_many request: tasks_count=%s", len(tasks))
+
+        if not tasks:
+            return CreateTaskBatchResponse(ids=[])
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                created_ids = (await conn.execute(
+                    CREATE_TASK_IDS_QUERY,
+                    [task.model_dump() for task in tasks],
+                    execution_options={'insertmanyvalues_page_size': CONFIGURATION.DB_SETTINGS.DB_INSERT_BATCH_SIZE},
+                )).scalars().all()
+
+                await conn.commit()
+
+            created_tasks = CreateTaskBatchResponse(ids=created_ids)
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return created_tasks
+
+    @instrument('dao')
+    async def update(self, task_id: int, task: UpdateTaskRequest, expected_version: int | None = None) -> UpdateTaskResponse:
+        """Updates task and increments its version.
 
         :param task_id: Task id.
         :param task: TaskDTO.
+        :param expected_version: Version the task must still have, None to update any version.
         :returns: TaskDTO of updated task.
         :raises DBOperationError: When error is in engine.
         :raises DBOperationWarning: When error is in data.
+        :raises DBOperationConflict: When task exists at another version.
         """
 
-        LOG.info(f"DAO update request: task_id={task_id}, task={task}")
+        LOG.info("DAO update request: task_id=%s, expected_version=%s, task=%s", task_id, expected_version, task)
+
+        conflict = False
 
         try:
-            query = update(
-                SQLAlchemyTaskModel
-            ).where(
-                SQLAlchemyTaskModel.id == task_id
-            ).values(
-                **task.model_dump(),
-            ).returning(
-                SQLAlchemyTaskModel
-            )
+            parameters = {'task_id': task_id, **task.model_dump()}
+
+            if expected_version is not None:
+                parameters['expected_version'] = expected_version
+
+            query = UPDATE_TASK_QUERY if expected_version is None else UPDATE_TASK_IF_VERSION_QUERY
 
             async with self.__db_engine.acquire_connection as conn:
-                updated_task_raw = (await conn.execute(query)).mappings().first()
+                updated_task_raw = (await conn.execute(query, parameters)).mappings().first()
+
+                if updated_task_raw is None and expected_version is not None:
+                    conflict = (await conn.execute(GET_TASK_QUERY, {'task_id': task_id})).first() is not None
 
                 await conn.commit()
 
-            updated_task = UpdateTaskResponse(**updated_task_raw)
+            if not conflict:
+                updated_task = UpdateTaskResponse(**updated_task_raw)
 
         except (
                 SQLAlchemyError,
                 BaseDBEngineError,
                 UnknownDBEngineError,
         ) as error:
-            LOG.error(f"DAO err: {error}")
+            LOG.error("DAO err: %s", error)
 
             raise DBOperationError from error
 
@@ -229,12 +782,18 @@ class SQLAlchemyTaskDAO:
                 AttributeError,
                 TypeError,
         ) as warning:
-            LOG.warning(f"DAO warning: {warning}")
+            LOG.warning("DAO warning: %s", warning)
 
             raise DBOperationWarning from warning
 
+        if conflict:
+            LOG.warning("DAO conflict: task_id=%s is not at version %s", task_id, expected_version)
+
+            raise DBOperationConflict(f"Task {task_id} is not at version {expected_version}")
+
         return updated_task
 
+    @instrument('dao')
     async def delete(self, task_id: int) -> DeleteTaskResponse:
         """Deletes task.
 
@@ -244,19 +803,11 @@ class SQLAlchemyTaskDAO:
         :raises DBOperationWarning: When error is in data.
         """
 
-        LOG.info(f"DAO delete request: task_id={task_id}")
+        LOG.info("DAO delete request: task_id=%s", task_id)
 
         try:
-            query = delete(
-                SQLAlchemyTaskModel
-            ).where(
-                SQLAlchemyTaskModel.id == task_id
-            ).returning(
-                SQLAlchemyTaskModel.id
-            )
-
             async with self.__db_engine.acquire_connection as conn:
-                deleted_task_raw = (await conn.execute(query)).mappings().first()
+                deleted_task_raw = (await conn.execute(DELETE_TASK_QUERY, {'task_id': task_id})).mappings().first()
 
                 await conn.commit()
 
@@ -267,7 +818,7 @@ class SQLAlchemyTaskDAO:
                 BaseDBEngineError,
                 UnknownDBEngineError,
         ) as error:
-            LOG.error(f"DAO err: {error}")
+            LOG.error("DAO err: %s", error)
 
             raise DBOperationError from error
 
@@ -275,8 +826,329 @@ class SQLAlchemyTaskDAO:
                 AttributeError,
                 TypeError,
         ) as warning:
-            LOG.warning(f"DAO warning: {warning}")
+            LOG.warning("DAO warning: %s", warning)
 
             raise DBOperationWarning from warning
 
         return deleted_task
+
+    @instrument('dao')
+    async def update_many(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        """Updates all tasks matching the filter with a single UPDATE ... RETURNING statement.
+
+        :param batch: Filter by ids and/or status and values to set.
+        :returns: Ids and count of updated tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO update_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            values = batch.values.model_dump(exclude_unset=True)
+
+            if not values:
+                raise ValueError("No values to update")
+
+            query, parameters = self.__batch_query(UPDATE_TASKS_QUERIES, batch.filter)
+
+            async with self.__db_engine.acquire_connection as conn:
+                updated_ids = (await conn.execute(query, {**parameters, **values})).scalars().all()
+
+                await conn.commit()
+
+            updated_tasks = UpdateTaskBatchResponse(ids=updated_ids, count=len(updated_ids))
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return updated_tasks
+
+    @instrument('dao')
+    async def delete_many(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        """Deletes all tasks matching the filter with a single DELETE ... RETURNING statement.
+
+        :param batch: Filter by ids and/or status.
+        :returns: Ids and count of deleted tasks.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO delete_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            query, parameters = self.__batch_query(DELETE_TASKS_QUERIES, batch.filter)
+
+            async with self.__db_engine.acquire_connection as conn:
+                deleted_ids = (await conn.execute(query, parameters)).scalars().all()
+
+                await conn.commit()
+
+            deleted_tasks = DeleteTaskBatchResponse(ids=deleted_ids, count=len(deleted_ids))
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return deleted_tasks
+
+    @instrument('dao')
+    async def get_stats(self) -> TaskStatsResponse:
+        """Gets number of tasks by status from the counter table.
+
+        :returns: Counts of every status and total.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_stats request")
+
+        try:
+            async with self.__db_engine.acquire_read_connection as conn:
+                stats_raw = (await conn.execute(GET_TASK_STATS_QUERY)).all()
+
+            stats = _to_stats(stats_raw)
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return stats
+
+    @instrument('dao')
+    async def reconcile_stats(self) -> TaskStatsResponse:
+        """Recounts tasks by status and corrects the counter table by the drift.
+
+        Scans the whole task table without blocking writers. Only one reconciliation runs at a time
+        across all processes.
+
+        :returns: Recounted counts of every status and total.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        :raises DBOperationConflict: When another reconciliation is running.
+        """
+
+        LOG.info("DAO reconcile_stats request")
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                locked = (await conn.execute(TRY_LOCK_TASK_STATS_QUERY)).scalar_one()
+                stats_raw = (await conn.execute(RECONCILE_TASK_STATS_QUERY)).all() if locked else []
+
+                await conn.commit()
+
+            stats = _to_stats([(status, counted) for status, counted, _ in stats_raw])
+            stats_before = _to_stats([(status, stored) for status, _, stored in stats_raw])
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+                ValueError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        if not locked:
+            LOG.info("DAO reconcile_stats skipped, another reconciliation is running")
+
+            raise DBOperationConflict("Task counters are being reconciled")
+
+        if stats != stats_before:
+            LOG.warning("Task counters drifted: counted=%s, stored=%s", stats.counts, stats_before.counts)
+
+        return stats
+
+    @instrument('dao', 'get_many')
+    async def __get_many(self, task_ids: List[int]) -> List[ReadTaskResponse | None]:
+        """Gets tasks by ids with a single id = ANY(:ids) query.
+
+        :param task_ids: Task ids, may contain duplicates.
+        :returns: TaskDTO or None for every requested id, in the same order.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO get_many request: ids_count=%s", len(task_ids))
+
+        try:
+            async with self.__db_engine.acquire_read_connection as conn:
+                task_list_raw = (await conn.execute(
+                    GET_TASKS_BY_IDS_QUERY,
+                    {'ids': list(set(task_ids))},
+                )).all()
+
+            found_tasks = {task.id: task for task in _to_tasks(task_list_raw)}
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return [found_tasks.get(task_id) for task_id in task_ids]
+
+    @instrument('dao', 'create_group')
+    async def __create_group(self, tasks: List[CreateTaskRequest]) -> List[CreateTaskResponse | BaseException]:
+        """Creates tasks collected by group commit with one multi-row INSERT and one COMMIT.
+
+        When the group fails on a data error, tasks are retried one by one,
+        so only the caller with the offending row gets the error.
+
+        :param tasks: List of TaskDTO.
+        :returns: TaskDTO of created task or error for every task, in the same order.
+        :raises DBOperationError: When error is in engine.
+        :raises DBOperationWarning: When error is in data.
+        """
+
+        LOG.info("DAO create group request: tasks_count=%s", len(tasks))
+
+        try:
+            async with self.__db_engine.acquire_connection as conn:
+                task_list_raw = (await conn.execute(
+                    CREATE_TASKS_QUERY,
+                    [task.model_dump() for task in tasks],
+                )).mappings().all()
+
+                await conn.commit()
+
+            created_tasks = [CreateTaskResponse(**row) for row in task_list_raw]
+
+        except (
+                SQLAlchemyError,
+                BaseDBEngineError,
+                UnknownDBEngineError,
+        ) as error:
+            if len(tasks) > 1 and self.__is_data_error(error):
+                LOG.warning("DAO group commit failed on data, retrying one by one: %s", error)
+
+                return [await self.__create_or_error(task) for task in tasks]
+
+            LOG.error("DAO err: %s", error)
+
+            raise DBOperationError from error
+
+        except (
+                AttributeError,
+                TypeError,
+        ) as warning:
+            LOG.warning("DAO warning: %s", warning)
+
+            raise DBOperationWarning from warning
+
+        return created_tasks
+
+    async def __create_or_error(self, task: CreateTaskRequest) -> CreateTaskResponse | BaseException:
+        """Creates a single task of a failed group, returning the error instead of raising it."""
+
+        try:
+            created_task, = await self.__create_group([task])
+
+            return created_task
+
+        except (
+                DBOperationError,
+                DBOperationWarning,
+        ) as error:
+            return error
+
+    @staticmethod
+    def __is_data_error(error: BaseException) -> bool:
+        """Checks whether error was caused by the rows themselves rather than by the engine."""
+
+        while error is not None:
+            if isinstance(error, (IntegrityError, DataError)):
+                return True
+
+            error = error.__cause__
+
+        return False
+
+    @staticmethod
+    def __batch_query(queries: Dict[Tuple[bool, bool], Update | Delete], filter_parameters: TaskBatchFilter) -> tuple:
+        """Picks the prebuilt batch statement for the filter. Ids are bound as a single array: id = ANY(:ids).
+
+        :param queries: Prebuilt statements by presence of ids and status in the filter.
+        :param filter_parameters: Filter by ids and/or status.
+        :returns: Statement and its filter parameters.
+        :raises ValueError: When filter is empty, so the statement would touch the whole table.
+        """
+
+        by_ids = filter_parameters.ids is not None
+        by_status = filter_parameters.status is not None
+
+        if not (by_ids or by_status):
+            raise ValueError("Batch filter must contain ids or status")
+
+        parameters = {}
+
+        if by_ids:
+            parameters['filter_ids'] = filter_parameters.ids
+
+        if by_status:
+            parameters['filter_status'] = filter_parameters.status
+
+        return queries[(by_ids, by_status)], parameters
@@ -0,0 +1,199 @@
+import re
+import time
+import asyncio
+import logging
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Set
+
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+from app.utils.request_context import current_operation
+
+
+__all__ = (
+    'SlowQueryLog',
+    'normalize_sql',
+    'parameter_shapes',
+)
+
+LOG = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w$.])\d+(?:\.\d+)?\b')
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapses whitespace and replaces literals by ?, so slow statements of the same shape look alike.
+
+    Bound parameters ($1, $2, ...) are kept as they are.
+    """
+
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def _shape(value: Any) -> str:
+    if isinstance(value, (str, bytes, list, tuple, dict, set)):
+        return f'{type(value).__name__}[{len(value)}]'
+
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> List[str]:
+    """Types of bound parameters without their values, with lengths of strings and collections.
+
+    For executemany only the first row is described, with the number of rows.
+    """
+
+    if executemany:
+        rows = list(parameters)
+
+        return [f'rows[{len(rows)}]', *parameter_shapes(rows[0], False)] if rows else ['rows[0]']
+
+    if isinstance(parameters, dict):
+        return [f'{name}: {_shape(value)}' for name, value in parameters.items()]
+
+    return [_shape(value) for value in parameters or ()]
+
+
+class SlowQueryLog:
+    """Logs statements slower than a threshold and keeps the latest ones in a ring buffer.
+
+    At most one slow SELECT per explain_interval is re-run with EXPLAIN (ANALYZE, BUFFERS)
+    on a connection of its own, outside of the pool, in a read only transaction that is rolled back.
+    The plan is attached to the entry of the statement when it is ready.
+    """
+
+    __slots__ = (
+        '__threshold',
+        '__explain_interval',
+        '__explain_timeout',
+        '__entries',
+        '__last_explain_at',
+        '__explain_engines',
+        '__explain_tasks',
+    )
+
+    def __init__(
+            self,
+            threshold: float,
+            explain_interval: float = 60.0,
+            explain_timeout: float = 30.0,
+            size: int = 100,
+    ) -> None:
+        """Initialization.
+
+        :param threshold: Seconds from which a statement is slow.
+        :param explain_interval: Min seconds between two EXPLAIN ANALYZE runs, 0 to never run them.
+        :param explain_timeout: statement_timeout of EXPLAIN ANALYZE runs in seconds.
+        :param size: Number of latest slow statements kept.
+        """
+
+        self.__threshold = threshold
+        self.__explain_interval = explain_interval
+        self.__explain_timeout = explain_timeout
+        self.__entries: Deque[Dict] = deque(maxlen=size)
+        self.__last_explain_at = float('-inf')
+        self.__explain_engines: Dict[str, AsyncEngine] = {}
+        self.__explain_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def threshold(self) -> float:
+        return self.__threshold
+
+    def record(self, url: URL, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        """Logs a statement that took elapsed seconds, if it is slow.
+
+        Called from the after_cursor_execute event, so it must not block.
+
+        :param url: URL of the database the statement ran on, EXPLAIN runs there too.
+        """
+
+        if elapsed < self.__threshold:
+            return
+
+        entry = {
+            'sql': normalize_sql(statement),
+            'parameters': parameter_shapes(parameters, executemany),
+            'duration': elapsed,
+            'operation': current_operation(),
+            'database': url.render_as_string(hide_password=True),
+            'logged_at': time.time(),
+            'plan': None,
+        }
+
+        LOG.warning(
+            "Slow query: %.3fs in %s | sql: %s | parameters: %s",
+            elapsed, entry['operation'], entry['sql'], entry['parameters'],
+        )
+
+        self.__entries.append(entry)
+
+        if self.__should_explain(statement, executemany):
+            task = asyncio.get_running_loop().create_task(self.__explain(entry, url, statement, parameters))
+            self.__explain_tasks.add(task)
+            task.add_done_callback(self.__explain_tasks.discard)
+
+    def __should_explain(self, statement: str, executemany: bool) -> bool:
+        if not self.__explain_interval or executemany:
+            return False
+
+        # EXPLAIN ANALYZE executes the statement, so only reads are run again.
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return False
+
+        now = time.monotonic()
+
+        if now - self.__last_explain_at < self.__explain_interval:
+            return False
+
+        self.__last_explain_at = now
+
+        return True
+
+    async def __explain(self, entry: Dict, url: URL, statement: str, parameters: Any) -> None:
+        """Runs EXPLAIN (ANALYZE, BUFFERS) of statement and stores the plan in entry."""
+
+        key = url.render_as_string(hide_password=False)
+        engine = self.__explain_engines.get(key)
+
+        if engine is None:
+            engine = self.__explain_engines[key] = create_async_engine(url, poolclass=NullPool)
+
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                await conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(self.__explain_timeout * 1000)}')
+
+                rows = await conn.exec_driver_sql(f'EXPLAIN (ANALYZE, BUFFERS) {statement}', tuple(parameters or ()))
+
+                entry['plan'] = '\n'.join(row[0] for row in rows)
+
+                await conn.rollback()
+
+        except (Exception,) as error:
+            LOG.warning("Failed to explain slow query | 'err': %s", error)
+
+            entry['plan'] = f'EXPLAIN failed: {error}'
+
+    def entries(self) -> List[Dict]:
+        """Returns the kept slow statements, the latest first."""
+
+        return [dict(entry) for entry in reversed(self.__entries)]
+
+    async def close(self) -> None:
+        """Cancels running EXPLAIN runs and closes their engines."""
+
+        for task in list(self.__explain_tasks):
+            task.cancel()
+
+        for engine in self.__explain_engines.values():
+            await engine.dispose()
+
+        self.__explain_engines.clear()
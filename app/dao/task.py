@@ -0,0 +1,53 @@
+from typing import AsyncIterator, List, Protocol
+
+from app.dto.task import *
+
+
+__all__ = (
+    'TaskDAO',
+)
+
+
+class TaskDAO(Protocol):
+    """Interface of task data access objects.
+
+    Implementations raise DBOperationError when error is in engine,
+    DBOperationWarning when error is in data and DBOperationConflict
+    when a row is not at the expected version.
+    """
+
+    async def get(self, task_id: int) -> ReadTaskResponse | None:
+        ...
+
+    async def get_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        ...
+
+    async def search(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        ...
+
+    def stream_list(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        ...
+
+    async def create(self, task: CreateTaskRequest) -> CreateTaskResponse:
+        ...
+
+    async def create_many(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        ...
+
+    async def update(self, task_id: int, task: UpdateTaskRequest, expected_version: int | None = None) -> UpdateTaskResponse:
+        ...
+
+    async def update_many(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        ...
+
+    async def delete(self, task_id: int) -> DeleteTaskResponse:
+        ...
+
+    async def delete_many(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        ...
+
+    async def get_stats(self) -> TaskStatsResponse:
+        ...
+
+    async def reconcile_stats(self) -> TaskStatsResponse:
+        ...
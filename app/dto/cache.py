@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+__all__ = (
+    'CacheStatsResponse',
+)
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
@@ -0,0 +1,25 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+__all__ = (
+    'HistogramResponse',
+    'PoolStatsResponse',
+)
+
+
+class HistogramResponse(BaseModel):
+    buckets: Dict[str, int]
+    count: int
+    sum: float
+
+
+class PoolStatsResponse(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkout_timeouts: int
+    checkout_wait: HistogramResponse
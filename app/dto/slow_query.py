@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+__all__ = (
+    'SlowQueryResponse',
+    'SlowQueryListResponse',
+)
+
+
+class SlowQueryResponse(BaseModel):
+    sql: str
+    parameters: List[str]
+    duration: float
+    operation: str | None
+    database: str
+    logged_at: datetime
+    plan: str | None
+
+
+class SlowQueryListResponse(BaseModel):
+    items: List[SlowQueryResponse]
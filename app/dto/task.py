@@ -1,17 +1,33 @@
 from enum import Enum
+from typing import Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 __all__ = (
     'TaskStatus',
     'CreateTaskRequest',
     'CreateTaskResponse',
+    'CreateTaskBatchRequest',
+    'CreateTaskBatchResponse',
     'ReadTaskResponse',
     'ReadTaskListRequest',
+    'ReadTaskListResponse',
+    'SearchTaskListRequest',
+    'ExportTaskListRequest',
     'UpdateTaskRequest',
     'UpdateTaskResponse',
     'DeleteTaskResponse',
+    'TaskBatchFilter',
+    'UpdateTaskBatchRequest',
+    'UpdateTaskBatchResponse',
+    'DeleteTaskBatchRequest',
+    'DeleteTaskBatchResponse',
+    'TaskStatsResponse',
+    'TaskEventType',
+    'TaskEvent',
+    'TaskEventsRequest',
+    'READ_TASK_LIST_ADAPTER',
 )
 
 
@@ -26,6 +42,7 @@ class BaseResponse(BaseModel):
     title: str
     description: str | None
     status: TaskStatus
+    version: int
 
 
 class CreateTaskRequest(BaseModel):
@@ -38,12 +55,37 @@ class CreateTaskResponse(BaseResponse):
     pass
 
 
+class CreateTaskBatchRequest(BaseModel):
+    tasks: List[CreateTaskRequest]
+
+
+class CreateTaskBatchResponse(BaseModel):
+    ids: List[int]
+
+
 class ReadTaskResponse(BaseResponse):
     pass
 
 
 class ReadTaskListRequest(BaseModel):
     status: TaskStatus | None = None
+    after: str | None = None
+    limit: int = 100
+
+
+class ReadTaskListResponse(BaseModel):
+    items: List[ReadTaskResponse]
+    next_cursor: str | None = None
+
+
+class SearchTaskListRequest(BaseModel):
+    q: str
+    after: str | None = None
+    limit: int = 100
+
+
+class ExportTaskListRequest(BaseModel):
+    status: TaskStatus | None = None
 
 
 class UpdateTaskRequest(BaseModel):
@@ -60,3 +102,59 @@ class DeleteTaskResponse(BaseModel):
     id: int
 
 
+class TaskBatchFilter(BaseModel):
+    ids: List[int] | None = None
+    status: TaskStatus | None = None
+
+
+class BaseBatchResponse(BaseModel):
+    ids: List[int]
+    count: int
+
+
+class UpdateTaskBatchRequest(BaseModel):
+    filter: TaskBatchFilter
+    values: UpdateTaskRequest
+
+
+class UpdateTaskBatchResponse(BaseBatchResponse):
+    pass
+
+
+class DeleteTaskBatchRequest(BaseModel):
+    filter: TaskBatchFilter
+
+
+class DeleteTaskBatchResponse(BaseBatchResponse):
+    pass
+
+
+class TaskStatsResponse(BaseModel):
+    counts: Dict[TaskStatus, int]
+    total: int
+
+
+class TaskEventType(Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class TaskEvent(BaseModel):
+    """Change of a task. status and version are the new ones, or the last ones of a deleted task."""
+
+    id: int
+    type: TaskEventType
+    task_id: int
+    status: TaskStatus
+    previous_status: TaskStatus | None = None
+    version: int
+
+
+class TaskEventsRequest(BaseModel):
+    status: TaskStatus | None = None
+    last_event_id: int | None = None
+
+
+# Validates a whole list of rows in one call, cheaper than building the models one by one.
+READ_TASK_LIST_ADAPTER: TypeAdapter[List[ReadTaskResponse]] = TypeAdapter(List[ReadTaskResponse])
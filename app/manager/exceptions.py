@@ -2,6 +2,7 @@ __all__ = (
     'BaseManagerError',
     'DAOManagerError',
     'DataManagerError',
+    'ConflictManagerError',
 )
 
 
@@ -15,3 +16,7 @@ class DAOManagerError(BaseManagerError):
 
 class DataManagerError(BaseManagerError):
     """DataManagerError"""
+
+
+class ConflictManagerError(BaseManagerError):
+    """ConflictManagerError"""
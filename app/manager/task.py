@@ -1,11 +1,14 @@
 import logging
 
-from typing import List
+from typing import AsyncIterator, List
 
 from app.dto.task import *
-from app.dao.sqlalchemy.model.task import SQLAlchemyTaskDAO
-from app.manager.exceptions import DataManagerError, DAOManagerError
-from app.dao.sqlalchemy.exceptions import DBOperationError, DBOperationWarning
+from app.dao.task import TaskDAO
+from app.utils.single_flight import SingleFlight
+from app.utils.request_context import reads_pinned_to_primary
+from app.utils.metrics import instrument
+from app.manager.exceptions import DataManagerError, DAOManagerError, ConflictManagerError
+from app.dao.exceptions import DBOperationError, DBOperationWarning, DBOperationConflict
 
 
 __all__ = (
@@ -20,16 +23,19 @@ class TaskManager:
 
     __slots__ = (
         '__task_dao',
+        '__single_flight',
     )
 
-    def __init__(self, task_dao: SQLAlchemyTaskDAO) -> None:
+    def __init__(self, task_dao: TaskDAO) -> None:
         """Initialization.
 
         :param task_dao:
         """
 
         self.__task_dao = task_dao
+        self.__single_flight = SingleFlight()
 
+    @instrument('manager')
     async def create_task(self, task: CreateTaskRequest) -> CreateTaskResponse:
         """create_task.
 
@@ -37,7 +43,7 @@ class TaskManager:
         :raises DataManagerError:
         """
 
-        LOG.info(f"Manager create request: task={task}")
+        LOG.info("Manager create request: task=%s", task)
 
         try:
             created_task = await self.__task_dao.create(task)
@@ -50,17 +56,42 @@ class TaskManager:
 
         return created_task
 
+    @instrument('manager')
+    async def create_tasks(self, tasks: List[CreateTaskRequest]) -> CreateTaskBatchResponse:
+        """create_tasks.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager create_many request: tasks_count=%s", len(tasks))
+
+        try:
+            created_tasks = await self.__task_dao.create_many(tasks)
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        return created_tasks
+
+    @instrument('manager')
     async def get_task(self, task_id: int) -> ReadTaskResponse | None:
-        """get_task.
+        """get_task. Concurrent calls with the same task_id share one DAO call.
 
         :raises DAOManagerError:
         :raises DataManagerError:
         """
 
-        LOG.info(f"Manager get request: task_id={task_id}")
+        LOG.info("Manager get request: task_id=%s", task_id)
 
         try:
-            found_task = await self.__task_dao.get(task_id)
+            found_task = await self.__single_flight.do(
+                ('get', task_id, reads_pinned_to_primary()),
+                lambda: self.__task_dao.get(task_id),
+            )
 
         except DBOperationError as error:
             raise DAOManagerError from error
@@ -70,17 +101,21 @@ class TaskManager:
 
         return found_task
 
-    async def get_task_list(self, filter_parameters: ReadTaskListRequest) -> List[ReadTaskResponse]:
-        """get_task_list.
+    @instrument('manager')
+    async def get_task_list(self, filter_parameters: ReadTaskListRequest) -> ReadTaskListResponse:
+        """get_task_list. Concurrent calls with equal filter_parameters share one DAO call.
 
         :raises DAOManagerError:
         :raises DataManagerError:
         """
 
-        LOG.info(f"Manager get_list request: filter_parameters={filter_parameters}")
+        LOG.info("Manager get_list request: filter_parameters=%s", filter_parameters)
 
         try:
-            found_tasks = await self.__task_dao.get_list(filter_parameters)
+            found_tasks = await self.__single_flight.do(
+                ('get_list', reads_pinned_to_primary(), *filter_parameters.model_dump().values()),
+                lambda: self.__task_dao.get_list(filter_parameters),
+            )
 
         except DBOperationError as error:
             raise DAOManagerError from error
@@ -90,17 +125,67 @@ class TaskManager:
 
         return found_tasks
 
-    async def update_task(self, task_id: int, task: UpdateTaskRequest) -> UpdateTaskResponse:
+    @instrument('manager')
+    async def search_tasks(self, filter_parameters: SearchTaskListRequest) -> ReadTaskListResponse:
+        """search_tasks. Concurrent calls with equal filter_parameters share one DAO call.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager search request: filter_parameters=%s", filter_parameters)
+
+        try:
+            found_tasks = await self.__single_flight.do(
+                ('search', reads_pinned_to_primary(), *filter_parameters.model_dump().values()),
+                lambda: self.__task_dao.search(filter_parameters),
+            )
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        return found_tasks
+
+    async def export_tasks(self, filter_parameters: ExportTaskListRequest) -> AsyncIterator[ReadTaskResponse]:
+        """export_tasks.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager export request: filter_parameters=%s", filter_parameters)
+
+        try:
+            async for task in self.__task_dao.stream_list(filter_parameters):
+                yield task
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+    @instrument('manager')
+    async def update_task(
+            self,
+            task_id: int,
+            task: UpdateTaskRequest,
+            expected_version: int | None = None,
+    ) -> UpdateTaskResponse:
         """update_task.
 
         :raises DAOManagerError:
         :raises DataManagerError:
+        :raises ConflictManagerError: When task is not at expected_version.
         """
 
-        LOG.info(f"Manager update request: task_id={task_id}, task={task}")
+        LOG.info("Manager update request: task_id=%s, expected_version=%s, task=%s", task_id, expected_version, task)
 
         try:
-            updated_task = await self.__task_dao.update(task_id, task)
+            updated_task = await self.__task_dao.update(task_id, task, expected_version)
 
         except DBOperationError as error:
             raise DAOManagerError from error
@@ -108,8 +193,33 @@ class TaskManager:
         except DBOperationWarning as error:
             raise DataManagerError from error
 
+        except DBOperationConflict as error:
+            raise ConflictManagerError from error
+
         return updated_task
 
+    @instrument('manager')
+    async def update_tasks(self, batch: UpdateTaskBatchRequest) -> UpdateTaskBatchResponse:
+        """update_tasks.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager update_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            updated_tasks = await self.__task_dao.update_many(batch)
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        return updated_tasks
+
+    @instrument('manager')
     async def delete_task(self, task_id: int) -> DeleteTaskResponse:
         """delete_task.
 
@@ -117,7 +227,7 @@ class TaskManager:
         :raises DataManagerError:
         """
 
-        LOG.info(f"Manager delete request: task_id={task_id}")
+        LOG.info("Manager delete request: task_id=%s", task_id)
 
         try:
             deleted_task = await self.__task_dao.delete(task_id)
@@ -130,3 +240,69 @@ class TaskManager:
 
         return deleted_task
 
+    @instrument('manager')
+    async def delete_tasks(self, batch: DeleteTaskBatchRequest) -> DeleteTaskBatchResponse:
+        """delete_tasks.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager delete_many request: status=%s, ids_count=%s", batch.filter.status, len(batch.filter.ids or ()))
+
+        try:
+            deleted_tasks = await self.__task_dao.delete_many(batch)
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        return deleted_tasks
+
+    @instrument('manager')
+    async def get_task_stats(self) -> TaskStatsResponse:
+        """get_task_stats. Concurrent calls share one DAO call.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        """
+
+        LOG.info("Manager get_stats request")
+
+        try:
+            stats = await self.__single_flight.do(('get_stats', reads_pinned_to_primary()), self.__task_dao.get_stats)
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        return stats
+
+    @instrument('manager')
+    async def reconcile_task_stats(self) -> TaskStatsResponse:
+        """reconcile_task_stats. Concurrent calls share one recount.
+
+        :raises DAOManagerError:
+        :raises DataManagerError:
+        :raises ConflictManagerError: When another process is reconciling.
+        """
+
+        LOG.info("Manager reconcile_stats request")
+
+        try:
+            stats = await self.__single_flight.do(('reconcile_stats',), self.__task_dao.reconcile_stats)
+
+        except DBOperationError as error:
+            raise DAOManagerError from error
+
+        except DBOperationWarning as error:
+            raise DataManagerError from error
+
+        except DBOperationConflict as error:
+            raise ConflictManagerError from error
+
+        return stats
@@ -1,9 +1,14 @@
-import logging.config
+import time
+import atexit
+import asyncio
+import logging
+import importlib.util
 
 from logging import Logger
 from typing import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
+import asyncpg
 import uvicorn
 
 # from alembic import command
@@ -11,18 +16,40 @@ import uvicorn
 from fastapi import FastAPI
 
 from app.manager import TaskManager
+from app.manager.exceptions import BaseManagerError, ConflictManagerError
 from app.config import CONFIGURATION
+from app.utils.lru_cache import LRUCache
+from app.utils.admission import AdmissionLimiter
+from app.utils.event_broker import EventBroker
+from app.utils.log_pipeline import configure_logging
 from app.api.http.handler.task import TaskHandler
+from app.api.http.handler.admin import AdminHandler
+from app.api.http.handler.metrics import MetricsHandler
+from app.api.http.middleware import ReadYourWritesMiddleware, MetricsMiddleware, AdmissionMiddleware
+from app.dao.task import TaskDAO
+from app.dao.exceptions import InitDBEngineError, DBOperationError
+from app.dao.cache.task import CachedTaskDAO, estimate_task_size
+from app.dto.task import TaskEvent
+from app.dao.asyncpg.task import AsyncpgTaskDAO
+from app.dao.memory.task import InMemoryTaskDAO
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.asyncpg.task_events import TaskEventListener
 from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
 from app.dao.sqlalchemy.model.task import SQLAlchemyTaskDAO
 
 
 __all__ = (
     'start_app',
+    'create_app',
 )
 
 LOG: Logger
 
+# Long-lived streams hold their slot for minutes, they are not admission controlled.
+ADMISSION_EXEMPT_PATHS = ('/tasks/export', '/tasks/events')
+
+__logging_configured = False
+
 
 # @asynccontextmanager
 # async def __run_migrations() -> AsyncIterator[None]:
@@ -34,15 +61,32 @@ LOG: Logger
 #         yield
 #
 #     except (Exception,) as error:
-#         LOG.error(f"An error occurred during migration: {error}")
+#         LOG.error("An error occurred during migration: %s", error)
 #
 #     finally:
 #         pass
 
 def __configure_logger() -> None:
-    """Configure the logger."""
+    """Configure the logger once per process.
+
+    Handlers from the config file are written by a background thread,
+    so the event loop never blocks on log I/O.
+    """
+
+    global __logging_configured
 
-    logging.config.fileConfig('logging.ini', disable_existing_loggers=False)
+    if __logging_configured:
+        return
+
+    __logging_configured = True
+
+    listener = configure_logging(
+        config_path=CONFIGURATION.LOGGING_SETTINGS.LOGGING_CONFIG,
+        queue_size=CONFIGURATION.LOGGING_SETTINGS.LOGGING_QUEUE_SIZE,
+        json_format=CONFIGURATION.LOGGING_SETTINGS.LOGGING_JSON,
+        sample_rates=CONFIGURATION.LOGGING_SETTINGS.LOGGING_SAMPLE_RATES,
+    )
+    atexit.register(listener.stop)
 
     global LOG
     LOG = logging.getLogger(__name__)
@@ -62,11 +106,150 @@ def __create_db_engine() -> SQLAlchemyDBEngine:
         host=CONFIGURATION.DB_SETTINGS.DB_HOST,
         port=CONFIGURATION.DB_SETTINGS.DB_PORT,
         database=CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+        pool_size=CONFIGURATION.DB_SETTINGS.DB_POOL_SIZE,
+        max_overflow=CONFIGURATION.DB_SETTINGS.DB_MAX_OVERFLOW,
+        pool_timeout=CONFIGURATION.DB_SETTINGS.DB_POOL_TIMEOUT,
+        pool_recycle=CONFIGURATION.DB_SETTINGS.DB_POOL_RECYCLE,
+        pool_pre_ping=CONFIGURATION.DB_SETTINGS.DB_POOL_PRE_PING,
+        statement_cache_size=CONFIGURATION.DB_SETTINGS.DB_STATEMENT_CACHE_SIZE,
+        echo=CONFIGURATION.DB_SETTINGS.DB_ECHO,
+        replica_urls=CONFIGURATION.DB_SETTINGS.DB_REPLICA_URLS,
+        replica_health_check_interval=CONFIGURATION.DB_SETTINGS.DB_REPLICA_HEALTH_CHECK_INTERVAL,
+        slow_query_threshold=CONFIGURATION.DB_SETTINGS.DB_SLOW_QUERY_THRESHOLD,
+        slow_query_explain_interval=CONFIGURATION.DB_SETTINGS.DB_SLOW_QUERY_EXPLAIN_INTERVAL,
+        slow_query_explain_timeout=CONFIGURATION.DB_SETTINGS.DB_SLOW_QUERY_EXPLAIN_TIMEOUT,
+        slow_query_log_size=CONFIGURATION.DB_SETTINGS.DB_SLOW_QUERY_LOG_SIZE,
+    )
+
+    return db_engine
+
+
+def __create_asyncpg_db_engine() -> AsyncpgDBEngine:
+    """__create_asyncpg_db_engine.
+
+    Pool limits follow the SQLAlchemy pool settings: DB_POOL_SIZE connections are kept open,
+    up to DB_MAX_OVERFLOW more are opened under load.
+
+    :returns AsyncpgDBEngine:
+    """
+
+    db_engine = AsyncpgDBEngine(
+        username=CONFIGURATION.DB_SETTINGS.DB_USERNAME,
+        password=CONFIGURATION.DB_SETTINGS.DB_PASSWORD,
+        host=CONFIGURATION.DB_SETTINGS.DB_HOST,
+        port=CONFIGURATION.DB_SETTINGS.DB_PORT,
+        database=CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+        min_size=CONFIGURATION.DB_SETTINGS.DB_POOL_SIZE,
+        max_size=CONFIGURATION.DB_SETTINGS.DB_POOL_SIZE + CONFIGURATION.DB_SETTINGS.DB_MAX_OVERFLOW,
+        acquire_timeout=CONFIGURATION.DB_SETTINGS.DB_POOL_TIMEOUT,
+        max_inactive_connection_lifetime=max(CONFIGURATION.DB_SETTINGS.DB_POOL_RECYCLE, 0),
+        statement_cache_size=CONFIGURATION.DB_SETTINGS.DB_STATEMENT_CACHE_SIZE,
     )
 
     return db_engine
 
 
+def __task_cache_enabled() -> bool:
+    """CACHE_ENABLED, when not set the cache is used only where it can not serve stale tasks for long.
+
+    Every worker has its own cache, writes of the other workers reach it through the change feed.
+    Misses read from a lagging replica are not cached, so with replicas the cache is mostly empty.
+    """
+
+    if CONFIGURATION.CACHE_SETTINGS.CACHE_ENABLED is not None:
+        return CONFIGURATION.CACHE_SETTINGS.CACHE_ENABLED
+
+    if CONFIGURATION.DB_SETTINGS.DB_REPLICA_URLS:
+        return False
+
+    return (
+        CONFIGURATION.APP_SETTINGS.APP_WORKERS == 1
+        or CONFIGURATION.DB_SETTINGS.DB_TASK_DAO == 'memory'
+        or __task_events_enabled()
+    )
+
+
+def __create_task_cache() -> LRUCache | None:
+    """__create_task_cache.
+
+    :returns LRUCache: None if caching is disabled.
+    """
+
+    if not __task_cache_enabled():
+        return None
+
+    return LRUCache(
+        max_entries=CONFIGURATION.CACHE_SETTINGS.CACHE_MAX_ENTRIES,
+        max_bytes=CONFIGURATION.CACHE_SETTINGS.CACHE_MAX_BYTES,
+        ttl=CONFIGURATION.CACHE_SETTINGS.CACHE_TTL,
+        sizeof=estimate_task_size,
+    )
+
+
+async def __reconcile_task_stats(task_manager: TaskManager, interval: float) -> None:
+    """Recomputes the task counters every interval seconds, repairing any drift of the triggers.
+
+    Runs are aligned to the wall clock, so the workers start them together: the first one
+    takes the lock of the reconciliation and the others skip it.
+
+    :param task_manager:
+    :param interval: Seconds between runs.
+    """
+
+    while True:
+        await asyncio.sleep(interval - time.time() % interval)
+
+        try:
+            await task_manager.reconcile_task_stats()
+
+        except ConflictManagerError:
+            LOG.info("Task stats are reconciled by another worker")
+
+        except BaseManagerError as error:
+            LOG.error("Task stats reconciliation failed. err=%s", error)
+
+
+def __create_task_event_listener(broker: EventBroker[TaskEvent]) -> TaskEventListener:
+    """__create_task_event_listener.
+
+    :returns TaskEventListener:
+    """
+
+    return TaskEventListener(
+        broker=broker,
+        username=CONFIGURATION.DB_SETTINGS.DB_USERNAME,
+        password=CONFIGURATION.DB_SETTINGS.DB_PASSWORD,
+        host=CONFIGURATION.DB_SETTINGS.DB_HOST,
+        port=CONFIGURATION.DB_SETTINGS.DB_PORT,
+        database=CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+        ping_interval=CONFIGURATION.DB_SETTINGS.DB_TASK_EVENTS_PING_INTERVAL,
+        reconnect_interval=CONFIGURATION.DB_SETTINGS.DB_TASK_EVENTS_RECONNECT_INTERVAL,
+    )
+
+
+def __task_events_enabled() -> bool:
+    """Task changes are notified by triggers of the database, the in-memory DAO has none."""
+
+    return CONFIGURATION.DB_SETTINGS.DB_TASK_EVENTS_ENABLED and CONFIGURATION.DB_SETTINGS.DB_TASK_DAO != 'memory'
+
+
+async def __save_task_snapshots(task_dao: InMemoryTaskDAO, interval: float) -> None:
+    """Saves a snapshot of the in-memory tasks every interval seconds.
+
+    :param task_dao:
+    :param interval: Seconds between snapshots.
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+
+        try:
+            await task_dao.save_snapshot()
+
+        except DBOperationError as error:
+            LOG.error("Tasks snapshot failed. err=%s", error)
+
+
 @asynccontextmanager
 async def __lifespan(app: FastAPI) -> AsyncIterator[None]:
     LOG.info("startup")
@@ -74,33 +257,286 @@ async def __lifespan(app: FastAPI) -> AsyncIterator[None]:
     # LOG.info("Running migrations...")
     # __run_migrations()
 
-    LOG.info("Starting db_engine...")
+    LOG.info("Starting db_engine... task_dao=%s", CONFIGURATION.DB_SETTINGS.DB_TASK_DAO)
+
+    get_batch_window = (
+        CONFIGURATION.DB_SETTINGS.DB_GET_BATCH_WINDOW if CONFIGURATION.DB_SETTINGS.DB_GET_BATCH_ENABLED else None
+    )
+
+    db_engine: SQLAlchemyDBEngine | AsyncpgDBEngine | None = None
+    memory_task_dao: InMemoryTaskDAO | None = None
+    task_dao: TaskDAO
+
+    if CONFIGURATION.DB_SETTINGS.DB_TASK_DAO == 'memory':
+        LOG.info("Initializing task layers...")
+
+        if CONFIGURATION.APP_SETTINGS.APP_WORKERS > 1:
+            LOG.warning("Tasks are kept in memory, each of %s workers has its own", CONFIGURATION.APP_SETTINGS.APP_WORKERS)
 
-    db_engine = __create_db_engine()
+        task_dao = memory_task_dao = InMemoryTaskDAO(snapshot_path=CONFIGURATION.DB_SETTINGS.DB_MEMORY_SNAPSHOT_PATH)
 
-    LOG.info("Initializing task layers...")
+    elif CONFIGURATION.DB_SETTINGS.DB_TASK_DAO == 'asyncpg':
+        db_engine = __create_asyncpg_db_engine()
+
+        LOG.info("Initializing task layers...")
+
+        task_dao = AsyncpgTaskDAO(
+            db_engine=db_engine,
+            get_batch_window=get_batch_window,
+            get_batch_max_size=CONFIGURATION.DB_SETTINGS.DB_GET_BATCH_MAX_SIZE,
+        )
+
+    else:
+        db_engine = __create_db_engine()
+
+        LOG.info("Initializing task layers...")
+
+        task_dao = SQLAlchemyTaskDAO(
+            db_engine=db_engine,
+            get_batch_window=get_batch_window,
+            get_batch_max_size=CONFIGURATION.DB_SETTINGS.DB_GET_BATCH_MAX_SIZE,
+            create_batch_window=(
+                CONFIGURATION.DB_SETTINGS.DB_GROUP_COMMIT_WINDOW if CONFIGURATION.DB_SETTINGS.DB_GROUP_COMMIT_ENABLED else None
+            ),
+            create_batch_max_size=CONFIGURATION.DB_SETTINGS.DB_GROUP_COMMIT_MAX_SIZE,
+        )
+
+    task_events: EventBroker[TaskEvent] | None = None
+    task_event_listener: TaskEventListener | None = None
+
+    if __task_events_enabled():
+        task_events = EventBroker(
+            name='task',
+            history_size=CONFIGURATION.DB_SETTINGS.DB_TASK_EVENTS_HISTORY_SIZE,
+            queue_size=CONFIGURATION.APP_SETTINGS.APP_EVENTS_QUEUE_SIZE,
+        )
+        task_event_listener = __create_task_event_listener(task_events)
+
+    task_cache = __create_task_cache()
+    cache_follow_task: asyncio.Task | None = None
+
+    if task_cache is not None:
+        task_dao = CachedTaskDAO(
+            task_dao=task_dao,
+            cache=task_cache,
+            negative_ttl=CONFIGURATION.CACHE_SETTINGS.CACHE_NEGATIVE_TTL,
+            replica_reads=bool(CONFIGURATION.DB_SETTINGS.DB_REPLICA_URLS),
+        )
+
+        if task_events is not None:
+            # Subscribed before the listener connects, the reset of the first connect clears nothing.
+            cache_follow_task = asyncio.create_task(task_dao.follow(task_events))
+
+        elif CONFIGURATION.APP_SETTINGS.APP_WORKERS > 1 and CONFIGURATION.DB_SETTINGS.DB_TASK_DAO != 'memory':
+            LOG.warning("Task cache of each of %s workers misses writes of the others for up to %ss",
+                        CONFIGURATION.APP_SETTINGS.APP_WORKERS, CONFIGURATION.CACHE_SETTINGS.CACHE_TTL)
+
+    if task_event_listener is not None:
+        task_event_listener.start()
 
-    task_dao = SQLAlchemyTaskDAO(db_engine=db_engine)
     task_manager = TaskManager(task_dao=task_dao)
-    task_handler = TaskHandler(task_manager=task_manager)
+    task_handler = TaskHandler(
+        task_manager=task_manager,
+        task_events=task_events,
+        events_heartbeat_interval=CONFIGURATION.APP_SETTINGS.APP_EVENTS_HEARTBEAT_INTERVAL,
+        events_max_duration=CONFIGURATION.APP_SETTINGS.APP_EVENTS_MAX_STREAM_DURATION,
+    )
+    admin_handler = AdminHandler(task_cache=task_cache, db_engine=db_engine, task_manager=task_manager)
 
     LOG.info("Adding task routes...")
 
     app.include_router(task_handler.router, prefix="/tasks")
+    app.include_router(admin_handler.router, prefix="/admin")
+
+    if CONFIGURATION.APP_SETTINGS.APP_METRICS_ENABLED:
+        if CONFIGURATION.APP_SETTINGS.APP_WORKERS > 1:
+            LOG.warning("/metrics of each of %s workers exports only its own values, a scrape reaches one of them",
+                        CONFIGURATION.APP_SETTINGS.APP_WORKERS)
+
+        app.include_router(MetricsHandler(task_cache=task_cache, db_engine=db_engine).router)
+
+    reconcile_task: asyncio.Task | None = None
+
+    if CONFIGURATION.DB_SETTINGS.DB_STATS_RECONCILE_INTERVAL > 0:
+        reconcile_task = asyncio.create_task(
+            __reconcile_task_stats(task_manager, CONFIGURATION.DB_SETTINGS.DB_STATS_RECONCILE_INTERVAL)
+        )
+
+    snapshot_task: asyncio.Task | None = None
+
+    if memory_task_dao is not None and CONFIGURATION.DB_SETTINGS.DB_MEMORY_SNAPSHOT_PATH:
+        snapshot_task = asyncio.create_task(
+            __save_task_snapshots(memory_task_dao, CONFIGURATION.DB_SETTINGS.DB_MEMORY_SNAPSHOT_INTERVAL)
+        )
+
     yield
 
     LOG.info("Shutting down...")
 
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+
+    if cache_follow_task is not None:
+        cache_follow_task.cancel()
+
+    if task_event_listener is not None:
+        task_events.close()
+        await task_event_listener.close()
+
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+
+        # A cancelled save ends once its file is written, the final one must not race it.
+        with suppress(asyncio.CancelledError):
+            await snapshot_task
+
+        try:
+            await memory_task_dao.save_snapshot()
+
+        except DBOperationError as error:
+            LOG.error("Tasks snapshot failed. err=%s", error)
+
+    if isinstance(db_engine, AsyncpgDBEngine):
+        await db_engine.close()
+
+    elif db_engine is not None:
+        await db_engine.dispose()
+
+
+def __resolve_implementation(setting: str, module: str, fallback: str) -> str:
+    """Falls back to the pure Python implementation when the requested one is not installed.
+
+    :param setting: Configured implementation.
+    :param module: Module of the optional implementation.
+    :param fallback: Implementation used when module is missing.
+    :returns: Implementation name for uvicorn.
+    """
+
+    if setting != module or importlib.util.find_spec(module) is not None:
+        return setting
+
+    LOG.warning("%s is not installed, falling back to %s", module, fallback)
+
+    return fallback
+
+
+async def __fetch_connection_limit() -> int:
+    """Returns the number of connections the database accepts from non-superusers."""
+
+    conn = await asyncpg.connect(
+        user=CONFIGURATION.DB_SETTINGS.DB_USERNAME,
+        password=CONFIGURATION.DB_SETTINGS.DB_PASSWORD,
+        host=CONFIGURATION.DB_SETTINGS.DB_HOST,
+        port=CONFIGURATION.DB_SETTINGS.DB_PORT,
+        database=CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+    )
+
+    try:
+        return await conn.fetchval(
+            "SELECT current_setting('max_connections')::int - coalesce(sum(setting::int), 0)::int "
+            "FROM pg_settings WHERE name IN ('superuser_reserved_connections', 'reserved_connections')"
+        )
+
+    finally:
+        await conn.close()
+
+
+def __check_connection_budget() -> None:
+    """Checks that full pools of all workers fit within max_connections of the database.
+
+    Skipped with a warning when the database is not reachable, the engines report it on first use.
+
+    :raises InitDBEngineError: When workers could open more connections than the database accepts.
+    """
+
+    # Every worker also keeps a connection listening to task events.
+    pool_max_size = (
+        CONFIGURATION.DB_SETTINGS.DB_POOL_SIZE + CONFIGURATION.DB_SETTINGS.DB_MAX_OVERFLOW + __task_events_enabled()
+    )
+    required = pool_max_size * CONFIGURATION.APP_SETTINGS.APP_WORKERS
+
+    try:
+        available = asyncio.run(__fetch_connection_limit())
+
+    except (
+            asyncpg.PostgresError,
+            asyncpg.InterfaceError,
+            OSError,
+    ) as error:
+        LOG.warning("Could not check max_connections of the database. err=%s", error)
+
+        return
+
+    LOG.info("Connection budget: workers=%s, pool_max_size=%s, required=%s, available=%s",
+             CONFIGURATION.APP_SETTINGS.APP_WORKERS, pool_max_size, required, available)
+
+    if required > available:
+        LOG.error("Pools of %s workers need %s connections, the database accepts %s",
+                  CONFIGURATION.APP_SETTINGS.APP_WORKERS, required, available)
+
+        raise InitDBEngineError(
+            f"{CONFIGURATION.APP_SETTINGS.APP_WORKERS} workers x {pool_max_size} connections "
+            f"exceed max_connections ({available} available)"
+        )
+
+
+def create_app() -> FastAPI:
+    """Application factory, uvicorn calls it in every worker process,
+    so each worker runs its own lifespan with its own engine and pool.
+    """
 
-def start_app() -> None:
     __configure_logger()
 
     LOG.info("Starting fastapi app instance...")
+
     app = FastAPI(lifespan=__lifespan)
 
-    LOG.info("Running uvicorn server...")
+    if CONFIGURATION.DB_SETTINGS.DB_REPLICA_URLS and CONFIGURATION.DB_SETTINGS.DB_READ_YOUR_WRITES_WINDOW > 0:
+        app.add_middleware(ReadYourWritesMiddleware, window=CONFIGURATION.DB_SETTINGS.DB_READ_YOUR_WRITES_WINDOW)
+
+    if CONFIGURATION.APP_SETTINGS.APP_ADMISSION_ENABLED:
+        app.add_middleware(
+            AdmissionMiddleware,
+            read_limiter=AdmissionLimiter(
+                limit=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_READ_LIMIT,
+                max_queue=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_READ_QUEUE,
+                queue_timeout=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_QUEUE_TIMEOUT,
+            ),
+            write_limiter=AdmissionLimiter(
+                limit=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_WRITE_LIMIT,
+                max_queue=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_WRITE_QUEUE,
+                queue_timeout=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_QUEUE_TIMEOUT,
+            ),
+            prefix='/tasks',
+            exempt=ADMISSION_EXEMPT_PATHS,
+            retry_after=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_RETRY_AFTER,
+            deadline=CONFIGURATION.APP_SETTINGS.APP_ADMISSION_DEADLINE or None,
+        )
+
+    if CONFIGURATION.APP_SETTINGS.APP_METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    return app
+
+
+def start_app() -> None:
+    __configure_logger()
+
+    if CONFIGURATION.DB_SETTINGS.DB_TASK_DAO != 'memory':
+        __check_connection_budget()
+
+    LOG.info("Running uvicorn server... workers=%s", CONFIGURATION.APP_SETTINGS.APP_WORKERS)
     uvicorn.run(
-        app,
+        "app.start:create_app",
+        factory=True,
         host=CONFIGURATION.APP_SETTINGS.APP_HOST,
         port=CONFIGURATION.APP_SETTINGS.APP_PORT,
+        workers=CONFIGURATION.APP_SETTINGS.APP_WORKERS,
+        loop=__resolve_implementation(CONFIGURATION.APP_SETTINGS.APP_LOOP, 'uvloop', 'asyncio'),
+        http=__resolve_implementation(CONFIGURATION.APP_SETTINGS.APP_HTTP, 'httptools', 'h11'),
+        limit_concurrency=CONFIGURATION.APP_SETTINGS.APP_LIMIT_CONCURRENCY,
+        backlog=CONFIGURATION.APP_SETTINGS.APP_BACKLOG,
+        timeout_keep_alive=CONFIGURATION.APP_SETTINGS.APP_TIMEOUT_KEEP_ALIVE,
+        timeout_graceful_shutdown=CONFIGURATION.APP_SETTINGS.APP_TIMEOUT_GRACEFUL_SHUTDOWN,
+        log_config=None,
     )
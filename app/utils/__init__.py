@@ -1 +1,2 @@
 from .singleton import Singleton
+from .cursor import encode_cursor, decode_cursor
@@ -0,0 +1,123 @@
+import asyncio
+
+from collections import deque
+from typing import Deque
+
+
+__all__ = (
+    'AdmissionRejected',
+    'AdmissionLimiter',
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted.
+
+    reason is "queue_full" when the wait queue is full, "timeout" when the wait took too long.
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO wait queue and a deadline for waiting.
+
+    Callers over the limit wait in the queue for a slot released by another caller.
+    A caller finding the queue full, or waiting longer than queue_timeout, is rejected at once,
+    so excess load costs a rejection instead of work whose result the client no longer waits for.
+    Slots are handed over to the next waiter directly, so newcomers cannot overtake the queue.
+    """
+
+    __slots__ = (
+        '__limit',
+        '__max_queue',
+        '__queue_timeout',
+        '__active',
+        '__waiters',
+    )
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float) -> None:
+        """Initialization.
+
+        :param limit: Number of callers admitted at once.
+        :param max_queue: Number of callers allowed to wait for a slot, 0 to reject instead of waiting.
+        :param queue_timeout: Seconds a caller may wait for a slot.
+        """
+
+        self.__limit = limit
+        self.__max_queue = max_queue
+        self.__queue_timeout = queue_timeout
+        self.__active = 0
+        self.__waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self.__active
+
+    @property
+    def queued(self) -> int:
+        return len(self.__waiters)
+
+    async def acquire(self) -> None:
+        """Takes a slot, waiting in the queue if there is none.
+
+        :raises AdmissionRejected:
+        """
+
+        if self.__active < self.__limit and not self.__waiters:
+            self.__active += 1
+
+            return
+
+        if len(self.__waiters) >= self.__max_queue:
+            raise AdmissionRejected('queue_full')
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiters.append(waiter)
+
+        try:
+            async with asyncio.timeout(self.__queue_timeout):
+                await waiter
+
+        except TimeoutError:
+            # The slot may have been handed over just as the deadline passed, it is used then.
+            if waiter.done() and not waiter.cancelled():
+                return
+
+            self.__forget(waiter)
+
+            raise AdmissionRejected('timeout')
+
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+
+            else:
+                self.__forget(waiter)
+
+            raise
+
+    def release(self) -> None:
+        """Returns a slot, handing it over to the first waiter if there is one."""
+
+        while self.__waiters:
+            waiter = self.__waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+
+                return
+
+        self.__active -= 1
+
+    def __forget(self, waiter: asyncio.Future) -> None:
+        """Removes a waiter that gave up, unless release already dropped it."""
+
+        try:
+            self.__waiters.remove(waiter)
+
+        except ValueError:
+            pass
@@ -0,0 +1,118 @@
+import asyncio
+
+from typing import Awaitable, Callable, Generic, List, Sequence, Set, Tuple, TypeVar
+
+
+__all__ = (
+    'MicroBatcher',
+)
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+class MicroBatcher(Generic[K, V]):
+    """Collects items submitted within a short window and processes them with one call.
+
+    batch_func receives items in submission order and returns one result per item.
+    A result may be an exception instance, then it is raised to that item's caller only.
+    If batch_func raises, every caller of the batch gets the error.
+    """
+
+    __slots__ = (
+        '__batch_func',
+        '__window',
+        '__max_size',
+        '__pending',
+        '__flush_handle',
+        '__running',
+    )
+
+    def __init__(
+            self,
+            batch_func: Callable[[List[K]], Awaitable[Sequence[V | BaseException]]],
+            window: float,
+            max_size: int,
+    ) -> None:
+        """Initialization.
+
+        :param batch_func: Function processing a batch of items.
+        :param window: Seconds to wait for more items, 0 to flush on the next event loop tick.
+        :param max_size: Batch is flushed immediately when it reaches this size.
+        """
+
+        self.__batch_func = batch_func
+        self.__window = window
+        self.__max_size = max_size
+        self.__pending: List[Tuple[K, asyncio.Future]] = []
+        self.__flush_handle: asyncio.Handle | None = None
+        self.__running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: K) -> V:
+        """Adds item to the current batch and waits for its result.
+
+        :param item:
+        :returns: Result of the item.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self.__pending.append((item, future))
+
+        if len(self.__pending) >= self.__max_size:
+            self.__flush()
+
+        elif self.__flush_handle is None:
+            if self.__window > 0:
+                self.__flush_handle = loop.call_later(self.__window, self.__flush)
+
+            else:
+                self.__flush_handle = loop.call_soon(self.__flush)
+
+        return await future
+
+    def __flush(self) -> None:
+        if self.__flush_handle is not None:
+            self.__flush_handle.cancel()
+            self.__flush_handle = None
+
+        pending, self.__pending = self.__pending, []
+
+        if not pending:
+            return
+
+        task = asyncio.ensure_future(self.__run(pending))
+
+        self.__running.add(task)
+        task.add_done_callback(self.__running.discard)
+
+    async def __run(self, pending: List[Tuple[K, asyncio.Future]]) -> None:
+        try:
+            results = await self.__batch_func([item for item, _ in pending])
+
+            if len(results) != len(pending):
+                raise ValueError(f"Batch returned {len(results)} results for {len(pending)} items")
+
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+
+            raise
+
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+            return
+
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+
+            else:
+                future.set_result(result)
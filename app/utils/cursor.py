@@ -0,0 +1,44 @@
+import json
+import binascii
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, Tuple
+
+
+__all__ = (
+    'encode_cursor',
+    'decode_cursor',
+)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encodes keyset position into an opaque url-safe cursor.
+
+    :param values: JSON-serializable values of the sort key of the last returned row.
+    :returns: Opaque cursor string.
+    """
+
+    raw = json.dumps(values, separators=(',', ':')).encode()
+
+    return urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """Decodes cursor created by encode_cursor.
+
+    :param cursor: Opaque cursor string.
+    :returns: Tuple of sort key values.
+    :raises ValueError: When cursor is malformed.
+    """
+
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+
+    except (TypeError, binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"Malformed cursor: {cursor}") from error
+
+    if not isinstance(values, list):
+        raise ValueError(f"Malformed cursor: {cursor}")
+
+    return tuple(values)
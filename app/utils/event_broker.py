@@ -0,0 +1,267 @@
+import asyncio
+import logging
+
+from collections import deque
+from typing import Callable, Deque, Generic, List, Protocol, Set, TypeVar
+
+from app.utils.metrics import METRICS
+
+
+__all__ = (
+    'RESET',
+    'SubscriptionDropped',
+    'Subscription',
+    'EventBroker',
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class _Event(Protocol):
+    id: int
+
+
+E = TypeVar('E', bound=_Event)
+
+
+class _Marker:
+    __slots__ = (
+        '__name',
+    )
+
+    def __init__(self, name: str) -> None:
+        self.__name = name
+
+    def __repr__(self) -> str:
+        return self.__name
+
+
+# Delivered instead of events that were lost: the subscriber must reload the state instead of applying changes.
+RESET = _Marker('RESET')
+
+# Wakes up a subscriber waiting for events when it is dropped.
+_DROPPED = _Marker('DROPPED')
+
+
+class SubscriptionDropped(Exception):
+    """Raised by Subscription.get once the subscription is dropped, it receives nothing more."""
+
+
+class Subscription(Generic[E]):
+    """Bounded queue of the events of one subscriber."""
+
+    __slots__ = (
+        '__queue',
+        '__matches',
+        '__dropped',
+    )
+
+    def __init__(self, matches: Callable[[E], bool] | None, queue_size: int) -> None:
+        """Initialization.
+
+        :param matches: Filter of the events to deliver, None for all of them.
+        :param queue_size: Number of events kept for the subscriber before it is dropped.
+        """
+
+        self.__queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.__matches = matches
+        self.__dropped = False
+
+    @property
+    def dropped(self) -> bool:
+        return self.__dropped
+
+    def matches(self, event: E) -> bool:
+        return self.__matches is None or self.__matches(event)
+
+    def offer(self, item: E | _Marker) -> bool:
+        """Queues item without waiting. Drops the subscription when its queue is full.
+
+        :returns: False when the subscription is or has just been dropped.
+        """
+
+        if self.__dropped:
+            return False
+
+        try:
+            self.__queue.put_nowait(item)
+
+        except asyncio.QueueFull:
+            self.__dropped = True
+
+            return False
+
+        return True
+
+    def drop(self) -> None:
+        """Drops the subscription, waking up its subscriber."""
+
+        if self.__dropped:
+            return
+
+        self.__dropped = True
+
+        try:
+            self.__queue.put_nowait(_DROPPED)
+
+        except asyncio.QueueFull:
+            # The subscriber is not waiting, it sees the flag on its next get.
+            pass
+
+    async def get(self, timeout: float) -> List[E | _Marker]:
+        """Waits for the next event, or RESET, and returns it with all the others already queued.
+
+        :param timeout: Seconds to wait for it.
+        :returns: Events in order, empty when nothing arrived within timeout.
+        :raises SubscriptionDropped:
+        """
+
+        if self.__dropped:
+            raise SubscriptionDropped
+
+        try:
+            # Unlike wait_for, timeout does not swallow a cancellation arriving with the first item.
+            async with asyncio.timeout(timeout):
+                items = [await self.__queue.get()]
+
+        except TimeoutError:
+            return []
+
+        while not self.__queue.empty():
+            items.append(self.__queue.get_nowait())
+
+        # Dropped while waiting or while its queue filled up, it resumes from its last delivered event.
+        if self.__dropped:
+            raise SubscriptionDropped
+
+        return items
+
+
+class EventBroker(Generic[E]):
+    """Fans events out to subscribers, keeping the latest ones to replay them to reconnecting subscribers.
+
+    Events are published without waiting: a subscriber whose queue is full is dropped,
+    so a slow consumer never holds back the others. It reconnects and resumes
+    from the last event it got, as long as that one is still in the history, otherwise
+    it gets RESET. RESET is also sent to all subscribers when events may have been lost.
+    """
+
+    __slots__ = (
+        '__name',
+        '__history',
+        '__queue_size',
+        '__subscriptions',
+        '__last_event_id',
+        '__subscribers',
+        '__published',
+        '__dropped',
+    )
+
+    def __init__(self, name: str, history_size: int, queue_size: int) -> None:
+        """Initialization.
+
+        :param name: Name of the feed in metrics.
+        :param history_size: Number of latest events kept for replay.
+        :param queue_size: Number of events kept for every subscriber before it is dropped.
+        """
+
+        self.__name = name
+        self.__history: Deque[E] = deque(maxlen=history_size)
+        self.__queue_size = queue_size
+        self.__subscriptions: Set[Subscription[E]] = set()
+        self.__last_event_id: int | None = None
+
+        self.__subscribers = METRICS.gauge('events_subscribers', 'Subscribers of an event feed.', feed=name)
+        self.__published = METRICS.counter('events_published_total', 'Events published to a feed.', feed=name)
+        self.__dropped = METRICS.counter(
+            'events_dropped_subscribers_total', 'Subscribers dropped because their queue was full.', feed=name,
+        )
+
+    @property
+    def last_event_id(self) -> int | None:
+        return self.__last_event_id
+
+    def __len__(self) -> int:
+        return len(self.__subscriptions)
+
+    def publish(self, event: E) -> None:
+        """Delivers event to the matching subscribers and adds it to the history."""
+
+        self.__history.append(event)
+        self.__last_event_id = event.id
+        self.__published.inc()
+
+        for subscription in list(self.__subscriptions):
+            if subscription.matches(event) and not subscription.offer(event):
+                self.__drop(subscription)
+
+    def reset(self) -> None:
+        """Forgets the history and sends RESET to all subscribers, after events may have been lost."""
+
+        self.__history.clear()
+
+        for subscription in list(self.__subscriptions):
+            if not subscription.offer(RESET):
+                self.__drop(subscription)
+
+    def subscribe(self, matches: Callable[[E], bool] | None = None, last_event_id: int | None = None) -> Subscription[E]:
+        """Subscribes to events published from now on.
+
+        :param matches: Filter of the events to deliver, None for all of them.
+        :param last_event_id: Id of the last event the subscriber got, to get the following ones first.
+            RESET comes first instead when they are not all in the history.
+        """
+
+        subscription: Subscription[E] = Subscription(matches, self.__queue_size)
+
+        if last_event_id is not None and last_event_id != self.__last_event_id:
+            missed = self.__events_after(last_event_id)
+
+            if missed is None or len(missed) >= self.__queue_size:
+                subscription.offer(RESET)
+
+            else:
+                for event in missed:
+                    if subscription.matches(event):
+                        subscription.offer(event)
+
+        self.__subscriptions.add(subscription)
+        self.__subscribers.value = len(self.__subscriptions)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription[E]) -> None:
+        self.__subscriptions.discard(subscription)
+        self.__subscribers.value = len(self.__subscriptions)
+
+    def close(self) -> None:
+        """Drops all subscribers."""
+
+        for subscription in list(self.__subscriptions):
+            subscription.drop()
+
+        self.__subscriptions.clear()
+        self.__subscribers.value = 0
+
+    def __events_after(self, event_id: int) -> List[E] | None:
+        """Events of the history published after event_id, None when it is not in the history."""
+
+        missed: List[E] = []
+
+        for event in reversed(self.__history):
+            if event.id == event_id:
+                missed.reverse()
+
+                return missed
+
+            missed.append(event)
+
+        return None
+
+    def __drop(self, subscription: Subscription[E]) -> None:
+        LOG.warning("Subscriber of %s events is too slow, dropping it", self.__name)
+
+        subscription.drop()
+
+        self.__dropped.inc()
+        self.unsubscribe(subscription)
@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+
+__all__ = (
+    'Histogram',
+    'DEFAULT_LATENCY_BUCKETS',
+)
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram. Observing a value is a bisect and two additions."""
+
+    __slots__ = (
+        '__bounds',
+        '__counts',
+        '__sum',
+        '__count',
+    )
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Initialization.
+
+        :param bounds: Sorted upper bounds of buckets, +Inf bucket is added implicitly.
+        """
+
+        self.__bounds = tuple(bounds)
+        self.__counts = [0] * (len(self.__bounds) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+
+    def observe(self, value: float) -> None:
+        """Adds value to the bucket with the smallest bound greater or equal to it."""
+
+        self.__counts[bisect_left(self.__bounds, value)] += 1
+        self.__sum += value
+        self.__count += 1
+
+    @property
+    def bounds(self) -> tuple:
+        return self.__bounds
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+    def cumulative_counts(self) -> list:
+        """Returns number of values less or equal to every bound, the last one is +Inf."""
+
+        cumulative, total = [], 0
+
+        for count in self.__counts:
+            total += count
+            cumulative.append(total)
+
+        return cumulative
+
+    def snapshot(self) -> Dict:
+        """Returns cumulative buckets keyed by bound, with count and sum."""
+
+        labels = [str(bound) for bound in self.__bounds] + ['+Inf']
+
+        return {
+            'buckets': dict(zip(labels, self.cumulative_counts())),
+            'count': self.__count,
+            'sum': self.__sum,
+        }
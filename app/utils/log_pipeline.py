@@ -0,0 +1,176 @@
+import json
+import queue
+import random
+import logging
+import logging.config
+
+from typing import Dict, List, Tuple
+from logging.handlers import QueueHandler, QueueListener
+
+
+__all__ = (
+    'RoutingQueueHandler',
+    'RoutingQueueListener',
+    'JsonFormatter',
+    'SamplingFilter',
+    'configure_logging',
+)
+
+
+class RoutingQueueHandler(QueueHandler):
+    """Puts records addressed to one target handler into a shared queue.
+
+    Records are not formatted here: formatting and I/O happen in the listener thread.
+    When the queue is full the record is dropped instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue, target: logging.Handler) -> None:
+        """Initialization.
+
+        :param log_queue: Queue shared with RoutingQueueListener.
+        :param target: Handler which will emit the records.
+        """
+
+        super().__init__(log_queue)
+
+        self.target = target
+        self.dropped = 0
+
+        self.setLevel(target.level)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait((self.target, record))
+
+        except queue.Full:
+            self.dropped += 1
+
+
+class RoutingQueueListener(QueueListener):
+    """Single background thread emitting records to the handlers they are addressed to."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """Initialization.
+
+        :param log_queue: Queue shared with RoutingQueueHandler instances.
+        """
+
+        super().__init__(log_queue)
+
+    def handle(self, item: Tuple[logging.Handler, logging.LogRecord]) -> None:
+        target, record = item
+
+        target.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Passes only a share of records below WARNING, by logger name. Warnings and errors always pass.
+
+    A rate applies to its logger and to all of its children, the most specific name wins.
+    Meant for handlers: a filter on a logger does not see records propagated from its children.
+    The decision is kept on the record, so all handlers keep or drop it together.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        """Initialization.
+
+        :param rates: Share of records to keep, from 0 to 1, by logger name.
+        """
+
+        super().__init__()
+
+        # Most specific names first.
+        self.rates: List[Tuple[str, float]] = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def rate(self, name: str) -> float:
+        """Share of records of logger name to keep."""
+
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        sampled = getattr(record, 'sampled', None)
+
+        if sampled is None:
+            sampled = record.sampled = random.random() < self.rate(record.name)
+
+        return sampled
+
+
+def configure_logging(
+        config_path: str,
+        queue_size: int,
+        json_format: bool = False,
+        sample_rates: Dict[str, float] | None = None,
+) -> RoutingQueueListener:
+    """Configures logging from a fileConfig file and moves all handler I/O to a background thread.
+
+    Every handler declared in the file is replaced on its loggers by a RoutingQueueHandler,
+    so loggers keep their routing while the calling thread only enqueues records.
+
+    :param config_path: Path to fileConfig ini file.
+    :param queue_size: Max number of queued records, newer records are dropped when full.
+    :param json_format: Whether handlers should write JSON lines.
+    :param sample_rates: Share of records below WARNING to keep, by logger name, children included.
+    :returns: Started listener, it should be stopped on shutdown to flush the queue.
+    """
+
+    logging.config.fileConfig(config_path, disable_existing_loggers=False)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handlers: Dict[logging.Handler, RoutingQueueHandler] = {}
+
+    loggers: List[logging.Logger] = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if handler not in queue_handlers:
+                if json_format:
+                    handler.setFormatter(JsonFormatter(datefmt=handler.formatter.datefmt if handler.formatter else None))
+
+                queue_handlers[handler] = RoutingQueueHandler(log_queue, handler)
+
+            logger.removeHandler(handler)
+            logger.addHandler(queue_handlers[handler])
+
+    if sample_rates:
+        sampling_filter = SamplingFilter(sample_rates)
+
+        for queue_handler in queue_handlers.values():
+            queue_handler.addFilter(sampling_filter)
+
+    listener = RoutingQueueListener(log_queue)
+    listener.start()
+
+    return listener
@@ -0,0 +1,144 @@
+import sys
+
+from time import monotonic
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+__all__ = (
+    'LRUCache',
+)
+
+
+class LRUCache:
+    """In-process LRU cache with TTL, bounded by entry count and approximate size in bytes.
+
+    Not thread-safe: meant to be used from a single event loop.
+    """
+
+    __slots__ = (
+        '__entries',
+        '__max_entries',
+        '__max_bytes',
+        '__ttl',
+        '__sizeof',
+        '__bytes',
+        '__hits',
+        '__misses',
+        '__evictions',
+        '__expirations',
+    )
+
+    def __init__(
+            self,
+            max_entries: int,
+            max_bytes: int,
+            ttl: float,
+            sizeof: Callable[[Any], int] = sys.getsizeof,
+    ) -> None:
+        """Initialization.
+
+        :param max_entries: Max number of entries.
+        :param max_bytes: Max approximate size of all values.
+        :param ttl: Default time to live of an entry in seconds.
+        :param sizeof: Function estimating size of a value in bytes.
+        """
+
+        self.__entries: OrderedDict[Hashable, Tuple[Any, float, int]] = OrderedDict()
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__sizeof = sizeof
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Gets value and marks it as recently used.
+
+        :param key:
+        :param default: Returned when key is absent or expired.
+        """
+
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            self.__misses += 1
+
+            return default
+
+        value, expires_at, _ = entry
+
+        if expires_at <= monotonic():
+            self.__remove(key)
+            self.__expirations += 1
+            self.__misses += 1
+
+            return default
+
+        self.__entries.move_to_end(key)
+        self.__hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Sets value, evicting least recently used entries to fit the bounds.
+
+        :param key:
+        :param value:
+        :param ttl: Time to live in seconds, default ttl if not set.
+        """
+
+        self.__remove(key)
+
+        size = self.__sizeof(value)
+
+        if size > self.__max_bytes:
+            return
+
+        self.__entries[key] = (value, monotonic() + (self.__ttl if ttl is None else ttl), size)
+        self.__bytes += size
+
+        while len(self.__entries) > self.__max_entries or self.__bytes > self.__max_bytes:
+            _, (_, _, evicted_size) = self.__entries.popitem(last=False)
+            self.__bytes -= evicted_size
+            self.__evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Deletes value if present.
+
+        :param key:
+        """
+
+        self.__remove(key)
+
+    def clear(self) -> None:
+        """Deletes all values."""
+
+        self.__entries.clear()
+        self.__bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit, miss and eviction counters and current usage."""
+
+        return {
+            'hits': self.__hits,
+            'misses': self.__misses,
+            'evictions': self.__evictions,
+            'expirations': self.__expirations,
+            'entries': len(self.__entries),
+            'bytes': self.__bytes,
+            'max_entries': self.__max_entries,
+            'max_bytes': self.__max_bytes,
+        }
+
+    def __remove(self, key: Hashable) -> None:
+        entry = self.__entries.pop(key, None)
+
+        if entry is not None:
+            self.__bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,196 @@
+import os
+import functools
+
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+from app.utils.histogram import Histogram, DEFAULT_LATENCY_BUCKETS
+from app.utils.request_context import enter_operation, exit_operation
+
+
+__all__ = (
+    'Counter',
+    'Gauge',
+    'MetricsRegistry',
+    'METRICS',
+    'instrument',
+)
+
+T = TypeVar('T')
+
+LAYER_DURATION = 'app_layer_duration_seconds'
+LAYER_ERRORS = 'app_layer_errors_total'
+
+
+class Counter:
+    """Monotonic counter."""
+
+    __slots__ = (
+        'value',
+    )
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down, e.g. requests in flight."""
+
+    __slots__ = (
+        'value',
+    )
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self) -> None:
+        self.value += 1
+
+    def dec(self) -> None:
+        self.value -= 1
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], *extra: str) -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    ]
+    pairs.extend(extra)
+
+    return '{%s}' % ','.join(pairs) if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Process-wide metric families, rendered in the Prometheus text format.
+
+    Metrics are looked up once by name and labels and then updated directly,
+    so recording is an attribute update, or a bisect for histograms.
+    Values are kept per process, every worker exports its own under a worker label, its pid,
+    so series of workers scraped through the same port are never mixed up.
+    """
+
+    __slots__ = (
+        '__families',
+    )
+
+    def __init__(self) -> None:
+        """Initialization."""
+
+        # name -> (type, help, {labels: metric})
+        self.__families: Dict[str, Tuple[str, str, Dict[Tuple[Tuple[str, str], ...], object]]] = {}
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        return self.__get(name, 'counter', help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str, **labels: str) -> Gauge:
+        return self.__get(name, 'gauge', help_text, labels, Gauge)
+
+    def histogram(
+            self,
+            name: str,
+            help_text: str,
+            bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+            **labels: str,
+    ) -> Histogram:
+        return self.__get(name, 'histogram', help_text, labels, lambda: Histogram(bounds))
+
+    def __get(self, name: str, kind: str, help_text: str, labels: Dict[str, str], factory: Callable):
+        """Returns the metric of name with labels, creating it and its family on first use.
+
+        :raises ValueError: When name is registered with another type.
+        """
+
+        family = self.__families.get(name)
+
+        if family is None:
+            family = self.__families[name] = (kind, help_text, {})
+
+        elif family[0] != kind:
+            raise ValueError(f"Metric {name} is a {family[0]}, not a {kind}")
+
+        key = tuple(sorted(labels.items()))
+        metric = family[2].get(key)
+
+        if metric is None:
+            metric = family[2][key] = factory()
+
+        return metric
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format 0.0.4, labelled with the worker pid."""
+
+        lines: List[str] = []
+        worker = 'worker="%d"' % os.getpid()
+
+        for name, (kind, help_text, metrics) in self.__families.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+            for labels, metric in list(metrics.items()):
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels, worker)} {_format_value(metric.value)}')
+
+                    continue
+
+                for bound, count in zip((*metric.bounds, '+Inf'), metric.cumulative_counts()):
+                    le = 'le="%s"' % bound
+                    lines.append(f'{name}_bucket{_format_labels(labels, worker, le)} {count}')
+
+                lines.append(f'{name}_sum{_format_labels(labels, worker)} {_format_value(metric.sum)}')
+                lines.append(f'{name}_count{_format_labels(labels, worker)} {metric.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+
+def instrument(layer: str, operation: str | None = None) -> Callable:
+    """Decorator recording duration and errors of an async function into METRICS.
+
+    Duration goes to app_layer_duration_seconds{layer, operation}, raised exceptions are counted
+    by class in app_layer_errors_total{layer, operation, error}.
+    The histogram is looked up when decorating, so a call costs two perf_counter calls and an observe.
+    While the call runs, current_operation() returns "layer.operation", e.g. for the slow query log.
+
+    :param layer: Layer of the function, e.g. handler, manager, dao.
+    :param operation: Name of the operation, the function name by default.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        name = operation or func.__name__
+        qualified_name = f'{layer}.{name}'
+        observe = METRICS.histogram(
+            LAYER_DURATION, 'Time spent in an operation of an application layer.', layer=layer, operation=name,
+        ).observe
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            token = enter_operation(qualified_name)
+            started_at = perf_counter()
+
+            try:
+                return await func(*args, **kwargs)
+
+            except Exception as error:
+                METRICS.counter(
+                    LAYER_ERRORS, 'Errors raised by an operation of an application layer, by class.',
+                    layer=layer, operation=name, error=type(error).__name__,
+                ).inc()
+
+                raise
+
+            finally:
+                observe(perf_counter() - started_at)
+                exit_operation(token)
+
+        return wrapper
+
+    return decorator
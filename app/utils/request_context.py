@@ -0,0 +1,99 @@
+import time
+
+from contextvars import ContextVar, Token
+
+
+__all__ = (
+    'pin_reads_to_primary',
+    'unpin_reads',
+    'reads_pinned_to_primary',
+    'enter_operation',
+    'exit_operation',
+    'current_operation',
+    'DeadlineExceeded',
+    'start_deadline',
+    'clear_deadline',
+    'time_left',
+)
+
+# Set for the duration of a request whose client has written recently,
+# so its reads see its own writes instead of a lagging replica.
+_READS_PINNED_TO_PRIMARY: ContextVar[bool] = ContextVar('reads_pinned_to_primary', default=False)
+
+# Innermost instrumented operation running in the current context, e.g. dao.get_list.
+_OPERATION: ContextVar[str | None] = ContextVar('operation', default=None)
+
+# time.monotonic() after which the client no longer waits for the result of the request.
+_DEADLINE: ContextVar[float | None] = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline of the request passes before its work could start.
+
+    It is not a database error: DAOs and managers let it through, AdmissionMiddleware answers 503.
+    """
+
+
+def pin_reads_to_primary() -> Token:
+    """Routes reads of the current context to the primary.
+
+    :returns: Token for unpin_reads.
+    """
+
+    return _READS_PINNED_TO_PRIMARY.set(True)
+
+
+def unpin_reads(token: Token) -> None:
+    """Restores routing of reads changed by pin_reads_to_primary."""
+
+    _READS_PINNED_TO_PRIMARY.reset(token)
+
+
+def reads_pinned_to_primary() -> bool:
+    """Checks whether reads of the current context must go to the primary."""
+
+    return _READS_PINNED_TO_PRIMARY.get()
+
+
+def enter_operation(name: str) -> Token:
+    """Marks the current context as running operation name.
+
+    :returns: Token for exit_operation.
+    """
+
+    return _OPERATION.set(name)
+
+
+def exit_operation(token: Token) -> None:
+    """Restores the operation changed by enter_operation."""
+
+    _OPERATION.reset(token)
+
+
+def current_operation() -> str | None:
+    """Returns the innermost operation running in the current context, None outside of operations."""
+
+    return _OPERATION.get()
+
+
+def start_deadline(budget: float) -> Token:
+    """Gives the current context budget seconds to finish, counted from now.
+
+    :returns: Token for clear_deadline.
+    """
+
+    return _DEADLINE.set(time.monotonic() + budget)
+
+
+def clear_deadline(token: Token) -> None:
+    """Restores the deadline changed by start_deadline."""
+
+    _DEADLINE.reset(token)
+
+
+def time_left() -> float | None:
+    """Returns seconds left until the deadline of the current context, negative once passed, None without one."""
+
+    deadline = _DEADLINE.get()
+
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,13 @@
+__all__ = (
+    'like_prefix',
+)
+
+
+def like_prefix(value: str) -> str:
+    """Escapes LIKE wildcards of value and makes it a prefix pattern.
+
+    :param value: Text the matched strings start with.
+    :returns: Pattern for LIKE and ILIKE with the default backslash escape.
+    """
+
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
@@ -0,0 +1,58 @@
+import asyncio
+
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+__all__ = (
+    'SingleFlight',
+)
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one in-flight call.
+
+    Callers arriving while a call is running await its result, or its error.
+    The key is forgotten as soon as the call completes, so results are never reused later.
+    """
+
+    __slots__ = (
+        '__calls',
+    )
+
+    def __init__(self) -> None:
+        """Initialization."""
+
+        self.__calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Runs func or joins the in-flight call with the same key.
+
+        The shared call runs in its own task, so cancelling one caller does not cancel it for the others.
+
+        :param key: Hashable key of the operation and its arguments.
+        :param func: Function starting the operation.
+        :returns: Result of the shared call.
+        """
+
+        call = self.__calls.get(key)
+
+        if call is None or call.done():
+            call = asyncio.ensure_future(func())
+            call.add_done_callback(partial(self.__forget, key))
+
+            self.__calls[key] = call
+
+        return await asyncio.shield(call)
+
+    def __forget(self, key: Hashable, call: asyncio.Task) -> None:
+        if self.__calls.get(key) is call:
+            del self.__calls[key]
+
+        if not call.cancelled():
+            call.exception()
+
+    def __len__(self) -> int:
+        return len(self.__calls)
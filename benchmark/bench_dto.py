@@ -0,0 +1,65 @@
+"""Per-object cost of the task DTOs: validation of request input, construction of responses from rows
+and their JSON encoding.
+
+* validate: Model.model_validate of what FastAPI hands over, as for request bodies and query models;
+* construct: Model.model_construct, as the DAOs build responses from trusted rows;
+* dump_json: Model.model_dump_json of a constructed object.
+
+No database is needed. Run from the repository root:
+
+    python -m benchmark.bench_dto --number 20000 --json dto.json
+"""
+
+import argparse
+
+from typing import Dict, Type
+
+from pydantic import BaseModel
+
+from app.dto.task import *
+from benchmark.harness import Report, measure_sync
+
+
+TASK = {'id': 1, 'title': 'task 1', 'description': 'description of task 1', 'status': TaskStatus.TODO, 'version': 1}
+
+INPUTS: Dict[Type[BaseModel], Dict] = {
+    CreateTaskRequest: {'title': 'task 1', 'description': 'description of task 1', 'status': 'todo'},
+    UpdateTaskRequest: {'title': 'task 1', 'status': 'done'},
+    ReadTaskListRequest: {'status': 'todo', 'after': 'WzEwMDAwXQ', 'limit': '100'},
+    SearchTaskListRequest: {'q': 'task', 'limit': '20'},
+    UpdateTaskBatchRequest: {'filter': {'ids': list(range(100))}, 'values': {'status': 'done'}},
+    CreateTaskBatchRequest: {'tasks': [{'title': f'task {index}'} for index in range(100)]},
+}
+
+OUTPUTS: Dict[Type[BaseModel], Dict] = {
+    ReadTaskResponse: TASK,
+    UpdateTaskResponse: TASK,
+    TaskStatsResponse: {'counts': {status: 1000 for status in TaskStatus}, 'total': 3000},
+    UpdateTaskBatchResponse: {'ids': list(range(100)), 'count': 100},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20_000)
+    parser.add_argument('--json', metavar='PATH', help='Where to write the JSON report.')
+    args = parser.parse_args()
+
+    report = Report('dto', {'number': args.number})
+
+    for model, data in INPUTS.items():
+        report.add('validate', model.__name__, measure_sync(lambda: model.model_validate(data), args.number))
+
+    for model, data in OUTPUTS.items():
+        report.add('construct', model.__name__, measure_sync(lambda: model.model_construct(**data), args.number))
+
+    for model, data in OUTPUTS.items():
+        instance = model.model_construct(**data)
+
+        report.add('dump_json', model.__name__, measure_sync(instance.model_dump_json, args.number))
+
+    report.save(args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Recording overhead of the built-in metrics.
+
+* layer: a coroutine method bare and decorated by instrument, as the handler, manager and DAO methods are;
+* asgi: a minimal ASGI application bare and wrapped in MetricsMiddleware, with the route label resolved
+  from the endpoint as for a FastAPI route.
+
+A request passes the middleware once and an instrumented method in three layers, the estimate of
+the overhead per request is printed at the end. No database is needed. Run from the repository root:
+
+    python -m benchmark.bench_metrics --number 200000 --json metrics.json
+"""
+
+import asyncio
+import argparse
+
+from types import SimpleNamespace
+
+from starlette.routing import Route
+
+from app.utils.metrics import instrument
+from app.api.http.middleware import MetricsMiddleware
+from benchmark.harness import Report, measure_async
+
+
+class _Layer:
+    async def bare(self, task_id: int) -> int:
+        return task_id
+
+    @instrument('bench', 'instrumented')
+    async def instrumented(self, task_id: int) -> int:
+        return task_id
+
+
+async def _endpoint(request):
+    pass
+
+
+ROUTE = Route('/tasks/{task_id}', _endpoint, methods=['GET'])
+START = {'type': 'http.response.start', 'status': 200, 'headers': []}
+BODY = {'type': 'http.response.body', 'body': b'{}'}
+
+
+async def _app(scope, receive, send) -> None:
+    scope['endpoint'] = _endpoint
+
+    await send(START)
+    await send(BODY)
+
+
+async def _receive() -> dict:
+    return {'type': 'http.request', 'body': b''}
+
+
+async def _send(message: dict) -> None:
+    pass
+
+
+def _scope() -> dict:
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/tasks/1',
+        'root_path': '',
+        'headers': [],
+        'app': SimpleNamespace(routes=[ROUTE]),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=200_000)
+    parser.add_argument('--json', metavar='PATH', help='Where to write the JSON report.')
+    args = parser.parse_args()
+
+    layer = _Layer()
+    middleware = MetricsMiddleware(_app)
+
+    cases = (
+        ('layer', 'bare', layer.bare),
+        ('layer', 'instrumented', layer.instrumented),
+        ('asgi', 'bare', lambda index: _app(_scope(), _receive, _send)),
+        ('asgi', 'metrics', lambda index: middleware(_scope(), _receive, _send)),
+    )
+
+    report = Report('metrics', {'number': args.number})
+    means = {}
+
+    for group, case, operation in cases:
+        result = await measure_async(operation, args.number, 1, warmup=1000)
+        means[group, case] = result['mean_ms'] * 1e3
+
+        report.add(group, case, result)
+
+    layer_overhead = means['layer', 'instrumented'] - means['layer', 'bare']
+    asgi_overhead = means['asgi', 'metrics'] - means['asgi', 'bare']
+
+    print(f"\noverhead per instrumented call: {layer_overhead:.2f} us")
+    print(f"overhead of MetricsMiddleware:  {asgi_overhead:.2f} us")
+    print(f"overhead per request:           {asgi_overhead + 3 * layer_overhead:.2f} us")
+
+    report.save(args.json)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
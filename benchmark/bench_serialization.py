@@ -0,0 +1,102 @@
+"""Cost of turning 10k task rows into a JSON response body.
+
+* validated: ReadTaskResponse(**row) for every row in the DAO, then the response_model validation,
+  jsonable_encoder and json.dumps that FastAPI does for a returned model;
+* construct: ReadTaskResponse.model_construct(**row) in the DAO and FastJSONResponse;
+* fast: one READ_TASK_LIST_ADAPTER call for the page in the DAO and FastJSONResponse,
+  encoded by pydantic-core in one pass.
+
+Rows are SQLAlchemy Row objects as returned by the DAO queries. All paths produce the same JSON document.
+No database is needed. Run from the repository root:
+
+    python -m benchmark.bench_serialization --rows 10000 --json serialization.json
+"""
+
+import json
+import asyncio
+import argparse
+
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import Row
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.dto.task import *
+from app.api.http.responses import FastJSONResponse
+from app.dao.sqlalchemy.model.task import TASK_COLUMN_KEYS, _to_tasks
+from benchmark.harness import Report, measure_sync
+
+
+RESPONSE_FIELD = create_model_field(name='Response_get_list', type_=ReadTaskListResponse, mode='serialization')
+NEXT_CURSOR = 'WzEwMDAwXQ'
+LOOP = asyncio.new_event_loop()
+
+
+def _rows(count: int) -> List[Row]:
+    statuses = list(TaskStatus)
+
+    return IteratorResult(SimpleResultMetaData(TASK_COLUMN_KEYS), iter([
+        (
+            index,
+            f'task {index}',
+            f'description of task {index}' if index % 3 else None,
+            statuses[index % len(statuses)],
+            1,
+        )
+        for index in range(count)
+    ])).all()
+
+
+def _validated(rows: List[Row]) -> bytes:
+    page = ReadTaskListResponse(items=[ReadTaskResponse(**row._mapping) for row in rows], next_cursor=NEXT_CURSOR)
+    content = LOOP.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=page))
+
+    return JSONResponse(content).body
+
+
+def _construct(rows: List[Row]) -> bytes:
+    page = ReadTaskListResponse.model_construct(
+        items=[ReadTaskResponse.model_construct(**row._mapping) for row in rows],
+        next_cursor=NEXT_CURSOR,
+    )
+
+    return FastJSONResponse(page).body
+
+
+def _fast(rows: List[Row]) -> bytes:
+    page = ReadTaskListResponse.model_construct(items=_to_tasks(rows), next_cursor=NEXT_CURSOR)
+
+    return FastJSONResponse(page).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--number', type=int, default=50)
+    parser.add_argument('--json', metavar='PATH', help='Where to write the JSON report.')
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    cases = (
+        ('validated', _validated),
+        ('construct', _construct),
+        ('fast', _fast),
+    )
+
+    expected = json.loads(_validated(rows))
+
+    report = Report('serialization', {'rows': args.rows, 'number': args.number})
+
+    for name, func in cases:
+        assert json.loads(func(rows)) == expected
+
+        report.add('response', name, measure_sync(lambda: func(rows), args.number, warmup=1))
+
+    report.save(args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Per-call cost of preparing the task DAO statements for execution.
+
+Compares what Connection.execute does before hitting the driver:
+
+* rebuilt: a new construct on every call, as the DAO did before, so SQLAlchemy
+  has to generate its cache key each time before finding the compiled form;
+* prebuilt: the module level statements of the DAO, whose cache key is memoized;
+* uncached: a new construct compiled from scratch, for reference.
+
+No database is needed. Run from the repository root:
+
+    python -m benchmark.bench_statement_cache
+"""
+
+import timeit
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.dto.task import TaskStatus
+from app.dao.sqlalchemy.model.task import (
+    SQLAlchemyTaskModel,
+    GET_TASK_QUERY,
+    GET_TASK_LIST_QUERIES,
+    UPDATE_TASK_QUERY,
+)
+
+
+DIALECT = asyncpg_dialect()
+NUMBER = 20_000
+
+
+def _prepare(statement, compiled_cache, column_keys=()):
+    return statement._compile_w_cache(
+        DIALECT,
+        compiled_cache=compiled_cache,
+        column_keys=sorted(column_keys),
+    )
+
+
+def _get_rebuilt(cache):
+    _prepare(select(SQLAlchemyTaskModel).where(SQLAlchemyTaskModel.id == 1), cache)
+
+
+def _get_prebuilt(cache):
+    _prepare(GET_TASK_QUERY, cache)
+
+
+def _get_uncached(cache):
+    _prepare(select(SQLAlchemyTaskModel).where(SQLAlchemyTaskModel.id == 1), None)
+
+
+def _list_rebuilt(cache):
+    _prepare(
+        select(SQLAlchemyTaskModel).where(
+            SQLAlchemyTaskModel.status == TaskStatus.TODO
+        ).where(
+            SQLAlchemyTaskModel.id > 1
+        ).order_by(
+            SQLAlchemyTaskModel.id
+        ).limit(101),
+        cache,
+    )
+
+
+def _list_prebuilt(cache):
+    _prepare(GET_TASK_LIST_QUERIES[(True, True)], cache)
+
+
+def _update_rebuilt(cache):
+    _prepare(
+        update(SQLAlchemyTaskModel).where(
+            SQLAlchemyTaskModel.id == 1
+        ).values(
+            title='title', description=None, status=TaskStatus.DONE,
+        ).returning(SQLAlchemyTaskModel),
+        cache,
+    )
+
+
+def _update_prebuilt(cache):
+    _prepare(UPDATE_TASK_QUERY, cache, ('task_id', 'title', 'description', 'status'))
+
+
+def _measure(func, cache) -> float:
+    func(cache)
+
+    return min(timeit.repeat(lambda: func(cache), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def main() -> None:
+    shared_cache = {}
+
+    cases = (
+        ('get', _get_rebuilt, _get_prebuilt, _get_uncached),
+        ('get_list', _list_rebuilt, _list_prebuilt, None),
+        ('update', _update_rebuilt, _update_prebuilt, None),
+    )
+
+    print(f"{'statement':<10} {'rebuilt us':>12} {'prebuilt us':>12} {'uncached us':>12}")
+
+    for name, rebuilt, prebuilt, uncached in cases:
+        rebuilt_us = _measure(rebuilt, shared_cache)
+        prebuilt_us = _measure(prebuilt, shared_cache)
+        uncached_us = _measure(uncached, None) if uncached else float('nan')
+
+        print(f"{name:<10} {rebuilt_us:>12.2f} {prebuilt_us:>12.2f} {uncached_us:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Throughput and latency of every TaskDAO method, SQLAlchemyTaskDAO against AsyncpgTaskDAO, on a live database.
+
+Both DAOs run the same operations against the same table, with concurrent workers sharing
+a pool of the same size. The database is taken from the DB_* settings and must be migrated,
+a throwaway one is enough. Tasks created by the benchmark are deleted at the end.
+InMemoryTaskDAO runs the same operations without a database, as a baseline: --dao memory.
+
+Run from the repository root:
+
+    python -m benchmark.bench_task_dao --operations 5000 --concurrency 16 --json dao.json
+"""
+
+import asyncio
+import argparse
+
+from typing import Awaitable, Callable, List, Tuple
+
+from app.dto.task import *
+from app.config import CONFIGURATION
+from app.dao.task import TaskDAO
+from app.dao.asyncpg.task import AsyncpgTaskDAO
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.memory.task import InMemoryTaskDAO
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+from app.dao.sqlalchemy.model.task import SQLAlchemyTaskDAO
+from benchmark.harness import Report, measure_async
+
+
+SETTINGS = CONFIGURATION.DB_SETTINGS
+SEED_SIZE = 1000
+BATCH_SIZE = 100
+
+
+def _sqlalchemy_dao(concurrency: int) -> TaskDAO:
+    return SQLAlchemyTaskDAO(db_engine=SQLAlchemyDBEngine(
+        db_url_template=SETTINGS.DATABASE_URL_TEMPLATE,
+        username=SETTINGS.DB_USERNAME,
+        password=SETTINGS.DB_PASSWORD,
+        host=SETTINGS.DB_HOST,
+        port=SETTINGS.DB_PORT,
+        database=SETTINGS.DB_DATABASE,
+        pool_size=concurrency,
+        max_overflow=0,
+        statement_cache_size=SETTINGS.DB_STATEMENT_CACHE_SIZE,
+    ))
+
+
+def _asyncpg_dao(concurrency: int) -> TaskDAO:
+    return AsyncpgTaskDAO(db_engine=AsyncpgDBEngine(
+        username=SETTINGS.DB_USERNAME,
+        password=SETTINGS.DB_PASSWORD,
+        host=SETTINGS.DB_HOST,
+        port=SETTINGS.DB_PORT,
+        database=SETTINGS.DB_DATABASE,
+        min_size=concurrency,
+        max_size=concurrency,
+        statement_cache_size=SETTINGS.DB_STATEMENT_CACHE_SIZE,
+    ))
+
+
+def _memory_dao(concurrency: int) -> TaskDAO:
+    return InMemoryTaskDAO()
+
+
+async def _bench(name: str, task_dao: TaskDAO, report: Report, operations: int, concurrency: int) -> None:
+    seeded = await task_dao.create_many([
+        CreateTaskRequest(title=f'bench {index}', description=f'benchmark task {index % 50}') for index in range(SEED_SIZE)
+    ])
+    ids = seeded.ids
+    created: List[int] = []
+
+    async def create_ids(count: int) -> List[int]:
+        return (await task_dao.create_many([CreateTaskRequest(title='bench delete')] * count)).ids
+
+    async def get(index: int) -> None:
+        await task_dao.get(ids[index % len(ids)])
+
+    async def get_list(index: int) -> None:
+        await task_dao.get_list(ReadTaskListRequest(status=TaskStatus.TODO, limit=100))
+
+    async def search(index: int) -> None:
+        await task_dao.search(SearchTaskListRequest(q=f'task {index % 50}', limit=20))
+
+    async def stream_list(index: int) -> None:
+        async for _ in task_dao.stream_list(ExportTaskListRequest(status=TaskStatus.IN_PROGRESS)):
+            pass
+
+    async def get_stats(index: int) -> None:
+        await task_dao.get_stats()
+
+    async def create(index: int) -> None:
+        created.append((await task_dao.create(CreateTaskRequest(title=f'bench create {index}'))).id)
+
+    async def create_many(index: int) -> None:
+        created.extend(await create_ids(BATCH_SIZE))
+
+    async def update(index: int) -> None:
+        await task_dao.update(ids[index % len(ids)], UpdateTaskRequest(title=f'bench update {index}', status=TaskStatus.TODO))
+
+    async def update_many(index: int) -> None:
+        start = index * BATCH_SIZE % len(ids)
+
+        await task_dao.update_many(UpdateTaskBatchRequest(
+            filter=TaskBatchFilter(ids=ids[start:start + BATCH_SIZE]),
+            values=UpdateTaskRequest(status=TaskStatus.TODO),
+        ))
+
+    async def delete(index: int) -> None:
+        await task_dao.delete(next(to_delete))
+
+    async def delete_many(index: int) -> None:
+        await task_dao.delete_many(DeleteTaskBatchRequest(filter=TaskBatchFilter(ids=next(batches_to_delete))))
+
+    cases: Tuple[Tuple[str, Callable[[int], Awaitable], int], ...] = (
+        ('get', get, operations),
+        ('get_list', get_list, operations),
+        ('search', search, operations),
+        ('stream_list', stream_list, max(operations // 100, concurrency)),
+        ('get_stats', get_stats, operations),
+        ('create', create, operations),
+        ('create_many', create_many, max(operations // BATCH_SIZE, concurrency)),
+        ('update', update, operations),
+        ('update_many', update_many, max(operations // BATCH_SIZE, concurrency)),
+        ('delete', delete, operations),
+        ('delete_many', delete_many, max(operations // BATCH_SIZE, concurrency)),
+    )
+
+    try:
+        for case, operation, count in cases:
+            warmup = min(count, concurrency * 10)
+
+            # Rows deleted by the case are created beforehand, outside of the measurement.
+            if case == 'delete':
+                to_delete = iter(await create_ids(warmup + count))
+
+            elif case == 'delete_many':
+                created_ids = await create_ids((warmup + count) * BATCH_SIZE)
+                batches_to_delete = iter(
+                    created_ids[start:start + BATCH_SIZE] for start in range(0, len(created_ids), BATCH_SIZE)
+                )
+
+            report.add(name, case, await measure_async(operation, count, concurrency, warmup=warmup))
+
+    finally:
+        await task_dao.delete_many(DeleteTaskBatchRequest(filter=TaskBatchFilter(ids=ids + created)))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--dao', choices=('sqlalchemy', 'asyncpg', 'memory'), action='append',
+                        help='Default: sqlalchemy and asyncpg.')
+    parser.add_argument('--json', metavar='PATH', help='Where to write the JSON report.')
+    args = parser.parse_args()
+
+    report = Report('task_dao', {'operations': args.operations, 'concurrency': args.concurrency})
+    factories = {
+        'sqlalchemy': _sqlalchemy_dao,
+        'asyncpg': _asyncpg_dao,
+        'memory': _memory_dao,
+    }
+
+    for name in args.dao or ('sqlalchemy', 'asyncpg'):
+        await _bench(name, factories[name](args.concurrency), report, args.operations, args.concurrency)
+
+    report.save(args.json)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Compares two JSON reports of the same benchmark, e.g. of two commits.
+
+Prints throughput and p50/p99 of every case in both reports with the relative change.
+Run from the repository root:
+
+    python -m benchmark.compare before.json after.json
+"""
+
+import json
+import argparse
+
+from typing import Dict, Tuple
+
+
+def _load(path: str) -> Tuple[Dict, Dict[Tuple[str, str], Dict]]:
+    with open(path) as file:
+        report = json.load(file)
+
+    return report, {(result['group'], result['case']): result for result in report['results']}
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return 'n/a'
+
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    before_report, before = _load(args.before)
+    after_report, after = _load(args.after)
+
+    if before_report['suite'] != after_report['suite']:
+        parser.error(f"suites differ: {before_report['suite']} and {after_report['suite']}")
+
+    print(f"{before_report['suite']}: {before_report['commit'][:10]} -> {after_report['commit'][:10]}")
+    print(f"{'group':<12} {'case':<24} {'ops/s':>27} {'p50 ms':>27} {'p99 ms':>27}")
+
+    for key in (key for key in before if key in after):
+        old, new = before[key], after[key]
+
+        print(
+            f"{key[0]:<12} {key[1]:<24} "
+            f"{old['ops']:>8.0f} {new['ops']:>9.0f} {_change(old['ops'], new['ops']):>8} "
+            f"{old['p50_ms']:>8.4f} {new['p50_ms']:>9.4f} {_change(old['p50_ms'], new['p50_ms']):>8} "
+            f"{old['p99_ms']:>8.4f} {new['p99_ms']:>9.4f} {_change(old['p99_ms'], new['p99_ms']):>8}"
+        )
+
+    for key in [*(key for key in before if key not in after), *(key for key in after if key not in before)]:
+        print(f"{key[0]:<12} {key[1]:<24} only in {args.before if key in before else args.after}")
+
+
+if __name__ == '__main__':
+    main()
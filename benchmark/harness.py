@@ -0,0 +1,184 @@
+"""Measurement and reporting shared by the benchmarks.
+
+Every benchmark prints a table and, with --json PATH, writes a report of the form:
+
+    {
+        "suite": "task_dao",
+        "commit": "b2da2e0...",
+        "dirty": false,
+        "python": "3.11.10",
+        "started_at": "2026-10-18T02:40:47+00:00",
+        "parameters": {...},
+        "results": [
+            {"group": "sqlalchemy", "case": "get", "operations": 5000, "ops": 4210.3,
+             "mean_ms": 3.79, "p50_ms": 3.61, "p95_ms": 5.02, "p99_ms": 6.93, "max_ms": 12.4},
+            ...
+        ]
+    }
+
+Reports of two commits are compared with:
+
+    python -m benchmark.compare before.json after.json
+"""
+
+import json
+import asyncio
+import platform
+import statistics
+import subprocess
+
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+
+__all__ = (
+    'summarize',
+    'measure_async',
+    'measure_sync',
+    'Report',
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles in milliseconds.
+
+    :param latencies: Seconds taken by every operation.
+    :param elapsed: Wall time of the whole run in seconds.
+    """
+
+    ordered = sorted(latencies)
+
+    return {
+        'operations': len(ordered),
+        'ops': len(ordered) / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(ordered) * 1e3,
+        'p50_ms': _percentile(ordered, 0.50) * 1e3,
+        'p95_ms': _percentile(ordered, 0.95) * 1e3,
+        'p99_ms': _percentile(ordered, 0.99) * 1e3,
+        'max_ms': ordered[-1] * 1e3,
+    }
+
+
+async def measure_async(
+        operation: Callable[[int], Awaitable],
+        operations: int,
+        concurrency: int,
+        warmup: int = 0,
+) -> Dict[str, float]:
+    """Runs operation(index) for every index with concurrency workers.
+
+    :param warmup: Operations run before measuring, to fill pools and statement caches.
+    """
+
+    async def run(count: int, latencies: List[float]) -> None:
+        counter = iter(range(count))
+
+        async def worker() -> None:
+            for index in counter:
+                started_at = perf_counter()
+                await operation(index)
+                latencies.append(perf_counter() - started_at)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    if warmup:
+        await run(warmup, [])
+
+    latencies: List[float] = []
+
+    started_at = perf_counter()
+    await run(operations, latencies)
+
+    return summarize(latencies, perf_counter() - started_at)
+
+
+def measure_sync(func: Callable[[], object], operations: int, warmup: int = 100) -> Dict[str, float]:
+    """Times operations sequential calls of func one by one."""
+
+    for _ in range(warmup):
+        func()
+
+    latencies: List[float] = []
+
+    started_at = perf_counter()
+
+    for _ in range(operations):
+        call_started_at = perf_counter()
+        func()
+        latencies.append(perf_counter() - call_started_at)
+
+    return summarize(latencies, perf_counter() - started_at)
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Report:
+    """Results of one benchmark run, printed as a table and optionally saved as JSON."""
+
+    __slots__ = (
+        '__suite',
+        '__parameters',
+        '__started_at',
+        '__results',
+    )
+
+    HEADER = f"{'group':<12} {'case':<24} {'ops/s':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+
+    def __init__(self, suite: str, parameters: Dict) -> None:
+        """Initialization.
+
+        :param suite: Name of the benchmark.
+        :param parameters: Command line arguments, saved with the results.
+        """
+
+        self.__suite = suite
+        self.__parameters = parameters
+        self.__started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.__results: List[Dict] = []
+
+        print(self.HEADER)
+
+    def add(self, group: str, case: str, result: Dict[str, float]) -> None:
+        """Records and prints the result of a case."""
+
+        self.__results.append({'group': group, 'case': case, **result})
+
+        print(
+            f"{group:<12} {case:<24} {result['ops']:>10.0f} {result['mean_ms']:>9.4f} "
+            f"{result['p50_ms']:>9.4f} {result['p95_ms']:>9.4f} {result['p99_ms']:>9.4f}"
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'suite': self.__suite,
+            'commit': _git('rev-parse', 'HEAD'),
+            'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+            'python': platform.python_version(),
+            'started_at': self.__started_at,
+            'parameters': self.__parameters,
+            'results': self.__results,
+        }
+
+    def save(self, path: str | None) -> None:
+        """Writes the report to path. Does nothing without path."""
+
+        if path:
+            Path(path).write_text(json.dumps(self.to_dict(), indent=2) + '\n')
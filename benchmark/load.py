@@ -0,0 +1,296 @@
+"""HTTP load generator for the task API, through the whole stack: routing, TaskHandler, TaskManager,
+the cache, the DAO and the database.
+
+Requests are drawn from a weighted mix of operations:
+
+* get: GET /tasks/{id} of a seeded task;
+* list: GET /tasks/?limit=100, every 4th request filtered by status;
+* search: GET /tasks/search?q=...&limit=20;
+* stats: GET /tasks/stats;
+* create: POST /tasks/;
+* update: PUT /tasks/{id} of a seeded task;
+* delete: DELETE /tasks/{id} of a task created by the run.
+
+By default the application runs in process, created by app.start.create_app with its lifespan,
+and is called through httpx.ASGITransport, so no server and no network are involved.
+With --url requests go to a running server instead, e.g. one started by run.py with several workers.
+Either way the database is taken from the DB_* settings of the application and must be migrated,
+a throwaway one is enough. Seeded and created tasks are deleted at the end.
+
+Workers send requests back to back (closed loop). With --rate requests are started on a fixed schedule
+instead (open loop) and latency is counted from the scheduled start, so a stalled server is not hidden
+by workers that wait for it.
+
+Besides throughput, every operation reports its goodput: responses below 400 per second.
+Under overload, e.g. --rate above what the server sustains with APP_ADMISSION_ENABLED=true,
+goodput should stay flat while the excess is answered by quick 503s.
+
+Run from the repository root:
+
+    python -m benchmark.load --mix get=60,list=20,create=10,update=10 --duration 30 --concurrency 64 --json load.json
+"""
+
+import random
+import asyncio
+import argparse
+import contextlib
+
+from time import perf_counter
+from collections import Counter, defaultdict
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+from benchmark.harness import Report, summarize
+
+
+OPERATIONS = ('get', 'list', 'search', 'stats', 'create', 'update', 'delete')
+STATUSES = ('todo', 'in_progress', 'done')
+SEARCH_WORDS = ('alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel')
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+
+        mix[name] = float(weight or 1)
+
+    return mix
+
+
+@contextlib.asynccontextmanager
+async def _client(url: str | None, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Client of a running server at url, or of an application created in process."""
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+            yield client
+
+        return
+
+    from app.start import create_app
+
+    app = create_app()
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url='http://bench', timeout=60.0,
+        ) as client:
+            yield client
+
+
+class _Load:
+    """State of one run: seeded ids, tasks to delete and latencies by operation."""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], seed: int) -> None:
+        self.client = client
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.random = random.Random(seed)
+        self.ids: List[int] = []
+        self.created: List[int] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+
+    async def seed(self, count: int) -> None:
+        for start in range(0, count, 1000):
+            response = await self.client.post('/tasks/batch', json={'tasks': [
+                {
+                    'title': f'load {self.random.choice(SEARCH_WORDS)} {index}',
+                    'description': f'{self.random.choice(SEARCH_WORDS)} {self.random.choice(SEARCH_WORDS)}',
+                    'status': STATUSES[index % len(STATUSES)],
+                }
+                for index in range(start, min(start + 1000, count))
+            ]})
+            response.raise_for_status()
+
+            self.ids.extend(response.json()['ids'])
+
+    async def cleanup(self) -> None:
+        ids = self.ids + self.created
+
+        for start in range(0, len(ids), 1000):
+            await self.client.request('DELETE', '/tasks/batch', json={'filter': {'ids': ids[start:start + 1000]}})
+
+    def request(self, operation: str) -> tuple:
+        """Method, url and query parameters of the next request of operation."""
+
+        index = self.random.randrange(1 << 30)
+
+        if operation == 'get':
+            return 'GET', f'/tasks/{self.random.choice(self.ids)}', None
+
+        if operation == 'list':
+            return 'GET', '/tasks/', {'limit': 100, **({'status': STATUSES[index % 3]} if index % 4 == 0 else {})}
+
+        if operation == 'search':
+            return 'GET', '/tasks/search', {'q': self.random.choice(SEARCH_WORDS), 'limit': 20}
+
+        if operation == 'stats':
+            return 'GET', '/tasks/stats', None
+
+        if operation == 'create':
+            return 'POST', '/tasks/', {'title': f'load create {index}', 'description': self.random.choice(SEARCH_WORDS)}
+
+        if operation == 'update':
+            return 'PUT', f'/tasks/{self.random.choice(self.ids)}', {'title': f'load update {index}', 'status': STATUSES[index % 3]}
+
+        # Deletes fall back to creates until the run has created something to delete.
+        if self.created:
+            return 'DELETE', f'/tasks/{self.created.pop(self.random.randrange(len(self.created)))}', None
+
+        return self.request('create')
+
+    async def send(self, operation: str, scheduled_at: float | None = None) -> None:
+        method, url, params = self.request(operation)
+        started_at = scheduled_at or perf_counter()
+
+        try:
+            response = await self.client.request(method, url, params=params)
+
+        except httpx.HTTPError as error:
+            self.errors[operation] += 1
+            self.statuses[operation][type(error).__name__] += 1
+
+            return
+
+        self.latencies[operation].append(perf_counter() - started_at)
+        self.statuses[operation][response.status_code] += 1
+
+        if response.status_code >= 500:
+            self.errors[operation] += 1
+
+        elif method == 'POST' and response.status_code == 200:
+            self.created.append(response.json()['id'])
+
+    def next_operation(self) -> str:
+        return self.random.choices(self.operations, self.weights)[0]
+
+
+async def _closed_loop(load: _Load, concurrency: int, duration: float, requests: int | None) -> float:
+    deadline = perf_counter() + duration
+    remaining = iter(range(requests)) if requests else None
+
+    def more() -> bool:
+        if remaining is not None:
+            return next(remaining, None) is not None
+
+        return perf_counter() < deadline
+
+    async def worker() -> None:
+        while more():
+            await load.send(load.next_operation())
+
+    started_at = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return perf_counter() - started_at
+
+
+async def _open_loop(load: _Load, rate: float, concurrency: int, duration: float, requests: int | None) -> float:
+    total = requests or int(rate * duration)
+    in_flight = asyncio.Semaphore(concurrency)
+    pending = set()
+
+    async def send(operation: str, scheduled_at: float) -> None:
+        async with in_flight:
+            await load.send(operation, scheduled_at)
+
+    started_at = perf_counter()
+
+    for index in range(total):
+        scheduled_at = started_at + index / rate
+        delay = scheduled_at - perf_counter()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        task = asyncio.create_task(send(load.next_operation(), scheduled_at))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    await asyncio.gather(*pending)
+
+    return perf_counter() - started_at
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base url of a running server, e.g. http://localhost:8000. Default: in process.')
+    parser.add_argument('--mix', type=_parse_mix, default='get=60,list=20,create=10,update=10',
+                        help=f"Comma separated operation=weight, operations: {', '.join(OPERATIONS)}.")
+    parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight at most.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run, unless --requests is given.')
+    parser.add_argument('--requests', type=int, help='Number of requests to send instead of --duration.')
+    parser.add_argument('--rate', type=float, help='Requests per second to start, open loop. Default: closed loop.')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of load before measuring.')
+    parser.add_argument('--seed-tasks', type=int, default=10_000)
+    parser.add_argument('--random-seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='Where to write the JSON report.')
+    args = parser.parse_args()
+
+    report = Report('load', {
+        'url': args.url or 'in-process',
+        'mix': args.mix,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'requests': args.requests,
+        'rate': args.rate,
+        'seed_tasks': args.seed_tasks,
+    })
+
+    async with _client(args.url, args.concurrency) as client:
+        load = _Load(client, args.mix, args.random_seed)
+
+        await load.seed(args.seed_tasks)
+
+        try:
+            if args.warmup:
+                await _closed_loop(load, args.concurrency, args.warmup, None)
+
+                load.latencies.clear()
+                load.statuses.clear()
+                load.errors.clear()
+
+            if args.rate:
+                elapsed = await _open_loop(load, args.rate, args.concurrency, args.duration, args.requests)
+
+            else:
+                elapsed = await _closed_loop(load, args.concurrency, args.duration, args.requests)
+
+        finally:
+            await load.cleanup()
+
+    def goodput(statuses: Counter) -> float:
+        return sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400) / elapsed
+
+    for operation, latencies in sorted(load.latencies.items()):
+        report.add('http', operation, {
+            **summarize(latencies, elapsed),
+            'goodput': goodput(load.statuses[operation]),
+            'errors': load.errors[operation],
+            'statuses': {str(status): count for status, count in load.statuses[operation].items()},
+        })
+
+    all_latencies = [latency for latencies in load.latencies.values() for latency in latencies]
+
+    if all_latencies:
+        report.add('http', 'all', {
+            **summarize(all_latencies, elapsed),
+            'goodput': goodput(sum(load.statuses.values(), Counter())),
+            'errors': sum(load.errors.values()),
+        })
+
+    report.save(args.json)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
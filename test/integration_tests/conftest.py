@@ -0,0 +1,112 @@
+"""Fixtures of integration tests running against a local PostgreSQL.
+
+The database is taken from the DB_* settings, as for the application.
+Tests are skipped when it is not reachable.
+"""
+
+import os
+import logging
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import CONFIGURATION
+
+
+ROOT = Path(__file__).resolve().parents[2]
+
+SEED_ROWS = int(os.environ.get('PLAN_TEST_ROWS', 200_000))
+SEED_MARKER = 'seeded by integration tests'
+
+DB_URL = 'postgresql+psycopg2://%(username)s:%(password)s@%(host)s:%(port)s/%(database)s' % {
+    'username': CONFIGURATION.DB_SETTINGS.DB_USERNAME,
+    'password': CONFIGURATION.DB_SETTINGS.DB_PASSWORD,
+    'host': CONFIGURATION.DB_SETTINGS.DB_HOST,
+    'port': CONFIGURATION.DB_SETTINGS.DB_PORT,
+    'database': CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+}
+
+
+@dataclass(frozen=True)
+class SeededTasks:
+    first_id: int
+    last_id: int
+    count: int
+
+
+@pytest.fixture(scope='session')
+def pg_engine():
+    pytest.importorskip('psycopg2')
+
+    engine = create_engine(DB_URL)
+
+    try:
+        with engine.connect():
+            pass
+
+    except OperationalError as error:
+        engine.dispose()
+
+        pytest.skip(f"PostgreSQL is not available: {error.orig}")
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def migrated_db(pg_engine):
+    """Upgrades the database to the head revision of app/dao/sqlalchemy/migration."""
+
+    alembic_config = Config(str(ROOT / 'alembic.ini'))
+    alembic_config.set_main_option('script_location', str(ROOT / 'app' / 'dao' / 'sqlalchemy' / 'migration'))
+
+    command.upgrade(alembic_config, 'head')
+
+    # env.py applies the logging config of alembic.ini, which echoes every statement.
+    logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+
+    return pg_engine
+
+
+@pytest.fixture(scope='session')
+def seeded_tasks(migrated_db) -> Iterator[SeededTasks]:
+    """Adds SEED_ROWS tasks with a skewed status distribution and refreshes planner statistics.
+
+    80% of tasks are DONE, 15% TODO and 5% IN_PROGRESS. Seeded tasks are deleted after the session.
+    """
+
+    table = f'{CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task'
+
+    with migrated_db.begin() as conn:
+        first_id, last_id = conn.execute(text(f"""
+            WITH inserted AS (
+                INSERT INTO {table} (title, description, status)
+                SELECT
+                    'task ' || n,
+                    :marker,
+                    (CASE WHEN n % 20 = 0 THEN 'IN_PROGRESS' WHEN n % 20 < 4 THEN 'TODO' ELSE 'DONE' END)::taskstatus
+                FROM generate_series(1, :rows) AS n
+                RETURNING id
+            )
+            SELECT min(id), max(id) FROM inserted
+        """), {'marker': SEED_MARKER, 'rows': SEED_ROWS}).one()
+
+    with migrated_db.begin() as conn:
+        conn.exec_driver_sql(f'ANALYZE {table}')
+
+    yield SeededTasks(first_id=first_id, last_id=last_id, count=SEED_ROWS)
+
+    with migrated_db.begin() as conn:
+        conn.execute(
+            text(f'DELETE FROM {table} WHERE id BETWEEN :first_id AND :last_id AND description = :marker'),
+            {'first_id': first_id, 'last_id': last_id, 'marker': SEED_MARKER},
+        )
@@ -0,0 +1,105 @@
+"""Group commit of SQLAlchemyTaskDAO against a local PostgreSQL.
+
+A group failing on the data of one row is retried row by row, so only that caller gets the error.
+"""
+
+import asyncio
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.config import CONFIGURATION
+from app.dto.task import CreateTaskRequest, CreateTaskResponse, TaskStatus
+from app.dao.exceptions import DBOperationError
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+from app.dao.sqlalchemy.model.task import SQLAlchemyTaskDAO
+
+
+MARKER = 'created by group commit tests'
+
+
+def create_db_engine() -> SQLAlchemyDBEngine:
+    return SQLAlchemyDBEngine(
+        db_url_template=CONFIGURATION.DB_SETTINGS.DATABASE_URL_TEMPLATE,
+        username=CONFIGURATION.DB_SETTINGS.DB_USERNAME,
+        password=CONFIGURATION.DB_SETTINGS.DB_PASSWORD,
+        host=CONFIGURATION.DB_SETTINGS.DB_HOST,
+        port=CONFIGURATION.DB_SETTINGS.DB_PORT,
+        database=CONFIGURATION.DB_SETTINGS.DB_DATABASE,
+    )
+
+
+def causes(error: BaseException):
+    while error is not None:
+        yield error
+
+        error = error.__cause__
+
+
+@pytest.fixture
+def marked_tasks(migrated_db):
+    """Deletes the tasks created by a test."""
+
+    yield
+
+    with migrated_db.begin() as conn:
+        conn.execute(
+            text(f'DELETE FROM {CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task WHERE description = :marker'),
+            {'marker': MARKER},
+        )
+
+
+def count_marked_tasks(migrated_db) -> int:
+    with migrated_db.connect() as conn:
+        return conn.execute(
+            text(f'SELECT count(*) FROM {CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task WHERE description = :marker'),
+            {'marker': MARKER},
+        ).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_group_is_committed_at_once(migrated_db, marked_tasks):
+    db_engine = create_db_engine()
+    task_dao = SQLAlchemyTaskDAO(db_engine=db_engine, create_batch_window=0.05, create_batch_max_size=10)
+
+    try:
+        created = await asyncio.gather(*(
+            task_dao.create(CreateTaskRequest(title=f'task {n}', description=MARKER)) for n in range(4)
+        ))
+
+    finally:
+        await db_engine.dispose()
+
+    assert [task.title for task in created] == [f'task {n}' for n in range(4)]
+    assert len({task.id for task in created}) == 4
+    assert count_marked_tasks(migrated_db) == 4
+
+
+@pytest.mark.asyncio
+async def test_row_failing_a_constraint_fails_only_its_caller(migrated_db, marked_tasks):
+    db_engine = create_db_engine()
+    task_dao = SQLAlchemyTaskDAO(db_engine=db_engine, create_batch_window=0.05, create_batch_max_size=10)
+
+    # Title is NOT NULL, the whole multi-row INSERT fails on this row.
+    invalid_task = CreateTaskRequest.model_construct(title=None, description=MARKER, status=TaskStatus.TODO)
+
+    try:
+        results = await asyncio.gather(
+            task_dao.create(CreateTaskRequest(title='first', description=MARKER)),
+            task_dao.create(invalid_task),
+            task_dao.create(CreateTaskRequest(title='last', description=MARKER)),
+            return_exceptions=True,
+        )
+
+    finally:
+        await db_engine.dispose()
+
+    first, failed, last = results
+
+    assert isinstance(first, CreateTaskResponse) and first.title == 'first'
+    assert isinstance(last, CreateTaskResponse) and last.title == 'last'
+    assert isinstance(failed, DBOperationError)
+    assert any(isinstance(error, IntegrityError) for error in causes(failed))
+    assert count_marked_tasks(migrated_db) == 2
@@ -0,0 +1,359 @@
+"""Query plan regression tests of the statements SQLAlchemyTaskDAO executes.
+
+Every statement is compiled for asyncpg exactly as the DAO sends it, prepared on a seeded database
+and explained with EXPLAIN (FORMAT JSON) EXECUTE, both as a custom and as a generic plan,
+since asyncpg switches prepared statements to generic plans after a few executions.
+
+Estimated cost bounds are checked on custom plans only, generic plans guess the LIMIT and the selectivity
+of parameters. Statements touching a large share of rows by status are checked as custom plans only:
+PostgreSQL keeps custom plans when the generic one is estimated to be more expensive.
+
+Plan shapes are recorded in query_plans.json next to this file and shown as a diff on failure.
+Missing baselines are recorded on the first run, set PLAN_BASELINES_UPDATE=1 to re-record all of them.
+"""
+
+import os
+import json
+import difflib
+
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Tuple
+
+import pytest
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.dto.task import TaskStatus
+from app.dao.sqlalchemy.model.task import (
+    GET_TASK_QUERY,
+    GET_TASKS_BY_IDS_QUERY,
+    GET_TASK_LIST_QUERIES,
+    STREAM_TASK_LIST_QUERIES,
+    CREATE_TASK_QUERY,
+    CREATE_TASKS_QUERY,
+    CREATE_TASK_IDS_QUERY,
+    UPDATE_TASK_QUERY,
+    UPDATE_TASK_IF_VERSION_QUERY,
+    DELETE_TASK_QUERY,
+    UPDATE_TASKS_QUERIES,
+    DELETE_TASKS_QUERIES,
+    GET_TASK_STATS_QUERY,
+    SEARCH_TASK_QUERIES,
+)
+
+
+BASELINES_PATH = Path(__file__).with_name('query_plans.json')
+UPDATE_BASELINES = os.environ.get('PLAN_BASELINES_UPDATE') == '1'
+
+DIALECT = asyncpg_dialect()
+
+PK_INDEX = 'task_pkey'
+STATUS_INDEX = 'ix_task_status_id'
+SEARCH_INDEX = 'ix_task_search_vector'
+
+PLAN_CACHE_MODES = ('force_custom_plan', 'force_generic_plan')
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    """Statement of the DAO with parameters and expected plan properties.
+
+    Parameters are callables of SeededTasks, so ids point to seeded rows.
+    Search has no cost bound, the planner estimates text search matches as a fixed share of the table.
+    Plan must use at least one of indexes. Pages by status may walk either index:
+    the primary key is cheaper while the status is common and ids follow the physical order.
+    """
+
+    name: str
+    statement: Any
+    parameters: Any
+    indexes: FrozenSet[str] = frozenset()
+    seq_scan: bool = False
+    sort: bool = False
+    max_cost: float | None = None
+    plan_cache_modes: Tuple[str, ...] = PLAN_CACHE_MODES
+
+
+CASES = (
+    PlanCase(
+        name='get',
+        statement=GET_TASK_QUERY,
+        parameters=lambda seeded: {'task_id': seeded.first_id + seeded.count // 2},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=20,
+    ),
+    PlanCase(
+        name='get_many',
+        statement=GET_TASKS_BY_IDS_QUERY,
+        parameters=lambda seeded: {'ids': list(range(seeded.first_id, seeded.first_id + 256))},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=2_000,
+    ),
+    PlanCase(
+        name='get_list',
+        statement=GET_TASK_LIST_QUERIES[(False, False)],
+        parameters=lambda seeded: {'limit': 101},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=50,
+    ),
+    PlanCase(
+        name='get_list_after',
+        statement=GET_TASK_LIST_QUERIES[(False, True)],
+        parameters=lambda seeded: {'after_id': seeded.first_id + seeded.count // 2, 'limit': 101},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=50,
+    ),
+    PlanCase(
+        name='get_list_by_status',
+        statement=GET_TASK_LIST_QUERIES[(True, False)],
+        parameters=lambda seeded: {'status': TaskStatus.IN_PROGRESS, 'limit': 101},
+        indexes=frozenset({PK_INDEX, STATUS_INDEX}),
+        max_cost=500,
+    ),
+    PlanCase(
+        name='get_list_by_status_after',
+        statement=GET_TASK_LIST_QUERIES[(True, True)],
+        parameters=lambda seeded: {
+            'status': TaskStatus.IN_PROGRESS,
+            'after_id': seeded.first_id + seeded.count // 2,
+            'limit': 101,
+        },
+        indexes=frozenset({PK_INDEX, STATUS_INDEX}),
+        max_cost=500,
+    ),
+    PlanCase(
+        name='stream_list_by_status',
+        statement=STREAM_TASK_LIST_QUERIES[True],
+        parameters=lambda seeded: {'status': TaskStatus.IN_PROGRESS},
+        indexes=frozenset({STATUS_INDEX}),
+        sort=True,
+        plan_cache_modes=('force_custom_plan',),
+    ),
+    PlanCase(
+        name='search',
+        statement=SEARCH_TASK_QUERIES[(False, False)],
+        parameters=lambda seeded: {'q': str(seeded.count // 2), 'max_candidates': 10_000, 'limit': 101},
+        indexes=frozenset({SEARCH_INDEX}),
+        sort=True,
+    ),
+    PlanCase(
+        name='search_after',
+        statement=SEARCH_TASK_QUERIES[(False, True)],
+        parameters=lambda seeded: {
+            'q': f'task {seeded.count // 2}',
+            'max_candidates': 10_000,
+            'after_rank': 1.0,
+            'after_id': seeded.last_id,
+            'limit': 101,
+        },
+        indexes=frozenset({SEARCH_INDEX}),
+        sort=True,
+    ),
+    PlanCase(
+        name='create',
+        statement=CREATE_TASK_QUERY,
+        parameters=lambda seeded: {'title': 'task', 'description': 'plan', 'status': TaskStatus.TODO},
+        max_cost=1,
+    ),
+    PlanCase(
+        name='create_group',
+        statement=CREATE_TASKS_QUERY,
+        parameters=lambda seeded: {'title': 'task', 'description': 'plan', 'status': TaskStatus.TODO},
+        max_cost=1,
+    ),
+    PlanCase(
+        name='create_many',
+        statement=CREATE_TASK_IDS_QUERY,
+        parameters=lambda seeded: {'title': 'task', 'description': 'plan', 'status': TaskStatus.TODO},
+        max_cost=1,
+    ),
+    PlanCase(
+        name='update',
+        statement=UPDATE_TASK_QUERY,
+        parameters=lambda seeded: {
+            'task_id': seeded.first_id,
+            'title': 'task',
+            'description': 'plan',
+            'status': TaskStatus.DONE,
+        },
+        indexes=frozenset({PK_INDEX}),
+        max_cost=20,
+    ),
+    PlanCase(
+        name='update_if_version',
+        statement=UPDATE_TASK_IF_VERSION_QUERY,
+        parameters=lambda seeded: {
+            'task_id': seeded.first_id,
+            'expected_version': 1,
+            'title': 'task',
+            'description': 'plan',
+            'status': TaskStatus.DONE,
+        },
+        indexes=frozenset({PK_INDEX}),
+        max_cost=20,
+    ),
+    PlanCase(
+        name='delete',
+        statement=DELETE_TASK_QUERY,
+        parameters=lambda seeded: {'task_id': seeded.first_id},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=20,
+    ),
+    PlanCase(
+        name='update_many_by_ids',
+        statement=UPDATE_TASKS_QUERIES[(True, False)],
+        parameters=lambda seeded: {
+            'filter_ids': list(range(seeded.first_id, seeded.first_id + 256)),
+            'status': TaskStatus.DONE,
+        },
+        indexes=frozenset({PK_INDEX}),
+        max_cost=2_000,
+    ),
+    PlanCase(
+        name='update_many_by_status',
+        statement=UPDATE_TASKS_QUERIES[(False, True)],
+        parameters=lambda seeded: {'filter_status': TaskStatus.IN_PROGRESS, 'status': TaskStatus.DONE},
+        indexes=frozenset({STATUS_INDEX}),
+        plan_cache_modes=('force_custom_plan',),
+    ),
+    PlanCase(
+        name='delete_many_by_ids',
+        statement=DELETE_TASKS_QUERIES[(True, False)],
+        parameters=lambda seeded: {'filter_ids': list(range(seeded.first_id, seeded.first_id + 256))},
+        indexes=frozenset({PK_INDEX}),
+        max_cost=2_000,
+    ),
+    PlanCase(
+        name='delete_many_by_ids_and_status',
+        statement=DELETE_TASKS_QUERIES[(True, True)],
+        parameters=lambda seeded: {
+            'filter_ids': list(range(seeded.first_id, seeded.first_id + 256)),
+            'filter_status': TaskStatus.IN_PROGRESS,
+        },
+        indexes=frozenset({PK_INDEX, STATUS_INDEX}),
+        max_cost=2_000,
+    ),
+    PlanCase(
+        name='get_stats',
+        statement=GET_TASK_STATS_QUERY,
+        parameters=lambda seeded: {},
+        seq_scan=True,
+        max_cost=50,
+    ),
+)
+
+
+def _driver_value(value: Any) -> Any:
+    """Converts a DAO parameter to what the column stores, the Enum type stores member names."""
+
+    return value.name if isinstance(value, Enum) else value
+
+
+def _explain(connection, case: PlanCase, parameters: Dict[str, Any], plan_cache_mode: str) -> Dict:
+    """Prepares the statement as compiled for asyncpg and explains its execution."""
+
+    compiled = case.statement.compile(dialect=DIALECT, column_keys=sorted(parameters))
+    bound = compiled.construct_params(parameters)
+    values = tuple(_driver_value(bound[name]) for name in compiled.positiontup)
+
+    connection.exec_driver_sql(f"SET plan_cache_mode = {plan_cache_mode}")
+    connection.exec_driver_sql(f"PREPARE plan_test AS {compiled}")
+
+    try:
+        placeholders = ', '.join(['%s'] * len(values))
+        execute = f"EXPLAIN (FORMAT JSON) EXECUTE plan_test({placeholders})" if values else "EXPLAIN (FORMAT JSON) EXECUTE plan_test"
+
+        return connection.exec_driver_sql(execute, values).scalar_one()[0]['Plan']
+
+    finally:
+        connection.exec_driver_sql("DEALLOCATE plan_test")
+        connection.exec_driver_sql("RESET plan_cache_mode")
+
+
+def _nodes(plan: Dict) -> List[Dict]:
+    nodes = [plan]
+
+    for child in plan.get('Plans', ()):
+        nodes.extend(_nodes(child))
+
+    return nodes
+
+
+def _shape(plan: Dict, depth: int = 0) -> List[str]:
+    """Describes the plan tree without costs and row estimates, one node per line."""
+
+    line = '  ' * depth + plan['Node Type']
+
+    if 'Operation' in plan and plan['Node Type'] == 'ModifyTable':
+        line += f" ({plan['Operation']})"
+
+    if 'Index Name' in plan:
+        line += f" using {plan['Index Name']}"
+
+    if 'Relation Name' in plan:
+        line += f" on {plan['Relation Name']}"
+
+    lines = [line]
+
+    for child in plan.get('Plans', ()):
+        lines.extend(_shape(child, depth + 1))
+
+    return lines
+
+
+@pytest.fixture(scope='module')
+def plan_baselines() -> Iterator[Dict[str, List[str]]]:
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    recorded = dict(baselines)
+
+    yield recorded
+
+    if recorded != baselines:
+        BASELINES_PATH.write_text(json.dumps(recorded, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.mark.parametrize(
+    ('case', 'plan_cache_mode'),
+    [(case, plan_cache_mode) for case in CASES for plan_cache_mode in case.plan_cache_modes],
+    ids=[f'{case.name}-{plan_cache_mode}' for case in CASES for plan_cache_mode in case.plan_cache_modes],
+)
+def test_task_query_plan(migrated_db, seeded_tasks, plan_baselines, case: PlanCase, plan_cache_mode: str) -> None:
+    with migrated_db.connect() as conn:
+        try:
+            plan = _explain(conn, case, case.parameters(seeded_tasks), plan_cache_mode)
+
+        finally:
+            conn.rollback()
+
+    key = f'{case.name}[{plan_cache_mode}]'
+    shape = _shape(plan)
+    baseline = plan_baselines.get(key)
+
+    if baseline is None or UPDATE_BASELINES:
+        plan_baselines[key] = shape
+
+    if baseline is None or baseline == shape:
+        plan_report = '\n'.join(shape)
+
+    else:
+        plan_report = '\n'.join(difflib.unified_diff(baseline, shape, 'baseline', 'current', lineterm=''))
+
+    nodes = _nodes(plan)
+    node_types = {node['Node Type'] for node in nodes}
+    used_indexes = {node['Index Name'] for node in nodes if 'Index Name' in node}
+
+    if not case.seq_scan:
+        assert 'Seq Scan' not in node_types, f"{key} scans the whole table:\n{plan_report}"
+
+    if not case.sort:
+        assert 'Sort' not in node_types, f"{key} sorts rows instead of reading them in index order:\n{plan_report}"
+
+    if case.indexes:
+        assert used_indexes & case.indexes, f"{key} does not use {sorted(case.indexes)}:\n{plan_report}"
+
+    if case.max_cost is not None and plan_cache_mode == 'force_custom_plan':
+        assert plan['Total Cost'] <= case.max_cost, (
+            f"{key} estimated cost {plan['Total Cost']} exceeds {case.max_cost}:\n{plan_report}"
+        )
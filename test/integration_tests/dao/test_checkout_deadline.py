@@ -0,0 +1,92 @@
+"""Connection checkouts of both engines against a local PostgreSQL, cut to the deadline of the request.
+
+The pool is exhausted, so a checkout waits: it must give up with DeadlineExceeded once the deadline passes,
+well before the pool timeout, and at once when the deadline already passed.
+"""
+
+import time
+
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import pytest
+
+from app.config import CONFIGURATION
+from app.utils.request_context import DeadlineExceeded, start_deadline, clear_deadline
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+
+
+ENGINE_KINDS = ('sqlalchemy', 'asyncpg')
+
+
+@asynccontextmanager
+async def open_db_engine(kind: str):
+    """Engine of kind, its connections are closed on exit, pools do not outlive the event loop of a test."""
+
+    settings = CONFIGURATION.DB_SETTINGS
+    connect_kwargs = {
+        'username': settings.DB_USERNAME,
+        'password': settings.DB_PASSWORD,
+        'host': settings.DB_HOST,
+        'port': settings.DB_PORT,
+        'database': settings.DB_DATABASE,
+    }
+
+    if kind == 'sqlalchemy':
+        db_engine = SQLAlchemyDBEngine(db_url_template=settings.DATABASE_URL_TEMPLATE, **connect_kwargs)
+
+        try:
+            yield db_engine
+
+        finally:
+            await db_engine.dispose()
+
+    else:
+        db_engine = AsyncpgDBEngine(**connect_kwargs)
+
+        try:
+            yield db_engine
+
+        finally:
+            await db_engine.close()
+
+
+async def checkout(db_engine, budget: float) -> float:
+    """Checks out a connection with budget seconds left, returns the seconds it took to give up."""
+
+    token = start_deadline(budget)
+    started_at = time.monotonic()
+
+    try:
+        with pytest.raises(DeadlineExceeded):
+            async with db_engine.acquire_connection:
+                pass
+
+    finally:
+        clear_deadline(token)
+
+    return time.monotonic() - started_at
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('kind', ENGINE_KINDS)
+async def test_checkout_gives_up_at_deadline(pg_engine, kind):
+    async with open_db_engine(kind) as db_engine:
+        stats = db_engine.pool_stats()
+
+        async with AsyncExitStack() as held:
+            for _ in range(stats['pool_size'] + stats['max_overflow']):
+                await held.enter_async_context(db_engine.acquire_connection)
+
+            assert 0.2 <= await checkout(db_engine, 0.2) < 1.0
+            assert await checkout(db_engine, -1.0) < 0.1
+
+        # Connections are free again, the deadline leaves the checkout alone.
+        token = start_deadline(1.0)
+
+        try:
+            async with db_engine.acquire_connection:
+                pass
+
+        finally:
+            clear_deadline(token)
@@ -0,0 +1,183 @@
+"""Errors of the task DAOs, the same for InMemoryTaskDAO, SQLAlchemyTaskDAO and AsyncpgTaskDAO.
+
+The manager maps them to status codes, so every DAO must raise the same one for the same case:
+DBOperationWarning when the task is not there or the request is malformed, DBOperationError when a value
+breaks a constraint of the table, DBOperationConflict when the task is at another version.
+SQL DAOs run against a local PostgreSQL and are skipped when it is not reachable.
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+from sqlalchemy import text
+
+from app.config import CONFIGURATION
+from app.dto.task import (
+    CreateTaskRequest,
+    UpdateTaskRequest,
+    TaskBatchFilter,
+    UpdateTaskBatchRequest,
+    DeleteTaskBatchRequest,
+    TaskStatus,
+)
+from app.dao.exceptions import DBOperationError, DBOperationWarning, DBOperationConflict
+from app.dao.memory.task import InMemoryTaskDAO
+from app.dao.asyncpg.db_engine import AsyncpgDBEngine
+from app.dao.asyncpg.task import AsyncpgTaskDAO
+from app.dao.sqlalchemy.db_engine import SQLAlchemyDBEngine
+from app.dao.sqlalchemy.model.task import SQLAlchemyTaskDAO
+
+
+MARKER = 'created by task DAO contract tests'
+
+MISSING_ID = 2 ** 31 - 1
+
+DAO_KINDS = ('memory', 'sqlalchemy', 'asyncpg')
+
+
+@pytest.fixture(params=DAO_KINDS)
+def dao_kind(request):
+    """Kind of the DAO under test, tasks created by SQL DAOs are deleted after the test."""
+
+    if request.param == 'memory':
+        yield request.param
+
+        return
+
+    migrated_db = request.getfixturevalue('migrated_db')
+
+    yield request.param
+
+    with migrated_db.begin() as conn:
+        conn.execute(
+            text(f'DELETE FROM {CONFIGURATION.DB_SETTINGS.DB_SCHEMA}.task WHERE description = :marker'),
+            {'marker': MARKER},
+        )
+
+
+@asynccontextmanager
+async def open_task_dao(kind: str):
+    """Task DAO of kind, its connections are closed on exit, pools do not outlive the event loop of a test."""
+
+    settings = CONFIGURATION.DB_SETTINGS
+    connect_kwargs = {
+        'username': settings.DB_USERNAME,
+        'password': settings.DB_PASSWORD,
+        'host': settings.DB_HOST,
+        'port': settings.DB_PORT,
+        'database': settings.DB_DATABASE,
+    }
+
+    if kind == 'memory':
+        yield InMemoryTaskDAO()
+
+    elif kind == 'sqlalchemy':
+        db_engine = SQLAlchemyDBEngine(db_url_template=settings.DATABASE_URL_TEMPLATE, **connect_kwargs)
+
+        try:
+            yield SQLAlchemyTaskDAO(db_engine=db_engine)
+
+        finally:
+            await db_engine.dispose()
+
+    else:
+        db_engine = AsyncpgDBEngine(**connect_kwargs)
+
+        try:
+            yield AsyncpgTaskDAO(db_engine=db_engine)
+
+        finally:
+            await db_engine.close()
+
+
+def update_values(**values) -> UpdateTaskRequest:
+    return UpdateTaskRequest(**{'title': 'updated', 'description': MARKER, 'status': TaskStatus.DONE, **values})
+
+
+@pytest.mark.asyncio
+async def test_missing_task(dao_kind):
+    async with open_task_dao(dao_kind) as task_dao:
+        assert await task_dao.get(MISSING_ID) is None
+
+        with pytest.raises(DBOperationWarning):
+            await task_dao.update(MISSING_ID, update_values())
+
+        with pytest.raises(DBOperationWarning):
+            await task_dao.update(MISSING_ID, update_values(), expected_version=1)
+
+        with pytest.raises(DBOperationWarning):
+            await task_dao.delete(MISSING_ID)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('column', ['title', 'status'])
+async def test_null_breaks_constraint(dao_kind, column):
+    async with open_task_dao(dao_kind) as task_dao:
+        created = await task_dao.create(CreateTaskRequest(title='created', description=MARKER))
+
+        with pytest.raises(DBOperationError):
+            await task_dao.update(created.id, update_values(**{column: None}))
+
+        with pytest.raises(DBOperationError):
+            await task_dao.update_many(UpdateTaskBatchRequest(
+                filter=TaskBatchFilter(ids=[created.id]),
+                values=UpdateTaskRequest(**{column: None}),
+            ))
+
+        with pytest.raises(DBOperationError):
+            await task_dao.create(CreateTaskRequest.model_construct(
+                **{'title': 'created', 'description': MARKER, 'status': TaskStatus.TODO, column: None},
+            ))
+
+        assert (await task_dao.get(created.id)).model_dump() == created.model_dump()
+
+
+@pytest.mark.asyncio
+async def test_null_of_missing_task(dao_kind):
+    async with open_task_dao(dao_kind) as task_dao:
+        with pytest.raises(DBOperationWarning):
+            await task_dao.update(MISSING_ID, update_values(title=None))
+
+        updated = await task_dao.update_many(UpdateTaskBatchRequest(
+            filter=TaskBatchFilter(ids=[MISSING_ID]),
+            values=UpdateTaskRequest(title=None),
+        ))
+
+        assert updated.count == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_version(dao_kind):
+    async with open_task_dao(dao_kind) as task_dao:
+        created = await task_dao.create(CreateTaskRequest(title='created', description=MARKER))
+
+        with pytest.raises(DBOperationConflict):
+            await task_dao.update(created.id, update_values(), expected_version=created.version + 1)
+
+        # The version is checked first, as the conditional UPDATE matches no row.
+        with pytest.raises(DBOperationConflict):
+            await task_dao.update(created.id, update_values(title=None), expected_version=created.version + 1)
+
+        updated = await task_dao.update(created.id, update_values(), expected_version=created.version)
+
+        assert updated.version == created.version + 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_batch(dao_kind):
+    async with open_task_dao(dao_kind) as task_dao:
+        with pytest.raises(DBOperationWarning):
+            await task_dao.update_many(UpdateTaskBatchRequest(
+                filter=TaskBatchFilter(ids=[MISSING_ID]),
+                values=UpdateTaskRequest(),
+            ))
+
+        with pytest.raises(DBOperationWarning):
+            await task_dao.update_many(UpdateTaskBatchRequest(
+                filter=TaskBatchFilter(),
+                values=UpdateTaskRequest(title='updated'),
+            ))
+
+        with pytest.raises(DBOperationWarning):
+            await task_dao.delete_many(DeleteTaskBatchRequest(filter=TaskBatchFilter()))
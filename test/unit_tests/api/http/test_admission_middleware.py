@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from app.api.http.middleware import AdmissionMiddleware
+from app.utils.admission import AdmissionLimiter
+from app.utils.request_context import DeadlineExceeded, time_left
+
+
+class RecordingApp:
+    """ASGI application answering 200 and recording the time left of each request."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.time_left = []
+
+    async def __call__(self, scope, receive, send) -> None:
+        await asyncio.sleep(self.delay)
+
+        self.time_left.append(time_left())
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+def make_middleware(app, **kwargs) -> AdmissionMiddleware:
+    return AdmissionMiddleware(
+        app,
+        read_limiter=AdmissionLimiter(limit=1, max_queue=1, queue_timeout=1.0),
+        write_limiter=AdmissionLimiter(limit=1, max_queue=0, queue_timeout=1.0),
+        prefix='/tasks',
+        exempt=('/tasks/events',),
+        **kwargs,
+    )
+
+
+class DeadlineApp:
+    """ASGI application whose connection checkout misses the deadline, before or after the response started."""
+
+    def __init__(self, started: bool = False) -> None:
+        self.started = started
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.started:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+
+        raise DeadlineExceeded("Request deadline exceeded waiting for a pool connection")
+
+
+async def send_request(middleware, path: str = '/tasks/1', method: str = 'GET') -> list:
+    messages = []
+
+    async def send(message) -> None:
+        messages.append(message)
+
+    await middleware({'type': 'http', 'method': method, 'path': path}, None, send)
+
+    return messages
+
+
+async def request(middleware, path: str = '/tasks/1', method: str = 'GET') -> int:
+    return (await send_request(middleware, path, method))[0]['status']
+
+
+@pytest.mark.asyncio
+async def test_admitted_request_has_deadline():
+    app = RecordingApp()
+    middleware = make_middleware(app, deadline=2.0)
+
+    assert await request(middleware) == 200
+    assert 1.5 < app.time_left[0] <= 2.0
+    assert time_left() is None
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_taken_from_deadline():
+    app = RecordingApp(delay=0.2)
+    middleware = make_middleware(app, deadline=2.0)
+
+    assert await asyncio.gather(request(middleware), request(middleware)) == [200, 200]
+
+    first, queued = app.time_left
+    assert queued < first - 0.15
+
+
+@pytest.mark.asyncio
+async def test_no_deadline():
+    app = RecordingApp()
+    middleware = make_middleware(app)
+
+    assert await request(middleware) == 200
+    assert app.time_left == [None]
+
+
+@pytest.mark.asyncio
+async def test_exempt_request_has_no_deadline():
+    app = RecordingApp()
+    middleware = make_middleware(app, deadline=2.0)
+
+    assert await request(middleware, '/tasks/events') == 200
+    assert app.time_left == [None]
+
+
+@pytest.mark.asyncio
+async def test_rejected_request():
+    app = RecordingApp(delay=0.1)
+    middleware = make_middleware(app, deadline=2.0)
+
+    assert sorted(await asyncio.gather(request(middleware, method='POST'), request(middleware, method='POST'))) == [200, 503]
+    assert len(app.time_left) == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_is_rejected():
+    write_limiter = AdmissionLimiter(limit=1, max_queue=0, queue_timeout=1.0)
+    middleware = AdmissionMiddleware(
+        DeadlineApp(),
+        read_limiter=AdmissionLimiter(limit=1, max_queue=0, queue_timeout=1.0),
+        write_limiter=write_limiter,
+        prefix='/tasks',
+        retry_after=3,
+        deadline=2.0,
+    )
+
+    start, body = await send_request(middleware, method='POST')
+
+    assert start['status'] == 503
+    assert (b'retry-after', b'3') in start['headers']
+    assert body['body'] == b'{"detail":"Service overloaded, retry later"}'
+    assert write_limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_after_response_start_is_raised():
+    middleware = make_middleware(DeadlineApp(started=True), deadline=2.0)
+
+    with pytest.raises(DeadlineExceeded):
+        await send_request(middleware)
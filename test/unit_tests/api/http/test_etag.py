@@ -0,0 +1,71 @@
+import pytest
+
+from app.api.http.etag import task_etag, collection_etag, etag_matches, parse_version
+from app.dto.task import ReadTaskResponse, TaskStatus
+
+
+def make_task(task_id: int, version: int = 1) -> ReadTaskResponse:
+    return ReadTaskResponse(id=task_id, title=f'task {task_id}', description=None, status=TaskStatus.TODO, version=version)
+
+
+def test_task_etag_is_quoted_version():
+    assert task_etag(make_task(1, version=7)) == '"7"'
+
+
+def test_collection_etag_is_stable():
+    tasks = [make_task(1), make_task(2)]
+
+    assert collection_etag(tasks, 'cursor') == collection_etag([make_task(1), make_task(2)], 'cursor')
+    assert collection_etag(tasks).startswith('"')
+    assert collection_etag(tasks).endswith('"')
+
+
+@pytest.mark.parametrize('tasks, next_cursor', [
+    ([make_task(1), make_task(2, version=2)], None),
+    ([make_task(1), make_task(3)], None),
+    ([make_task(1)], None),
+    ([make_task(2), make_task(1)], None),
+    ([make_task(1), make_task(2)], 'cursor'),
+])
+def test_collection_etag_changes_with_page(tasks, next_cursor):
+    assert collection_etag(tasks, next_cursor) != collection_etag([make_task(1), make_task(2)])
+
+
+@pytest.mark.parametrize('header, matches', [
+    (None, False),
+    ('"1"', True),
+    ('"2"', False),
+    ('W/"1"', True),
+    ('*', True),
+    (' * ', True),
+    ('"2", "1"', True),
+    ('"2",W/"1"', True),
+    ('"2", "3"', False),
+    ('1', False),
+    ('', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"1"') is matches
+
+
+@pytest.mark.parametrize('header, version', [
+    ('"1"', 1),
+    (' "42" ', 42),
+    ('*', None),
+])
+def test_parse_version(header, version):
+    assert parse_version(header) == version
+
+
+@pytest.mark.parametrize('header', [
+    '',
+    '""',
+    '1',
+    '"1',
+    'W/"1"',
+    '"abc"',
+    '"1", "2"',
+])
+def test_parse_version_rejects_malformed_tag(header):
+    with pytest.raises(ValueError):
+        parse_version(header)
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from app.dto.task import *
+from app.utils import lru_cache
+from app.utils.lru_cache import LRUCache
+from app.utils.event_broker import EventBroker
+from app.utils.request_context import pin_reads_to_primary, unpin_reads
+from app.dao.cache.task import CachedTaskDAO, estimate_task_size
+from app.dao.memory.task import InMemoryTaskDAO
+
+
+NEGATIVE_TTL = 1.0
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class GatedTaskDAO(InMemoryTaskDAO):
+    """Reads a task, then waits for the gate before returning it, so the read can overlap a write."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.reading = asyncio.Event()
+        self.gets = 0
+
+    async def get(self, task_id: int) -> ReadTaskResponse | None:
+        self.gets += 1
+
+        found_task = await super().get(task_id)
+
+        self.reading.set()
+        await self.gate.wait()
+
+        return found_task
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(lru_cache, 'monotonic', clock)
+
+    return clock
+
+
+def make_dao(replica_reads: bool = False) -> tuple[GatedTaskDAO, CachedTaskDAO]:
+    task_dao = GatedTaskDAO()
+    cache = LRUCache(max_entries=100, max_bytes=1024 * 1024, ttl=10.0, sizeof=estimate_task_size)
+
+    return task_dao, CachedTaskDAO(task_dao, cache, negative_ttl=NEGATIVE_TTL, replica_reads=replica_reads)
+
+
+async def overlap_get(task_dao: GatedTaskDAO, cached_dao: CachedTaskDAO, task_id: int, write) -> ReadTaskResponse | None:
+    """Runs write while a get of task_id has read the task but has not returned yet."""
+
+    task_dao.gate.clear()
+    task_dao.reading.clear()
+
+    get = asyncio.create_task(cached_dao.get(task_id))
+    await task_dao.reading.wait()
+
+    try:
+        await write()
+
+    finally:
+        task_dao.gate.set()
+
+    return await get
+
+
+@pytest.mark.asyncio
+async def test_hit_does_not_read_wrapped_dao(clock):
+    task_dao, cached_dao = make_dao()
+    created = await task_dao.create(CreateTaskRequest(title='a'))
+
+    assert (await cached_dao.get(created.id)).title == 'a'
+    assert (await cached_dao.get(created.id)).title == 'a'
+    assert task_dao.gets == 1
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_cached_for_negative_ttl(clock):
+    task_dao, cached_dao = make_dao()
+
+    assert await cached_dao.get(1) is None
+    assert await cached_dao.get(1) is None
+    assert task_dao.gets == 1
+
+    clock.now += NEGATIVE_TTL
+
+    assert await cached_dao.get(1) is None
+    assert task_dao.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_create_replaces_negative_entry(clock):
+    task_dao, cached_dao = make_dao()
+
+    assert await cached_dao.get(1) is None
+
+    created = await cached_dao.create(CreateTaskRequest(title='a'))
+
+    assert created.id == 1
+    assert (await cached_dao.get(1)).title == 'a'
+    assert task_dao.gets == 1
+
+
+@pytest.mark.asyncio
+async def test_fill_overlapping_an_update_is_not_stored(clock):
+    task_dao, cached_dao = make_dao()
+    created = await task_dao.create(CreateTaskRequest(title='old'))
+
+    async def update():
+        await cached_dao.update(created.id, UpdateTaskRequest(title='new', status=TaskStatus.TODO))
+
+    stale = await overlap_get(task_dao, cached_dao, created.id, update)
+
+    assert stale.title == 'old'
+    assert (await cached_dao.get(created.id)).title == 'new'
+
+
+@pytest.mark.asyncio
+async def test_fill_overlapping_a_delete_is_not_stored(clock):
+    task_dao, cached_dao = make_dao()
+    created = await task_dao.create(CreateTaskRequest(title='a'))
+
+    async def delete():
+        await cached_dao.delete(created.id)
+
+    assert await overlap_get(task_dao, cached_dao, created.id, delete) is not None
+    assert await cached_dao.get(created.id) is None
+    assert task_dao.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_are_cached_only_when_pinned_to_primary(clock):
+    task_dao, cached_dao = make_dao(replica_reads=True)
+    created = await task_dao.create(CreateTaskRequest(title='a'))
+
+    await cached_dao.get(created.id)
+    await cached_dao.get(created.id)
+
+    assert task_dao.gets == 2
+
+    token = pin_reads_to_primary()
+
+    try:
+        await cached_dao.get(created.id)
+
+    finally:
+        unpin_reads(token)
+
+    await cached_dao.get(created.id)
+
+    assert task_dao.gets == 3
+
+
+@pytest.mark.asyncio
+async def test_follow_invalidates_tasks_changed_by_other_processes(clock):
+    task_dao, cached_dao = make_dao()
+    first = await task_dao.create(CreateTaskRequest(title='first'))
+    second = await task_dao.create(CreateTaskRequest(title='second'))
+
+    task_events = EventBroker(name='test', history_size=10, queue_size=10)
+    follow = asyncio.create_task(cached_dao.follow(task_events))
+    await asyncio.sleep(0)
+
+    try:
+        await cached_dao.get(first.id)
+        await cached_dao.get(second.id)
+
+        # Written by another process, bypassing this cache.
+        await task_dao.update(first.id, UpdateTaskRequest(title='changed', status=TaskStatus.TODO))
+        task_events.publish(TaskEvent(
+            id=1, type=TaskEventType.UPDATED, task_id=first.id, status=TaskStatus.TODO,
+            previous_status=TaskStatus.TODO, version=2,
+        ))
+        await asyncio.sleep(0)
+
+        assert (await cached_dao.get(first.id)).title == 'changed'
+        assert (await cached_dao.get(second.id)).title == 'second'
+        assert task_dao.gets == 3
+
+        task_events.reset()
+        await asyncio.sleep(0)
+
+        await cached_dao.get(second.id)
+
+        assert task_dao.gets == 4
+
+    finally:
+        follow.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await follow
+
+    assert len(task_events) == 0
@@ -0,0 +1,22 @@
+import pytest
+
+from app.config import CONFIGURATION
+from app.dto.task import CreateTaskRequest, SearchTaskListRequest
+from app.dao.memory.task import InMemoryTaskDAO
+
+
+@pytest.mark.asyncio
+async def test_window_holds_best_matches(monkeypatch):
+    monkeypatch.setattr(CONFIGURATION.DB_SETTINGS, 'DB_SEARCH_MAX_CANDIDATES', 2)
+    task_dao = InMemoryTaskDAO()
+
+    await task_dao.create(CreateTaskRequest(title='load'))
+    best = await task_dao.create(CreateTaskRequest(title='load', description='load load'))
+    await task_dao.create(CreateTaskRequest(title='load'))
+    second = await task_dao.create(CreateTaskRequest(title='load', description='load'))
+
+    first_page = await task_dao.search(SearchTaskListRequest(q='load', limit=1))
+    second_page = await task_dao.search(SearchTaskListRequest(q='load', limit=1, after=first_page.next_cursor))
+
+    assert [task.id for task in first_page.items + second_page.items] == [best.id, second.id]
+    assert second_page.next_cursor is None
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.dto.task import CreateTaskRequest, UpdateTaskRequest, TaskStatus
+from app.dao.memory.task import InMemoryTaskDAO
+
+
+class GatedSnapshotTaskDAO(InMemoryTaskDAO):
+    """Writes snapshots only once the gate is open, so a save can be cancelled while its thread writes."""
+
+    def __init__(self, snapshot_path: str) -> None:
+        super().__init__(snapshot_path=snapshot_path)
+
+        self.gate = threading.Event()
+        self.writing = threading.Event()
+
+    def _InMemoryTaskDAO__write_snapshot(self, snapshot) -> None:
+        self.writing.set()
+        self.gate.wait(5)
+
+        super()._InMemoryTaskDAO__write_snapshot(snapshot)
+
+
+async def wait_for_thread(event: threading.Event) -> None:
+    while not event.is_set():
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip(tmp_path):
+    snapshot_path = str(tmp_path / 'tasks.json')
+    task_dao = InMemoryTaskDAO(snapshot_path=snapshot_path)
+
+    created = await task_dao.create(CreateTaskRequest(title='first', description='saved'))
+    await task_dao.update(created.id, UpdateTaskRequest(title='first', status=TaskStatus.DONE))
+    await task_dao.create(CreateTaskRequest(title='second'))
+    await task_dao.save_snapshot()
+
+    loaded_dao = InMemoryTaskDAO(snapshot_path=snapshot_path)
+
+    assert (await loaded_dao.get(created.id)).model_dump() == (await task_dao.get(created.id)).model_dump()
+    assert (await loaded_dao.get_stats()).total == 2
+    assert (await loaded_dao.create(CreateTaskRequest(title='third'))).id == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_save_ends_after_its_write(tmp_path):
+    snapshot_path = str(tmp_path / 'tasks.json')
+    task_dao = GatedSnapshotTaskDAO(snapshot_path)
+
+    await task_dao.create(CreateTaskRequest(title='first'))
+
+    save = asyncio.create_task(task_dao.save_snapshot())
+    await wait_for_thread(task_dao.writing)
+
+    await task_dao.create(CreateTaskRequest(title='second'))
+    save.cancel()
+    final_save = asyncio.create_task(task_dao.save_snapshot())
+
+    await asyncio.sleep(0.05)
+
+    # The thread still writes, neither the cancelled save nor the next one may finish.
+    assert not save.done()
+    assert not final_save.done()
+
+    task_dao.gate.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await save
+
+    await final_save
+
+    assert (await InMemoryTaskDAO(snapshot_path=snapshot_path).get_stats()).total == 2
+    assert not (tmp_path / 'tasks.json.tmp').exists()
@@ -0,0 +1,123 @@
+import asyncio
+
+from typing import List
+
+import pytest
+
+from app.utils.batcher import MicroBatcher
+
+
+class BatchFunc:
+    """Records batches and returns the items doubled, or the error an item maps to."""
+
+    def __init__(self, errors: dict | None = None, error: Exception | None = None) -> None:
+        self.batches: List[List[int]] = []
+        self.errors = errors or {}
+        self.error = error
+
+    async def __call__(self, items: List[int]) -> list:
+        self.batches.append(items)
+
+        if self.error is not None:
+            raise self.error
+
+        return [self.errors.get(item, item * 2) for item in items]
+
+
+@pytest.mark.asyncio
+async def test_items_submitted_within_window_form_one_batch():
+    batch_func = BatchFunc()
+    batcher = MicroBatcher(batch_func, window=0.01, max_size=100)
+
+    results = await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batch_func.batches == [[0, 1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_zero_window_flushes_on_next_tick():
+    batch_func = BatchFunc()
+    batcher = MicroBatcher(batch_func, window=0, max_size=100)
+
+    assert await asyncio.gather(batcher.submit(1), batcher.submit(2)) == [2, 4]
+    assert await batcher.submit(3) == 6
+    assert batch_func.batches == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting_for_the_window():
+    batch_func = BatchFunc()
+    batcher = MicroBatcher(batch_func, window=60.0, max_size=3)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(item) for item in range(3))), 1.0)
+
+    assert results == [0, 2, 4]
+    assert batch_func.batches == [[0, 1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_items_over_max_size_start_the_next_batch():
+    batch_func = BatchFunc()
+    batcher = MicroBatcher(batch_func, window=0.01, max_size=2)
+
+    results = await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batch_func.batches == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_exception_result_is_raised_to_its_caller_only():
+    batch_func = BatchFunc(errors={2: ValueError('bad item')})
+    batcher = MicroBatcher(batch_func, window=0.01, max_size=100)
+
+    results = await asyncio.gather(*(batcher.submit(item) for item in range(4)), return_exceptions=True)
+
+    assert results[0] == 0
+    assert results[1] == 2
+    assert isinstance(results[2], ValueError)
+    assert results[3] == 6
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_raises_to_every_caller():
+    batcher = MicroBatcher(BatchFunc(error=RuntimeError('engine')), window=0.01, max_size=100)
+
+    results = await asyncio.gather(*(batcher.submit(item) for item in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_wrong_number_of_results_fails_the_batch():
+    async def batch_func(items):
+        return items[:-1]
+
+    batcher = MicroBatcher(batch_func, window=0.01, max_size=100)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_fail_the_others():
+    release = asyncio.Event()
+
+    async def batch_func(items):
+        await release.wait()
+
+        return items
+
+    batcher = MicroBatcher(batch_func, window=0, max_size=100)
+
+    cancelled = asyncio.create_task(batcher.submit(1))
+    waiting = asyncio.create_task(batcher.submit(2))
+    await asyncio.sleep(0.01)
+
+    cancelled.cancel()
+    release.set()
+
+    assert await waiting == 2
+    assert cancelled.cancelled()
@@ -0,0 +1,37 @@
+import pytest
+
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+@pytest.mark.parametrize('values', [
+    (1,),
+    (0.25, 42),
+    ('text', None, True),
+    (),
+])
+def test_round_trip(values):
+    assert decode_cursor(encode_cursor(*values)) == values
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor('??>>', 2 ** 64)
+
+    assert '=' not in cursor
+    assert '+' not in cursor
+    assert '/' not in cursor
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'a',
+    '!!!',
+    # {}
+    'e30',
+    # null
+    'bnVsbA',
+    # invalid UTF-8
+    '_w',
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Malformed cursor'):
+        decode_cursor(cursor)
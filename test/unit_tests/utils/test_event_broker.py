@@ -0,0 +1,168 @@
+import asyncio
+
+from dataclasses import dataclass
+
+import pytest
+
+from app.utils.event_broker import EventBroker, RESET, SubscriptionDropped
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    even: bool = False
+
+
+def make_broker(history_size: int = 100, queue_size: int = 10) -> EventBroker[Event]:
+    return EventBroker(name='test', history_size=history_size, queue_size=queue_size)
+
+
+def publish(broker: EventBroker[Event], *ids: int) -> None:
+    for event_id in ids:
+        broker.publish(Event(event_id, even=event_id % 2 == 0))
+
+
+@pytest.mark.asyncio
+async def test_subscriber_gets_events_published_after_subscribing():
+    broker = make_broker()
+    publish(broker, 1)
+
+    subscription = broker.subscribe()
+    publish(broker, 2, 3)
+
+    assert await subscription.get(1.0) == [Event(2, even=True), Event(3)]
+    assert broker.last_event_id == 3
+
+
+@pytest.mark.asyncio
+async def test_get_returns_nothing_on_timeout():
+    subscription = make_broker().subscribe()
+
+    assert await subscription.get(0.01) == []
+
+
+@pytest.mark.asyncio
+async def test_filter():
+    broker = make_broker()
+    subscription = broker.subscribe(lambda event: event.even)
+
+    publish(broker, 1, 2, 3, 4)
+
+    assert [event.id for event in await subscription.get(1.0)] == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_last_event_id_replays_missed_events_from_history():
+    broker = make_broker()
+    publish(broker, 1, 2, 3, 4)
+
+    subscription = broker.subscribe(lambda event: event.even, last_event_id=1)
+    publish(broker, 6)
+
+    assert [event.id for event in await subscription.get(1.0)] == [2, 4, 6]
+
+
+@pytest.mark.asyncio
+async def test_last_event_id_of_the_latest_event_replays_nothing():
+    broker = make_broker()
+    publish(broker, 1, 2)
+
+    subscription = broker.subscribe(last_event_id=2)
+
+    assert await subscription.get(0.01) == []
+
+
+@pytest.mark.asyncio
+async def test_reset_when_last_event_is_no_longer_in_history():
+    broker = make_broker(history_size=2)
+    publish(broker, 1, 2, 3)
+
+    subscription = broker.subscribe(last_event_id=1)
+    publish(broker, 4)
+
+    assert await subscription.get(1.0) == [RESET, Event(4, even=True)]
+
+
+@pytest.mark.asyncio
+async def test_reset_when_missed_events_do_not_fit_the_queue():
+    broker = make_broker(queue_size=2)
+    publish(broker, 1, 2, 3, 4)
+
+    subscription = broker.subscribe(last_event_id=1)
+
+    assert await subscription.get(1.0) == [RESET]
+
+
+@pytest.mark.asyncio
+async def test_reset_reaches_subscribers_and_forgets_history():
+    broker = make_broker()
+    publish(broker, 1, 2)
+    subscription = broker.subscribe()
+
+    # The listener resets the broker on every connect, events sent meanwhile are lost.
+    broker.reset()
+
+    assert await subscription.get(1.0) == [RESET]
+    assert await broker.subscribe(last_event_id=1).get(1.0) == [RESET]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_without_holding_back_others():
+    broker = make_broker(queue_size=2)
+    slow = broker.subscribe()
+    fast = broker.subscribe()
+
+    publish(broker, 1, 2)
+    assert len(await fast.get(1.0)) == 2
+
+    publish(broker, 3)
+
+    assert slow.dropped
+    assert len(broker) == 1
+    assert await fast.get(1.0) == [Event(3)]
+
+    with pytest.raises(SubscriptionDropped):
+        await slow.get(1.0)
+
+
+@pytest.mark.asyncio
+async def test_dropped_subscriber_resumes_from_history():
+    broker = make_broker(queue_size=2)
+    slow = broker.subscribe()
+    publish(broker, 1, 2, 3)
+
+    assert slow.dropped
+
+    subscription = broker.subscribe(last_event_id=2)
+
+    assert await subscription.get(1.0) == [Event(3)]
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_up_waiting_subscribers():
+    broker = make_broker()
+    subscription = broker.subscribe()
+
+    waiting = asyncio.create_task(subscription.get(10.0))
+    await asyncio.sleep(0)
+    broker.close()
+
+    with pytest.raises(SubscriptionDropped):
+        await waiting
+
+    assert len(broker) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancellation_is_not_swallowed_by_an_event_arriving_at_once():
+    broker = make_broker()
+    subscription = broker.subscribe()
+
+    waiting = asyncio.create_task(subscription.get(10.0))
+    await asyncio.sleep(0)
+
+    publish(broker, 1)
+    waiting.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
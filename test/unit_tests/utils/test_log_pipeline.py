@@ -0,0 +1,122 @@
+import logging
+
+from typing import List
+
+import pytest
+
+from app.utils.log_pipeline import SamplingFilter, configure_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def sampled_logger():
+    """Logger with its own handler, records of its children propagate to it."""
+
+    logger = logging.getLogger('sampling_test')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+    handler = ListHandler()
+    logger.addHandler(handler)
+
+    yield logger, handler
+
+    logger.removeHandler(handler)
+
+
+def test_rate_of_a_logger_applies_to_its_children():
+    sampling_filter = SamplingFilter({'app': 0.5, 'app.dao': 0.1, 'app.dao.cache': 1.0})
+
+    assert sampling_filter.rate('app') == 0.5
+    assert sampling_filter.rate('app.api.http.handler.task') == 0.5
+    assert sampling_filter.rate('app.dao.sqlalchemy.model.task') == 0.1
+    assert sampling_filter.rate('app.dao.cache.task') == 1.0
+    assert sampling_filter.rate('application') == 1.0
+    assert sampling_filter.rate('uvicorn.access') == 1.0
+
+
+def test_records_of_child_loggers_are_sampled(sampled_logger):
+    logger, handler = sampled_logger
+    handler.addFilter(SamplingFilter({'sampling_test': 0.0}))
+
+    child = logging.getLogger('sampling_test.dao.task')
+
+    for _ in range(10):
+        child.info("dropped")
+        child.debug("dropped")
+        logger.info("dropped")
+
+    child.warning("kept")
+    child.error("kept")
+
+    assert [record.getMessage() for record in handler.records] == ["kept", "kept"]
+
+
+def test_other_loggers_are_not_sampled(sampled_logger):
+    logger, handler = sampled_logger
+    handler.addFilter(SamplingFilter({'sampling_test.dao': 0.0}))
+
+    logging.getLogger('sampling_test.api').info("kept")
+    logging.getLogger('sampling_test.dao').info("dropped")
+
+    assert [record.getMessage() for record in handler.records] == ["kept"]
+
+
+def test_handlers_keep_or_drop_a_record_together(sampled_logger):
+    logger, handler = sampled_logger
+    other_handler = ListHandler()
+    logger.addHandler(other_handler)
+
+    sampling_filter = SamplingFilter({'sampling_test': 0.5})
+    handler.addFilter(sampling_filter)
+    other_handler.addFilter(sampling_filter)
+
+    try:
+        for n in range(200):
+            logging.getLogger('sampling_test.child').info("record %s", n)
+
+    finally:
+        logger.removeHandler(other_handler)
+
+    assert 0 < len(handler.records) < 200
+    assert handler.records == other_handler.records
+
+
+def test_configure_logging_samples_child_loggers(tmp_path):
+    config_path = tmp_path / 'logging.ini'
+    config_path.write_text(
+        "[loggers]\nkeys=root,sampled\n\n"
+        "[handlers]\nkeys=memory\n\n"
+        "[formatters]\nkeys=\n\n"
+        "[logger_root]\nlevel=WARNING\nhandlers=\n\n"
+        "[logger_sampled]\nlevel=DEBUG\nhandlers=memory\nqualname=configured_sampling_test\npropagate=0\n\n"
+        "[handler_memory]\nclass=test_log_pipeline.ListHandler\nlevel=DEBUG\nargs=()\n"
+    )
+
+    root = logging.getLogger()
+    root_level, root_handlers = root.level, list(root.handlers)
+
+    listener = configure_logging(str(config_path), queue_size=100, sample_rates={'configured_sampling_test.dao': 0.0})
+
+    try:
+        logging.getLogger('configured_sampling_test.dao.task').info("dropped")
+        logging.getLogger('configured_sampling_test.api').info("kept")
+
+    finally:
+        listener.stop()
+
+        root.setLevel(root_level)
+        root.handlers[:] = root_handlers
+
+    queue_handler, = logging.getLogger('configured_sampling_test').handlers
+
+    assert [record.getMessage() for record in queue_handler.target.records] == ["kept"]
@@ -0,0 +1,143 @@
+import pytest
+
+from app.utils import lru_cache
+from app.utils.lru_cache import LRUCache
+
+
+class Clock:
+    """Replaces monotonic of the cache module, so entries expire without sleeping."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(lru_cache, 'monotonic', clock)
+
+    return clock
+
+
+def make_cache(max_entries: int = 10, max_bytes: int = 1000, ttl: float = 10.0) -> LRUCache:
+    # Values are their own size.
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=lambda value: value)
+
+
+def test_get_returns_default_when_absent():
+    cache = make_cache()
+
+    assert cache.get('a') is None
+    assert cache.get('a', 'default') == 'default'
+
+
+def test_least_recently_used_entry_is_evicted_by_count(clock):
+    cache = make_cache(max_entries=2)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_are_evicted_by_size(clock):
+    cache = make_cache(max_bytes=100)
+
+    cache.set('a', 40)
+    cache.set('b', 40)
+    cache.set('c', 40)
+
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 80
+    assert cache.stats()['evictions'] == 1
+
+
+def test_value_larger_than_the_cache_is_not_stored(clock):
+    cache = make_cache(max_bytes=100)
+
+    cache.set('a', 40)
+    cache.set('b', 101)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 40
+    assert cache.stats()['evictions'] == 0
+
+
+def test_replaced_value_releases_its_size(clock):
+    cache = make_cache()
+
+    cache.set('a', 40)
+    cache.set('a', 10)
+
+    assert cache.stats()['bytes'] == 10
+    assert len(cache) == 1
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = make_cache(ttl=10.0)
+
+    cache.set('a', 1)
+    clock.now += 9.9
+
+    assert cache.get('a') == 1
+
+    clock.now += 0.1
+
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    assert cache.stats()['expirations'] == 1
+
+
+def test_ttl_of_an_entry_overrides_the_default(clock):
+    cache = make_cache(ttl=10.0)
+
+    cache.set('a', 1, ttl=1.0)
+    clock.now += 1.0
+
+    assert cache.get('a') is None
+
+
+def test_counters(clock):
+    cache = make_cache()
+
+    cache.set('a', 5)
+    cache.get('a')
+    cache.get('a')
+    cache.get('b')
+
+    assert cache.stats() == {
+        'hits': 2,
+        'misses': 1,
+        'evictions': 0,
+        'expirations': 0,
+        'entries': 1,
+        'bytes': 5,
+        'max_entries': 10,
+        'max_bytes': 1000,
+    }
+
+
+def test_delete_and_clear(clock):
+    cache = make_cache()
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.delete('a')
+    cache.delete('missing')
+
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 2
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats()['bytes'] == 0
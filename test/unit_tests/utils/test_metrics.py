@@ -0,0 +1,20 @@
+import os
+
+from app.utils.metrics import MetricsRegistry
+
+
+def test_series_are_labelled_with_worker():
+    registry = MetricsRegistry()
+    worker = 'worker="%d"' % os.getpid()
+
+    registry.counter('requests_total', 'Requests.', kind='read').inc(2)
+    registry.gauge('in_flight', 'Requests in flight.').inc()
+    registry.histogram('duration_seconds', 'Duration.', bounds=(0.1,)).observe(0.05)
+
+    lines = registry.render().splitlines()
+
+    assert f'requests_total{{kind="read",{worker}}} 2' in lines
+    assert f'in_flight{{{worker}}} 1' in lines
+    assert f'duration_seconds_bucket{{{worker},le="0.1"}} 1' in lines
+    assert f'duration_seconds_bucket{{{worker},le="+Inf"}} 1' in lines
+    assert f'duration_seconds_count{{{worker}}} 1' in lines
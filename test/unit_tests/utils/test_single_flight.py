@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+class Call:
+    """Counts calls and completes them when released."""
+
+    def __init__(self, result=None, error: Exception | None = None) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+
+        await self.release.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    call = Call(result='value')
+
+    callers = [asyncio.create_task(single_flight.do('key', call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*callers) == ['value'] * 5
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_different_keys_do_not_share():
+    single_flight = SingleFlight()
+    call = Call()
+    call.release.set()
+
+    await asyncio.gather(single_flight.do('a', call), single_flight.do('b', call))
+
+    assert call.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_caller():
+    single_flight = SingleFlight()
+    call = Call(error=ValueError('failed'))
+
+    callers = [asyncio.create_task(single_flight.do('key', call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    single_flight = SingleFlight()
+    call = Call(result='value')
+
+    cancelled = asyncio.create_task(single_flight.do('key', call))
+    waiting = asyncio.create_task(single_flight.do('key', call))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await waiting == 'value'
+    assert cancelled.cancelled()
+    assert call.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_key_is_dropped_after_completion():
+    single_flight = SingleFlight()
+    call = Call(result='value')
+
+    caller = asyncio.create_task(single_flight.do('key', call))
+    await asyncio.sleep(0)
+
+    assert len(single_flight) == 1
+
+    call.release.set()
+    await caller
+
+    assert len(single_flight) == 0
+
+    # Later callers run the operation again instead of reusing the result.
+    assert await single_flight.do('key', call) == 'value'
+    assert call.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_key_is_dropped_after_failure():
+    single_flight = SingleFlight()
+    call = Call(error=ValueError('failed'))
+    call.release.set()
+
+    with pytest.raises(ValueError):
+        await single_flight.do('key', call)
+
+    assert len(single_flight) == 0